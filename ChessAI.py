@@ -1,85 +1,724 @@
-import random, copy
-from threading import Thread
-
-pieceScore = {"K": 0, "Q": 9, "R": 5, "B": 3, "N": 3, "p":1}
-
-knightScores = [[1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 2, 2, 2, 2, 2, 2, 1],
-                [1, 2, 3, 3, 3, 3, 2, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 2, 3, 3, 3, 3, 2, 1],
-                [1, 2, 2, 2, 2, 2, 2, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1]]
-
-bishopScores = [[4, 3, 2, 1, 1, 2, 3, 4],
-                [3, 4, 3, 2, 2, 3, 4, 3],
-                [2, 3, 4, 3, 3, 4, 3, 2],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [2, 3, 4, 3, 3, 4, 3, 2],
-                [3, 4, 3, 2, 2, 3, 4, 3],
-                [4, 3, 2, 1, 1, 2, 3, 4]]
-
-queenScores =  [[1, 1, 1, 3, 1, 1, 1, 1],
-                [1, 2, 3, 3, 3, 1, 1, 1],
-                [1, 4, 3, 3, 3, 4, 2, 1],
-                [1, 2, 3, 3, 3, 2, 2, 1],
-                [1, 2, 3, 3, 3, 2, 2, 1],
-                [1, 4, 3, 3, 3, 4, 2, 1],
-                [1, 1, 2, 3, 3, 1, 1, 1],
-                [1, 1, 1, 3, 1, 1, 1, 1]]
-
-rookScores =   [[4, 3, 4, 4, 4, 4, 3, 4],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [1, 1, 2, 3, 3, 2, 1, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 1, 2, 3, 3, 2, 1, 1],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [4, 3, 4, 4, 4, 4, 3, 4]]
-
-whitePawnScores=[[8, 8, 8, 8, 8, 8, 8, 8],
-                [8, 8, 8, 8, 8, 8, 8, 8],
-                [5, 6, 6, 7, 7, 6, 5, 5],
-                [2, 3, 3, 5, 5, 3, 3, 2],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 1, 2, 3, 3, 2, 1, 1],
-                [1, 1, 1, 0, 0, 1, 1, 1],
-                [0, 0, 0, 0, 0, 0, 0, 0]]
-
-blackPawnScores=[[0, 0, 0, 0, 0, 0, 0, 0],
-                [1, 1, 1, 0, 0, 1, 1, 1],
-                [1, 1, 2, 3, 3, 2, 1, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [2, 3, 3, 5, 5, 3, 3, 2],
-                [5, 6, 6, 7, 7, 6, 5, 5],
-                [8, 8, 8, 8, 8, 8, 8, 8],
-                [8, 8, 8, 8, 8, 8, 8, 8]]
-
-whiteKingScores = [[0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 11, 0, 4, 0, 12, 0]]
-
-blackKingScores = [[0, 0, 11, 0, 4, 0, 12, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0],
-                  [0, 0, 0, 0, 0, 0, 0, 0]]
-
-piecePositionScores = {"N": knightScores, "B": bishopScores, "Q": queenScores, "R": rookScores, "bp": blackPawnScores, "wp": whitePawnScores, "wK": whiteKingScores, "bK": blackKingScores}
+import random, time, itertools, multiprocessing
+
+from ChessEval import pieceScore, piecePositionScores
 
 CHECKMATE = 1000
 STALEMATE = 0
 DEPTH = 3
+MAX_DEPTH = 64
+TT_SIZE_MB = 32
+#checks every incremental evaluation against a full scoreBoard rescan
+DEBUG_EVAL = False
+
+#move ordering heuristics, each can be switched off to measure what it saves
+USE_HASH_MOVE = True
+USE_MVV_LVA = True
+USE_KILLERS = True
+USE_HISTORY = True
+
+#staged move generation inside the search (hash move, captures, killers, quiet moves, each generated only when the
+#stages before it are used up), the root and the GUI keep using getValidMoves
+USE_STAGED_MOVES = True
+
+#quiescence search at the leaves, delta pruning skips captures that can't raise alpha even with DELTA_MARGIN pawns to spare
+#and SEE pruning skips captures that lose material in the exchange
+USE_QUIESCENCE = True
+USE_DELTA_PRUNING = True
+USE_SEE_PRUNING = True
+DELTA_MARGIN = 2
+
+#null-move pruning: if passing the turn still fails high at depth - 1 - NULL_MOVE_REDUCTION the node is cut off.
+#Not used in check, at the root, twice in a row or when the side to move has only pawns left (zugzwang)
+USE_NULL_MOVE = True
+NULL_MOVE_REDUCTION = 2
+#late move reductions: quiet moves ordered after the first LMR_FULL_MOVES are searched LMR_REDUCTION plies shallower
+#(one more from the LMR_LATE_MOVES-th move on) with a null window and searched again at full depth if they beat alpha
+USE_LMR = True
+LMR_MIN_DEPTH = 3
+LMR_FULL_MOVES = 3
+LMR_LATE_MOVES = 8
+LMR_REDUCTION = 1
+#principal variation search: moves after the first are searched with a null window and again with the full window
+#only if they land inside it
+USE_PVS = True
+#aspiration windows: each iteration after the first starts with a window of ASPIRATION_WINDOWS[0] pawns on both sides of
+#the previous score, a fail high or fail low retries with the next width and finally with the full window
+USE_ASPIRATION = True
+ASPIRATION_WINDOWS = [.5, 1.5, 4]
+#width of a null window, far below the tenth of a pawn steps of the evaluation
+NULL_WINDOW = .001
+
+#the settings above are only defaults, every Searcher keeps its own copy in the attribute named here
+SEARCH_OPTIONS = {"USE_HASH_MOVE": "useHashMove", "USE_MVV_LVA": "useMvvLva", "USE_KILLERS": "useKillers", "USE_HISTORY": "useHistory",
+                  "USE_STAGED_MOVES": "useStagedMoves", "USE_QUIESCENCE": "useQuiescence", "USE_DELTA_PRUNING": "useDeltaPruning",
+                  "USE_SEE_PRUNING": "useSeePruning", "DELTA_MARGIN": "deltaMargin", "USE_NULL_MOVE": "useNullMove",
+                  "NULL_MOVE_REDUCTION": "nullMoveReduction", "USE_LMR": "useLmr", "LMR_MIN_DEPTH": "lmrMinDepth",
+                  "LMR_FULL_MOVES": "lmrFullMoves", "LMR_LATE_MOVES": "lmrLateMoves", "LMR_REDUCTION": "lmrReduction",
+                  "USE_PVS": "usePvs", "USE_ASPIRATION": "useAspiration", "ASPIRATION_WINDOWS": "aspirationWindows",
+                  "NULL_WINDOW": "nullWindow"}
+
+#positions with this many pieces or fewer (kings included) are looked up in the endgame tablebases, a tablebase win
+#scores TABLEBASE_WIN less a tenth of a pawn per ply to mate so faster wins are preferred and it stays below a mate found by search
+TABLEBASE_PIECES = 3
+TABLEBASE_WIN = CHECKMATE / 2
+
+#game state methods timed as move generation while search stats are collected, and if a call counts as a generation
+GENERATION_METHODS = [("getValidMoves", True), ("getCaptureMoves", True), ("getQuietMoves", True), ("getMoveFromID", False),
+                      ("isLegalMove", False)]
+
+#raised inside the search when the time or node budget runs out
+class SearchTimeout(Exception):
+    pass
+
+#Fixed size transposition table, each bucket holds a depth-preferred slot and an always-replace slot.
+#Entries are kept in parallel preallocated lists so memory stays bounded by sizeMB
+class TranspositionTable():
+    EXACT = 0
+    LOWERBOUND = 1
+    UPPERBOUND = 2
+    ENTRY_SIZE = 136 #approximate bytes per slot (list slots + key int + score float + move id)
+
+    def __init__(self, sizeMB=TT_SIZE_MB):
+        self.resize(sizeMB)
+
+    def resize(self, sizeMB):
+        self.sizeMB = sizeMB
+        self.numBuckets = max(1, int(sizeMB * 1024 * 1024) // (2 * self.ENTRY_SIZE))
+        size = 2 * self.numBuckets
+        self.keys = [None] * size
+        self.depths = [-1] * size
+        self.scores = [0] * size
+        self.flags = [0] * size
+        self.moves = [None] * size #moveID of the best move
+        self.ages = [0] * size
+        self.clear()
+
+    #empties the table in place, the lists are only allocated by resize
+    def clear(self):
+        size = 2 * self.numBuckets
+        for table, empty in ((self.keys, None), (self.depths, -1), (self.scores, 0), (self.flags, 0), (self.moves, None), (self.ages, 0)):
+            table[:] = itertools.repeat(empty, size)
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.stores = 0
+
+    #called at the start of every search so entries from earlier moves can be replaced first
+    def newSearch(self):
+        self.age += 1
+
+    #returns the slot index holding key or -1
+    def probe(self, key):
+        self.probes += 1
+        i = (key % self.numBuckets) * 2
+        if self.keys[i] == key:
+            self.hits += 1
+            return i
+        if self.keys[i+1] == key:
+            self.hits += 1
+            return i + 1
+        return -1
+
+    #probe that isn't counted, for reading the table outside the search
+    def lookup(self, key):
+        i = (key % self.numBuckets) * 2
+        if self.keys[i] == key:
+            return i
+        if self.keys[i+1] == key:
+            return i + 1
+        return -1
+
+    def store(self, key, depth, score, flag, moveID):
+        i = (key % self.numBuckets) * 2
+        #depth-preferred slot keeps the deepest entry of the current search, everything else goes to the always-replace slot
+        if self.keys[i] != key and self.depths[i] > depth and self.ages[i] == self.age:
+            i += 1
+        self.stores += 1
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.scores[i] = score
+        self.flags[i] = flag
+        self.moves[i] = moveID
+        self.ages[i] = self.age
+
+    def getStats(self):
+        return {"probes": self.probes, "hits": self.hits, "cutoffs": self.cutoffs, "stores": self.stores,
+                "hitRate": self.hits / self.probes if self.probes else 0.0}
+
+#most valuable victim first, least valuable attacker (king counts as the most valuable) breaks ties
+def mvvLva(move):
+    victim = pieceScore[move.pieceCaptured[1]] if move.pieceCaptured != "--" else 0
+    if move.isPawnPromotion:
+        victim += pieceScore["Q"]
+    return victim * 100 - (pieceScore[move.pieceMoved[1]] or 10)
+
+#What a search did, filled in by Searcher.findBestMove(..., stats=SearchStats()). Times are in seconds, beta cutoffs are
+#counted in the main search only (quiescence stand pat cutoffs would swamp them)
+class SearchStats():
+    def __init__(self):
+        self.nodes = 0
+        self.depth = 0
+        self.iterationNodes = [] #nodes of every completed iteration
+        self.leafEvaluations = 0
+        self.moveGenerations = 0
+        self.betaCutoffs = 0
+        self.firstMoveCutoffs = 0
+        self.nullMoveCutoffs = 0
+        self.reductions = 0
+        self.reductionResearches = 0 #reduced moves that beat alpha and were searched again at full depth
+        self.pvsResearches = 0 #null window scouts that landed inside the window and were searched again with it
+        self.aspirationFailHighs = 0
+        self.aspirationFailLows = 0
+        #pondering (searching the predicted reply on the opponent's time), filled in by ChessWorker.SearchWorker.
+        #Time saved is how long the ponder search had already run on the position when the predicted move was played
+        self.ponderHits = 0
+        self.ponderMisses = 0
+        self.ponderTimeSaved = 0.0
+        self.moveGenTime = 0.0
+        self.evalTime = 0.0
+        self.makeUndoTime = 0.0
+        self.totalTime = 0.0
+        self.generating = False #set while moves are generated so the generator's own make/undo calls count as move generation
+
+    #share of beta cutoffs caused by the first move searched, close to 1 means the move ordering works
+    def getFirstMoveCutoffRate(self):
+        return self.firstMoveCutoffs / self.betaCutoffs if self.betaCutoffs else 0.0
+
+    def getPonderHitRate(self):
+        return self.ponderHits / (self.ponderHits + self.ponderMisses) if self.ponderHits + self.ponderMisses else 0.0
+
+    #growth in nodes from the second to last to the last completed iteration
+    def getEffectiveBranchingFactor(self):
+        if len(self.iterationNodes) < 2 or self.iterationNodes[-2] == 0:
+            return 0.0
+        return self.iterationNodes[-1] / self.iterationNodes[-2]
+
+    def getStats(self):
+        return {"nodes": self.nodes, "depth": self.depth, "iterationNodes": self.iterationNodes,
+                "leafEvaluations": self.leafEvaluations, "moveGenerations": self.moveGenerations,
+                "betaCutoffs": self.betaCutoffs, "firstMoveCutoffRate": self.getFirstMoveCutoffRate(),
+                "nullMoveCutoffs": self.nullMoveCutoffs, "reductions": self.reductions, "reductionResearches": self.reductionResearches,
+                "pvsResearches": self.pvsResearches, "aspirationFailHighs": self.aspirationFailHighs,
+                "aspirationFailLows": self.aspirationFailLows, "ponderHits": self.ponderHits, "ponderMisses": self.ponderMisses,
+                "ponderHitRate": self.getPonderHitRate(), "ponderTimeSaved": self.ponderTimeSaved,
+                "effectiveBranchingFactor": self.getEffectiveBranchingFactor(), "moveGenTime": self.moveGenTime,
+                "evalTime": self.evalTime, "makeUndoTime": self.makeUndoTime, "totalTime": self.totalTime}
+
+    def __str__(self):
+        otherTime = self.totalTime - self.moveGenTime - self.evalTime - self.makeUndoTime
+        return ("%d nodes to depth %d in %.2fs, %d evaluations, %d move generations, %d beta cutoffs (%.0f%% on the first move), "
+                "branching factor %.2f\n%d null move cutoffs, %d reduced moves (%d searched again), %d pvs re-searches, "
+                "aspiration %d fail highs %d fail lows\n"
+                "time: move generation %.2fs, evaluation %.2fs, make/undo %.2fs, search %.2fs" %
+                (self.nodes, self.depth, self.totalTime, self.leafEvaluations, self.moveGenerations, self.betaCutoffs,
+                 100 * self.getFirstMoveCutoffRate(), self.getEffectiveBranchingFactor(), self.nullMoveCutoffs, self.reductions,
+                 self.reductionResearches, self.pvsResearches, self.aspirationFailHighs, self.aspirationFailLows, self.moveGenTime, self.evalTime, self.makeUndoTime, otherTime) +
+                ("\nponder: %d hits of %d (%.0f%%), %.2fs saved" % (self.ponderHits, self.ponderHits + self.ponderMisses,
+                 100 * self.getPonderHitRate(), self.ponderTimeSaved) if self.ponderHits + self.ponderMisses else ""))
+
+#Owns everything a search needs (transposition table, move ordering tables, limits, stats), so every game can have
+#its own Searcher and several searches can run at the same time, e.g. one per thread of a thread pool or one per
+#asyncio game through loop.run_in_executor. A Searcher itself runs one search at a time
+class Searcher():
+    def __init__(self, ttSizeMB=TT_SIZE_MB, depth=DEPTH, book=None, tablebase=None, options=None, seed=None):
+        #depth searched when findBestMove gets no depth, time or node limit
+        self.depth = depth
+        #ChessBook.OpeningBook, its moves are played without searching
+        self.book = book
+        #ChessTablebase.Tablebase, probed at the root and inside the search once few enough pieces are left
+        self.tablebase = tablebase
+        #shared by every search of this Searcher so the next findBestMove of the same game starts with a warm table
+        self.transpositionTable = TranspositionTable(ttSizeMB)
+        #two quiet moves per ply that caused a beta cutoff, and cutoff counts of quiet moves by side and moveID
+        self.killerMoves = [[None, None] for i in range(MAX_DEPTH + 1)]
+        self.historyScores = [{}, {}]
+        self.nodesSearched = 0
+        self.searchDepth = depth #depth of the current iteration
+        self.completedDepth = 0
+        self.deadline = None
+        self.nodeLimit = None
+        self.stopEvent = None
+        self.stats = None
+        self.nextMove = None
+        self.bestScore = 0
+        #promotion piece of the move findBestMove returned, "" means a queen (searched moves always promote to one)
+        self.promoteValue = ""
+        #swapped for a timed version while stats are collected
+        self.evaluate = evaluate
+        #shuffles the root moves so equal moves aren't always played in the same order, a seed makes searches repeatable
+        self.random = random.Random(seed)
+        #search options start from the module settings, options ({setting name: value}, e.g. {"USE_LMR": False}) changes
+        #them for this Searcher only, so searchers with different settings can run side by side
+        for name, attribute in SEARCH_OPTIONS.items():
+            setattr(self, attribute, globals()[name])
+        self.setOptions(options or {})
+
+    def setOptions(self, options):
+        for name, value in options.items():
+            if name not in SEARCH_OPTIONS:
+                raise ValueError("unknown search option " + name)
+            setattr(self, SEARCH_OPTIONS[name], value)
+
+    def getOptions(self):
+        return {name: getattr(self, attribute) for name, attribute in SEARCH_OPTIONS.items()}
+
+    #Orders moves for the search: hash move, captures by MVV-LVA, killer moves, then quiet moves by history score
+    def orderMoves(self, moves, hashMove, ply, whiteToMove):
+        killers = self.killerMoves[ply]
+        history = self.historyScores[0 if whiteToMove else 1]
+        scores = {}
+        for move in moves:
+            if self.useHashMove and move.moveID == hashMove:
+                score = 1000000
+            elif self.useMvvLva and (move.pieceCaptured != "--" or move.isPawnPromotion):
+                score = 100000 + mvvLva(move)
+            elif self.useKillers and move.moveID == killers[0]:
+                score = 90000
+            elif self.useKillers and move.moveID == killers[1]:
+                score = 80000
+            elif self.useHistory:
+                score = min(history.get(move.moveID, 0), 70000)
+            else:
+                score = 0
+            scores[move.moveID] = score
+        return sorted(moves, key=lambda move: scores[move.moveID], reverse=True)
+
+    #Staged move generation: the hash move, captures by MVV-LVA, killer moves, then quiet moves by history score.
+    #A stage is only generated once the ones before it are used up and legality is checked just before a move is
+    #played, so a beta cutoff skips generating and checking the rest. In check all evasions are generated at once
+    def stagedMoves(self, gs, hashMove, ply, inCheck):
+        if inCheck:
+            for move in self.orderMoves(gs.getValidMoves(), hashMove, ply, gs.whiteToMove):
+                yield move
+            return
+        tried = []
+        if self.useHashMove and hashMove is not None:
+            move = gs.getMoveFromID(hashMove)
+            if move is not None and gs.isLegalMove(move):
+                tried.append(hashMove)
+                yield move
+        captures = gs.getCaptureMoves()
+        if self.useMvvLva:
+            captures.sort(key=mvvLva, reverse=True)
+        for move in captures:
+            if move.moveID not in tried and gs.isLegalMove(move):
+                yield move
+        if self.useKillers:
+            for killer in list(self.killerMoves[ply]):
+                if killer is None or killer in tried:
+                    continue
+                move = gs.getMoveFromID(killer)
+                if move is not None and move.pieceCaptured == "--" and not move.isPawnPromotion and gs.isLegalMove(move):
+                    tried.append(killer)
+                    yield move
+        quiets = gs.getQuietMoves()
+        if self.useHistory:
+            history = self.historyScores[0 if gs.whiteToMove else 1]
+            quiets.sort(key=lambda move: history.get(move.moveID, 0), reverse=True)
+        for move in quiets:
+            if move.moveID not in tried and gs.isLegalMove(move):
+                yield move
+
+    #remembers a quiet move that caused a beta cutoff
+    def updateQuietCutoff(self, move, ply, depth, whiteToMove):
+        if self.useKillers:
+            killers = self.killerMoves[ply]
+            if killers[0] != move.moveID:
+                killers[1] = killers[0]
+                killers[0] = move.moveID
+        if self.useHistory:
+            history = self.historyScores[0 if whiteToMove else 1]
+            history[move.moveID] = history.get(move.moveID, 0) + depth * depth
+
+    #forgets everything learned from earlier searches: the table, killer moves and history scores
+    def newGame(self):
+        self.transpositionTable.clear()
+        for killers in self.killerMoves:
+            killers[0] = None
+            killers[1] = None
+        for history in self.historyScores:
+            history.clear()
+
+    #killers only apply to the search they came from, history scores are aged so newer cutoffs count more
+    def resetMoveOrdering(self):
+        for killers in self.killerMoves:
+            killers[0] = None
+            killers[1] = None
+        for history in self.historyScores:
+            for moveID in history:
+                history[moveID] //= 2
+
+    #Instrumentation costs nothing when stats are off: instead of checks in the search, timed versions of evaluate
+    #and of the game state's move generation and make/undo methods are swapped in for one search and swapped back after
+    def instrumentSearch(self, gs, stats):
+        makeMove = gs.makeMove
+        undoMove = gs.undoMove
+        evaluateUntimed = self.evaluate
+        clock = time.perf_counter
+
+        #full move lists and the stages of the staged generator count as move generations, looking up hash and killer
+        #moves and checking legality only add to the time
+        def timedGeneration(generate, counted):
+            def timedGenerate(*args):
+                if counted:
+                    stats.moveGenerations += 1
+                stats.generating = True
+                start = clock()
+                result = generate(*args)
+                stats.moveGenTime += clock() - start
+                stats.generating = False
+                return result
+            return timedGenerate
+
+        def timedMakeMove(move, promoteValue=""):
+            if stats.generating:
+                return makeMove(move, promoteValue)
+            start = clock()
+            makeMove(move, promoteValue)
+            stats.makeUndoTime += clock() - start
+
+        def timedUndoMove():
+            if stats.generating:
+                return undoMove()
+            start = clock()
+            undoMove()
+            stats.makeUndoTime += clock() - start
+
+        def timedEvaluate(gs):
+            stats.leafEvaluations += 1
+            start = clock()
+            score = evaluateUntimed(gs)
+            stats.evalTime += clock() - start
+            return score
+
+        for name, counted in GENERATION_METHODS:
+            setattr(gs, name, timedGeneration(getattr(gs, name), counted))
+        gs.makeMove = timedMakeMove
+        gs.undoMove = timedUndoMove
+        self.evaluate = timedEvaluate
+
+    def removeInstrumentation(self, gs):
+        for name, counted in GENERATION_METHODS:
+            delattr(gs, name)
+        del gs.makeMove
+        del gs.undoMove
+        self.evaluate = evaluate
+
+    #Iterative deepening: searches depth 1, 2, 3... until maxDepth is reached, the time (seconds) or node budget runs out
+    #or stopEvent (a threading.Event) is set, and returns (best move, score) of the last completed iteration.
+    #infoCallback(depth, score, nodes, seconds) is called after every completed iteration.
+    #A SearchStats passed as stats is filled in with what the search did. Book and tablebase moves are returned
+    #without searching, with completedDepth 0. A book move may underpromote, the piece is left in self.promoteValue
+    def findBestMove(self, gs, validMoves, maxDepth=None, timeLimit=None, nodeLimit=None, stopEvent=None, infoCallback=None, stats=None):
+        self.nodesSearched = 0
+        self.completedDepth = 0
+        self.promoteValue = ""
+        if self.book is not None:
+            bookMove = self.book.getBookMove(gs, validMoves)
+            if bookMove is not None:
+                self.promoteValue = bookMove[1]
+                return bookMove[0], 0
+        if self.tablebase is not None and gs.pieceCount <= TABLEBASE_PIECES:
+            tablebaseMove = self.tablebase.getBestMove(gs, validMoves)
+            if tablebaseMove is not None:
+                return tablebaseMove[0], tablebaseScore(*tablebaseMove[1])
+        if maxDepth is None:
+            maxDepth = self.depth if timeLimit is None and nodeLimit is None and stopEvent is None else MAX_DEPTH
+        self.random.shuffle(validMoves)
+        self.transpositionTable.newSearch()
+        self.resetMoveOrdering()
+        startTime = time.time()
+        self.deadline = startTime + timeLimit if timeLimit is not None else None
+        self.nodeLimit = nodeLimit
+        self.stopEvent = stopEvent
+        bestMove = None
+        bestMoveScore = 0
+        moveCount = len(gs.moveLog)
+        self.stats = stats
+        if stats is not None:
+            self.instrumentSearch(gs, stats)
+        try:
+            for depth in range(1, maxDepth + 1):
+                self.bestScore = 0
+                self.nextMove = None
+                self.searchDepth = depth
+                try:
+                    self.searchRoot(gs, validMoves, depth, bestMoveScore if depth > 1 else None)
+                except SearchTimeout:
+                    while len(gs.moveLog) > moveCount:
+                        gs.undoMove()
+                    break
+                #findMoveNegaMax(gs, validMoves, DEPTH, 1 if gs.whiteToMove else -1)
+                #findMoveMinMax(gs, validMoves, DEPTH, gs.whiteToMove)
+                self.completedDepth = depth
+                bestMove = self.nextMove
+                bestMoveScore = self.bestScore
+                if stats is not None:
+                    stats.iterationNodes.append(self.nodesSearched - sum(stats.iterationNodes))
+                if infoCallback is not None:
+                    infoCallback(depth, bestMoveScore, self.nodesSearched, time.time() - startTime)
+                if bestMove is None or len(validMoves) == 1 or abs(bestMoveScore) >= CHECKMATE:
+                    break
+                #the previous iteration's best move is searched first in the next one
+                validMoves.remove(bestMove)
+                validMoves.insert(0, bestMove)
+        finally:
+            if stats is not None:
+                self.removeInstrumentation(gs)
+                stats.nodes = self.nodesSearched
+                stats.depth = self.completedDepth
+                stats.totalTime = time.time() - startTime
+            self.stats = None
+        return bestMove, bestMoveScore
+
+    #One iteration at the root. From the second iteration on it starts with a window of ASPIRATION_WINDOWS[0] pawns
+    #around the previous score and widens it through the schedule on a fail high or fail low, ending with the full window
+    def searchRoot(self, gs, validMoves, depth, previousScore):
+        turnMultiplier = 1 if gs.whiteToMove else -1
+        windows = self.aspirationWindows if self.useAspiration and previousScore is not None and abs(previousScore) < TABLEBASE_WIN else []
+        for window in windows:
+            self.nextMove = None
+            alpha = previousScore - window
+            beta = previousScore + window
+            score = self.findMoveNegaMaxAlphaBeta(gs, validMoves, depth, 0, alpha, beta, turnMultiplier)
+            if alpha < score < beta:
+                return score
+            if self.stats is not None:
+                if score <= alpha:
+                    self.stats.aspirationFailLows += 1
+                else:
+                    self.stats.aspirationFailHighs += 1
+        self.nextMove = None
+        self.bestScore = 0
+        return self.findMoveNegaMaxAlphaBeta(gs, validMoves, depth, 0, -CHECKMATE, CHECKMATE, turnMultiplier)
+
+    #counts a searched node and stops the search when the time or node budget is used up
+    def countNode(self):
+        self.nodesSearched += 1
+        #the first iteration always completes so there is a move to return
+        if self.searchDepth > 1:
+            if self.nodeLimit is not None and self.nodesSearched > self.nodeLimit:
+                raise SearchTimeout()
+            if self.deadline is not None and time.time() >= self.deadline:
+                raise SearchTimeout()
+            if self.stopEvent is not None and self.stopEvent.is_set():
+                raise SearchTimeout()
+
+    #best line from the current position, following the best moves stored in the transposition table. The lookups
+    #aren't counted in the table's probes and hits
+    def getPrincipalVariation(self, gs, maxLength):
+        tt = self.transpositionTable
+        pv = []
+        checkMate, staleMate = gs.checkMate, gs.staleMate
+        for i in range(maxLength):
+            slot = tt.lookup(gs.zobristKey)
+            if slot == -1:
+                break
+            moves = [move for move in gs.getValidMoves() if move.moveID == tt.moves[slot]]
+            if len(moves) == 0:
+                break
+            pv.append(moves[0])
+            gs.makeMove(moves[0])
+        for move in pv:
+            gs.undoMove()
+        gs.checkMate, gs.staleMate = checkMate, staleMate
+        return pv
+
+    #NegaMax with Alpha Beta pruning. validMoves is None below the root with USE_STAGED_MOVES, the moves are then
+    #generated in stages and only the leaves build the full list (quiescence and the evaluation need its mate flags).
+    #ply is the distance from the root, it goes up by one per call however much the null move and LMR cut the depth
+    def findMoveNegaMaxAlphaBeta(self, gs, validMoves, depth, ply, alpha, beta, turnMultiplier, allowNull=True):
+        if depth == 0:
+            if validMoves is None:
+                validMoves = gs.getValidMoves()
+            if self.useQuiescence:
+                return self.quiescence(gs, validMoves, alpha, beta, turnMultiplier)
+            self.countNode()
+            return turnMultiplier * self.evaluate(gs)
+        self.countNode()
+        #draws by rule only end the search below the root, a position at the fifty move or repetition limit still has
+        #legal moves and the root has to return one of them
+        if ply > 0 and (gs.staleMate or (validMoves is None and gs.isDrawByRule())):
+            return STALEMATE
+        if self.tablebase is not None and gs.pieceCount <= TABLEBASE_PIECES:
+            result = self.tablebase.probe(gs)
+            if result is not None:
+                return tablebaseScore(*result)
+
+        tt = self.transpositionTable
+        alphaOrig = alpha
+        hashMove = None
+        slot = tt.probe(gs.zobristKey)
+        if slot != -1:
+            hashMove = tt.moves[slot]
+            if tt.depths[slot] >= depth and ply != 0:
+                ttScore = tt.scores[slot]
+                if tt.flags[slot] == TranspositionTable.EXACT:
+                    tt.cutoffs += 1
+                    return ttScore
+                elif tt.flags[slot] == TranspositionTable.LOWERBOUND:
+                    alpha = max(alpha, ttScore)
+                else:
+                    beta = min(beta, ttScore)
+                if alpha >= beta:
+                    tt.cutoffs += 1
+                    return ttScore
+
+        #not gs.inCheckNow, the moves passed in to the root were generated before the previous iteration
+        inCheck = gs.inCheck()
+        if self.useNullMove and allowNull and ply > 0 and depth > self.nullMoveReduction and not inCheck and abs(beta) < TABLEBASE_WIN \
+                and turnMultiplier * self.evaluate(gs) >= beta and gs.hasNonPawnMaterial("w" if gs.whiteToMove else "b"):
+            moveCount = len(gs.moveLog)
+            gs.makeNullMove()
+            try:
+                nextMoves = None if self.useStagedMoves else gs.getValidMoves()
+                score = -self.findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1 - self.nullMoveReduction, ply + 1, -beta, -beta + self.nullWindow,
+                                                       -turnMultiplier, False)
+            except SearchTimeout:
+                #the moves made below the null move are taken back first, undoMove doesn't know about null moves
+                while len(gs.moveLog) > moveCount:
+                    gs.undoMove()
+                gs.undoNullMove()
+                raise
+            gs.undoNullMove()
+            if score >= beta:
+                if self.stats is not None:
+                    self.stats.nullMoveCutoffs += 1
+                return beta
+
+        maxScore = -CHECKMATE
+        if validMoves is None:
+            moves = self.stagedMoves(gs, hashMove, ply, inCheck)
+        else:
+            moves = self.orderMoves(validMoves, hashMove, ply, gs.whiteToMove)
+        bestMoveID = None
+        moveNumber = 0
+        for move in moves:
+            moveNumber += 1
+            gs.makeMove(move) if not move.isPawnPromotion else gs.makeMove(move, promoteValue="Q")
+            nextMoves = None if self.useStagedMoves else gs.getValidMoves()
+            reduction = 0
+            if self.useLmr and depth >= self.lmrMinDepth and moveNumber > self.lmrFullMoves and not inCheck \
+                    and move.pieceCaptured == "--" and not move.isPawnPromotion and not gs.inCheck():
+                reduction = min(self.lmrReduction + 1 if moveNumber > self.lmrLateMoves else self.lmrReduction, depth - 2)
+            if moveNumber == 1 or (not self.usePvs and reduction == 0):
+                score = -self.findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1, ply + 1, -beta, -alpha, -turnMultiplier)
+            else:
+                #null window scout, searched again at full depth if a reduced move beats alpha
+                #and with the full window if it lands inside it
+                score = -self.findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1 - reduction, ply + 1, -alpha - self.nullWindow, -alpha, -turnMultiplier)
+                if reduction > 0:
+                    if self.stats is not None:
+                        self.stats.reductions += 1
+                    if score > alpha:
+                        if self.stats is not None:
+                            self.stats.reductionResearches += 1
+                        if self.usePvs:
+                            score = -self.findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1, ply + 1, -alpha - self.nullWindow, -alpha, -turnMultiplier)
+                        else:
+                            score = -self.findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1, ply + 1, -beta, -alpha, -turnMultiplier)
+                if self.usePvs and alpha < score < beta:
+                    if self.stats is not None:
+                        self.stats.pvsResearches += 1
+                    score = -self.findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1, ply + 1, -beta, -alpha, -turnMultiplier)
+            if score > maxScore:
+                maxScore = score
+                bestMoveID = move.moveID
+                if ply == 0:
+                    self.nextMove = move
+                    self.bestScore = score
+            gs.undoMove()
+            if maxScore > alpha: #pruning
+                alpha = maxScore
+            if alpha >= beta:
+                if move.pieceCaptured == "--" and not move.isPawnPromotion:
+                    self.updateQuietCutoff(move, ply, depth, gs.whiteToMove)
+                if self.stats is not None:
+                    self.stats.betaCutoffs += 1
+                    if moveNumber == 1:
+                        self.stats.firstMoveCutoffs += 1
+                break
+
+        #no legal move: checkmate scores -CHECKMATE like an empty validMoves, stalemate is only found here when staged
+        if moveNumber == 0 and not inCheck:
+            return STALEMATE
+        if maxScore <= alphaOrig:
+            flag = TranspositionTable.UPPERBOUND
+        elif maxScore >= beta:
+            flag = TranspositionTable.LOWERBOUND
+        else:
+            flag = TranspositionTable.EXACT
+        tt.store(gs.zobristKey, depth, maxScore, flag, bestMoveID)
+        return maxScore
+
+    #Captures-only search at the leaves so the static evaluation is never taken in the middle of an exchange
+    def quiescence(self, gs, validMoves, alpha, beta, turnMultiplier):
+        self.countNode()
+        standPat = turnMultiplier * self.evaluate(gs)
+        if gs.checkMate or gs.staleMate or standPat >= beta:
+            return standPat
+        if standPat > alpha:
+            alpha = standPat
+        captures = [move for move in validMoves if move.pieceCaptured != "--" or move.isPawnPromotion]
+        captures.sort(key=mvvLva, reverse=True)
+        for move in captures:
+            if not move.isPawnPromotion:
+                #even winning the piece for free can't bring the score up to alpha
+                if self.useDeltaPruning and standPat + pieceScore[move.pieceCaptured[1]] + self.deltaMargin <= alpha:
+                    continue
+                if self.useSeePruning and not move.isEnpassantMove and staticExchange(gs, move) < 0:
+                    continue
+            gs.makeMove(move) if not move.isPawnPromotion else gs.makeMove(move, promoteValue="Q")
+            nextMoves = gs.getValidMoves()
+            score = -self.quiescence(gs, nextMoves, -beta, -alpha, -turnMultiplier)
+            gs.undoMove()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    #searches one root move with a fixed depth and the window (alpha, CHECKMATE), used by the pool workers
+    def searchRootMove(self, gs, move, depth, alpha):
+        self.searchDepth = depth
+        self.deadline = None
+        self.nodeLimit = None
+        self.stopEvent = None
+        self.nodesSearched = 0
+        self.transpositionTable.newSearch()
+        self.resetMoveOrdering()
+        turnMultiplier = 1 if gs.whiteToMove else -1
+        gs.makeMove(move) if not move.isPawnPromotion else gs.makeMove(move, promoteValue="Q")
+        nextMoves = gs.getValidMoves()
+        score = -self.findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1, 1, -CHECKMATE, -alpha, -turnMultiplier)
+        gs.undoMove()
+        return score
+
+    #returns (best move, score) like findBestMove, searching to a fixed depth on the process pool
+    def findBestMoveParallel(self, gs, validMoves, depth=None, workers=None):
+        depth = depth or self.depth
+        pool = getSearchPool(workers)
+        if len(validMoves) == 0:
+            return None, 0
+        tt = self.transpositionTable
+        self.random.shuffle(validMoves)
+        slot = tt.lookup(gs.zobristKey)
+        moves = self.orderMoves(validMoves, tt.moves[slot] if slot != -1 else None, 0, gs.whiteToMove)
+        pool.sharedAlpha.value = -CHECKMATE
+        #the workers search with this Searcher's options
+        options = self.getOptions()
+        bestMoveID, bestMoveScore, exact, self.nodesSearched = pool.apply(searchRootMoveWorker, ((gs, moves[0].moveID, depth, True, options),))
+        tasks = [(gs, move.moveID, depth, False, options) for move in moves[1:]]
+        for moveID, score, exact, nodes in pool.imap_unordered(searchRootMoveWorker, tasks):
+            self.nodesSearched += nodes
+            if exact and score > bestMoveScore:
+                bestMoveScore = score
+                bestMoveID = moveID
+        self.completedDepth = depth
+        tt.store(gs.zobristKey, depth, bestMoveScore, TranspositionTable.LOWERBOUND, bestMoveID)
+        bestMove = [move for move in validMoves if move.moveID == bestMoveID][0]
+        return bestMove, bestMoveScore
 
 def findRandomMove(validMoves):
     return validMoves[random.randint(0, len(validMoves)-1)]
@@ -120,19 +759,6 @@ def findMinMax(gs, validMoves):
         
     return bestMove
 
-#Helper Function for initial call of recursive function
-def findBestMove(gs, validMoves):
-    global nextMove
-    global bestScore
-    bestScore = 0
-    nextMove = None
-    random.shuffle(validMoves)
-    findMoveNegaMaxAlphaBeta(gs, validMoves, DEPTH, -CHECKMATE, CHECKMATE, 1 if gs.whiteToMove else -1)
-    #threadedNMAB(gs, validMoves, DEPTH, -CHECKMATE, CHECKMATE, 1 if gs.whiteToMove else -1)
-    #findMoveNegaMax(gs, validMoves, DEPTH, 1 if gs.whiteToMove else -1)
-    #findMoveMinMax(gs, validMoves, DEPTH, gs.whiteToMove)
-    return nextMove, bestScore
-
 #Recursive Function of MinMax move finding (not used)
 def findMoveMinMax(gs, validMoves, depth, whiteToMove):
     global nextMove
@@ -183,61 +809,124 @@ def findMoveNegaMax(gs, validMoves, depth, turnMultiplier):
         gs.undoMove()
     return maxScore
 
-#NegaMax with Alpha Beta pruning
-def findMoveNegaMaxAlphaBeta(gs, validMoves, depth, alpha, beta, turnMultiplier):
-    global nextMove
-    global bestScore
-    if depth == 0:
-        return turnMultiplier * scoreBoard(gs)
-
-    #move ordering - implement later
-    maxScore = -CHECKMATE
-    if gs.staleMate:
-        return STALEMATE
-    for move in validMoves:
-        gs.makeMove(move) if not move.isPawnPromotion else gs.makeMove(move, promoteValue="Q")
-        nextMoves = gs.getValidMoves()
-        score = -findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1, -beta, -alpha, -turnMultiplier)
-        if score > maxScore:
-            maxScore = score
-            if depth == DEPTH:
-                nextMove = move
-                bestScore = score
-        gs.undoMove()
-        if maxScore > alpha: #pruning
-            alpha = maxScore
-        if alpha >= beta:
+#piece values for exchanges, the king can only take last
+seeValues = {piece: value if piece != "K" else 100 for piece, value in pieceScore.items()}
+
+#Static exchange evaluation: material won or lost (in pawns) by the capture when both sides keep recapturing
+#on the target square with their least valuable attacker, pieces lined up behind an attacker join in once it has moved
+def staticExchange(gs, move):
+    victim = seeValues[move.pieceCaptured[1]]
+    attackerValue = seeValues[move.pieceMoved[1]]
+    if victim >= attackerValue:
+        return victim - attackerValue if victim > attackerValue else 0
+    board = gs.board
+    r, c = move.endRow, move.endCol
+    removed = {(move.startRow, move.startCol)}
+    color = "b" if move.pieceMoved[0] == "w" else "w"
+    gains = [victim]
+    pieceOnSquare = attackerValue
+    while True:
+        attacker = smallestAttacker(board, r, c, color, removed)
+        if attacker is None:
             break
-    return maxScore
-
-#Thread caller
-def threadedNMAB(gs, validMoves, depth, alpha, beta, turnMultiplier):
-    global nextMove
-    threads = [None] * len(validMoves)
-    moveScores = [0] * len(validMoves)
-
-    for i in range(len(validMoves)):
-        threads[i] = Thread(target=threadMove, args=(copy.deepcopy(gs), validMoves[i], depth, alpha, beta, turnMultiplier, i, moveScores))
-        threads[i].start()
-    
-    for i in range(len(validMoves)):
-        threads[i].join()
-
-    maxScore = max(moveScores)
-    index = moveScores.index(maxScore)
-
-    nextMove = validMoves[index]
-
-    return maxScore
-
-#Threads
-def threadMove(gs, move, depth, alpha, beta, turnMultiplier, i, moveScores):
-    gs.makeMove(move) if not move.isPawnPromotion else gs.makeMove(move, promoteValue="Q")
-    nextMoves = gs.getValidMoves()
-    score = -findMoveNegaMaxAlphaBeta(gs, nextMoves, depth - 1, -beta, -alpha, -turnMultiplier)
-    moveScores[i] = score
+        gains.append(pieceOnSquare - gains[-1])
+        pieceOnSquare = seeValues[board[attacker[0]][attacker[1]][1]]
+        removed.add(attacker)
+        color = "b" if color == "w" else "w"
+    #each side may stop recapturing when it would lose material
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i-1] = -max(-gains[i-1], gains[i])
+    return gains[0]
+
+#square of the least valuable piece of color attacking (r, c), squares in removed count as empty
+def smallestAttacker(board, r, c, color, removed):
+    best = None
+    bestValue = 1000
+    pawnRow = r + 1 if color == "w" else r - 1
+    for dc in (-1, 1):
+        if 0 <= pawnRow < 8 and 0 <= c + dc < 8 and board[pawnRow][c+dc] == color + "p" and (pawnRow, c+dc) not in removed:
+            return (pawnRow, c+dc)
+    for dr, dc in ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)):
+        if 0 <= r + dr < 8 and 0 <= c + dc < 8 and board[r+dr][c+dc] == color + "N" and (r+dr, c+dc) not in removed:
+            return (r+dr, c+dc)
+    for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)):
+        sliders = "RQ" if dr == 0 or dc == 0 else "BQ"
+        for i in range(1, 8):
+            endRow = r + dr * i
+            endCol = c + dc * i
+            if not (0 <= endRow < 8 and 0 <= endCol < 8):
+                break
+            if (endRow, endCol) in removed:
+                continue
+            piece = board[endRow][endCol]
+            if piece == "--":
+                continue
+            if piece[0] == color and (piece[1] in sliders or (i == 1 and piece[1] == "K")):
+                if seeValues[piece[1]] < bestValue:
+                    best = (endRow, endCol)
+                    bestValue = seeValues[piece[1]]
+            break
+    return best
+
+#Root splitting parallel search: the first root move is searched with a full window, then the remaining root moves
+#are spread over a pool of worker processes that share the best root score found so far as their alpha bound.
+#The pool is created once and reused across moves so every worker keeps its own warm transposition table
+searchPool = None
+searchPoolWorkers = 0
+#set in every worker process
+rootAlpha = None
+workerSearcher = None
+
+def initSearchWorker(sharedAlpha):
+    global rootAlpha
+    global workerSearcher
+    rootAlpha = sharedAlpha
+    workerSearcher = Searcher()
+
+def getSearchPool(workers=None):
+    global searchPool
+    global searchPoolWorkers
+    workers = workers or multiprocessing.cpu_count()
+    if searchPool is None or searchPoolWorkers != workers:
+        closeSearchPool()
+        sharedAlpha = multiprocessing.Value('d', -CHECKMATE)
+        searchPool = multiprocessing.Pool(workers, initializer=initSearchWorker, initargs=(sharedAlpha,))
+        searchPool.sharedAlpha = sharedAlpha
+        searchPoolWorkers = workers
+    return searchPool
+
+def closeSearchPool():
+    global searchPool
+    if searchPool is not None:
+        searchPool.terminate()
+        searchPool.join()
+        searchPool = None
+
+#searches one root move in a worker, returns (moveID, score, exact, nodes), a score that is not exact failed low
+#against the shared alpha and is only an upper bound
+def searchRootMoveWorker(args):
+    gs, moveID, depth, fullWindow, options = args
+    workerSearcher.setOptions(options)
+    move = [m for m in gs.getValidMoves() if m.moveID == moveID][0]
+    alpha = -CHECKMATE if fullWindow else rootAlpha.value
+    score = workerSearcher.searchRootMove(gs, move, depth, alpha)
+    with rootAlpha.get_lock():
+        if score > rootAlpha.value:
+            rootAlpha.value = score
+    return moveID, score, fullWindow or score > alpha, workerSearcher.nodesSearched
+
+#Positive Score for White negative score for black, O(1) from the scores GameState keeps up to date in makeMove/undoMove
+def evaluate(gs):
+    if gs.checkMate:
+        return -CHECKMATE if gs.whiteToMove else CHECKMATE
+    elif gs.staleMate:
+        return STALEMATE
+    score = gs.materialScore + gs.positionScore * .1
+    if DEBUG_EVAL:
+        assert abs(score - scoreBoard(gs)) < 1e-9, "incremental evaluation %f != rescan %f" % (score, scoreBoard(gs))
+    return score
 
-#Positive Score for White negative score for black
+#Positive Score for White negative score for black (full rescan of the board)
 def scoreBoard(gs):
     if gs.checkMate:
         if gs.whiteToMove:
@@ -278,3 +967,14 @@ def scoreMaterial(board):
                 score -= pieceScore[square[1]]
 
     return score
+
+#search score of a tablebase result (ChessTablebase.WIN, DRAW or LOSS for the side to move, plies to mate)
+def tablebaseScore(result, plies):
+    return result * (TABLEBASE_WIN - plies * .1)
+
+#searcher used through the module level functions by the GUI, which plays one game at a time
+defaultSearcher = Searcher()
+transpositionTable = defaultSearcher.transpositionTable
+
+def findBestMove(gs, validMoves, maxDepth=None, timeLimit=None, nodeLimit=None, stopEvent=None, infoCallback=None, stats=None):
+    return defaultSearcher.findBestMove(gs, validMoves, maxDepth, timeLimit, nodeLimit, stopEvent, infoCallback, stats)
@@ -0,0 +1,149 @@
+#Batch analysis of EPD/FEN files on a process pool, results are written as JSON lines in input order
+#usage: python ChessBatch.py positions.epd results.jsonl [--depth 4] [--movetime 1.0] [--nodes N] [--workers N] [--hash 16]
+#Rerunning with the same output file resumes after the last complete result
+
+import argparse, json, os, time, multiprocessing
+from collections import deque
+import ChessEngine
+import ChessAI
+
+#transposition table size of every worker, in MB
+BATCH_HASH_MB = 16
+#positions queued per worker, memory stays bounded by workers * this no matter how big the input is
+BATCH_QUEUE_PER_WORKER = 4
+
+#yields (index, fen, epd id or None) for every record of the file, blank lines and # comments are skipped.
+#EPD records have 4 position fields followed by operations (bm Nf3; id "x";), FEN records have the two move counters
+def readPositions(path):
+    index = 0
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line == "" or line.startswith("#"):
+                continue
+            fields = line.split()
+            if len(fields) >= 6 and fields[4].isdigit() and fields[5].isdigit():
+                fen = " ".join(fields[:6])
+                operations = " ".join(fields[6:])
+            else:
+                fen = " ".join(fields[:4]) + " 0 1"
+                operations = " ".join(fields[4:])
+            epdID = None
+            for operation in operations.split(";"):
+                operation = operation.strip()
+                if operation.startswith("id "):
+                    epdID = operation[3:].strip().strip('"')
+            yield index, fen, epdID
+            index += 1
+
+#one searcher per worker process
+batchSearcher = None
+
+def initBatchWorker(hashMB):
+    global batchSearcher
+    batchSearcher = ChessAI.Searcher(hashMB)
+
+#searches one record in a worker and returns its result as a dict, score is in centipawns for the side to move
+def analysePosition(args):
+    index, fen, epdID, maxDepth, timeLimit, nodeLimit = args
+    result = {"index": index, "fen": fen}
+    if epdID is not None:
+        result["id"] = epdID
+    start = time.perf_counter()
+    try:
+        gs = ChessEngine.GameState.fromFen(fen)
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+    #every position starts from a cold table, empty move ordering tables and a random state seeded from its FEN so
+    #results don't depend on which worker got which position
+    batchSearcher.newGame()
+    batchSearcher.random.seed(fen)
+    validMoves = gs.getValidMoves()
+    if len(validMoves) == 0:
+        bestMove, score, depth, nodes = None, -ChessAI.CHECKMATE if gs.checkMate else ChessAI.STALEMATE, 0, 0
+    else:
+        bestMove, score = batchSearcher.findBestMove(gs, validMoves, maxDepth, timeLimit, nodeLimit)
+        depth, nodes = batchSearcher.completedDepth, batchSearcher.nodesSearched
+    result["bestmove"] = bestMove.getCoordinateNotation(batchSearcher.promoteValue) if bestMove is not None else None
+    result["score"] = round(score * 100)
+    result["depth"] = depth
+    result["nodes"] = nodes
+    result["time"] = round(time.perf_counter() - start, 3)
+    return result
+
+#number of complete results in outputPath, a partly written last line (from a crash) is cut off
+def countCompletedResults(outputPath):
+    if not os.path.exists(outputPath):
+        return 0
+    completed = 0
+    end = 0
+    with open(outputPath, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            completed += 1
+            end += len(line)
+    if end != os.path.getsize(outputPath):
+        with open(outputPath, "r+b") as f:
+            f.truncate(end)
+    return completed
+
+#analyses every record of inputPath that isn't in outputPath yet, returns the number of new results.
+#a pool made with initializer=initBatchWorker can be passed in to reuse its workers across files
+def runBatch(inputPath, outputPath, maxDepth=None, timeLimit=None, nodeLimit=None, workers=None, hashMB=BATCH_HASH_MB, pool=None, out=print):
+    workers = workers or multiprocessing.cpu_count()
+    ownPool = pool is None
+    if ownPool:
+        pool = multiprocessing.Pool(workers, initializer=initBatchWorker, initargs=(hashMB,))
+    skip = countCompletedResults(outputPath)
+    if skip > 0:
+        out("resuming after %d results" % skip)
+    written = 0
+    start = time.perf_counter()
+    #results are taken from the front of the queue so they come out in input order,
+    #and the input is only read as far as the queue has room
+    pending = deque()
+    try:
+        with open(outputPath, "a") as output:
+            for index, fen, epdID in readPositions(inputPath):
+                if index < skip:
+                    continue
+                pending.append(pool.apply_async(analysePosition, ((index, fen, epdID, maxDepth, timeLimit, nodeLimit),)))
+                if len(pending) >= workers * BATCH_QUEUE_PER_WORKER:
+                    writeResult(output, pending.popleft().get())
+                    written += 1
+            while pending:
+                writeResult(output, pending.popleft().get())
+                written += 1
+    finally:
+        if ownPool:
+            pool.terminate()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    out("%d positions in %.2fs, %.2f positions/sec" % (written, elapsed, written / elapsed if elapsed > 0 else 0))
+    return written
+
+#one line per result, flushed so a crash loses at most the results still in flight
+def writeResult(output, result):
+    output.write(json.dumps(result) + "\n")
+    output.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse every position of an EPD/FEN file")
+    parser.add_argument("input", help="EPD or FEN file, one position per line")
+    parser.add_argument("output", help="JSON lines results, appended to when resuming")
+    parser.add_argument("--depth", type=int, default=None, help="maximum search depth (default %d without other limits)" % ChessAI.DEPTH)
+    parser.add_argument("--movetime", type=float, default=None, help="seconds per position")
+    parser.add_argument("--nodes", type=int, default=None, help="node budget per position")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--hash", type=int, default=BATCH_HASH_MB, help="transposition table MB per worker")
+    args = parser.parse_args()
+    runBatch(args.input, args.output, args.depth, args.movetime, args.nodes, args.workers, args.hash)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#Search benchmarks on a fixed position suite
+#usage: python ChessBench.py parallel|stats|ordering|pruning|windows|staged|moves [--depth 3] [--workers N]
+
+import argparse, time, multiprocessing, tracemalloc
+import ChessEngine
+import ChessAI
+import ChessPerft
+
+#quiet and tactical positions from the perft suite
+BENCH_POSITIONS = [(name, fen) for name, fen, counts in ChessPerft.POSITIONS if name in ("initial", "kiwipete", "castling", "middlegame")]
+
+#single process alpha-beta to a fixed depth from a cold table, returns (move, score, nodes)
+def searchSingle(gs, depth):
+    searcher = ChessAI.Searcher()
+    searcher.searchDepth = depth
+    validMoves = gs.getValidMoves()
+    score = searcher.findMoveNegaMaxAlphaBeta(gs, validMoves, depth, 0, -ChessAI.CHECKMATE, ChessAI.CHECKMATE, 1 if gs.whiteToMove else -1)
+    return searcher.nextMove, score, searcher.nodesSearched
+
+#compares findMoveNegaMaxAlphaBeta with the root split process pool search on every bench position
+def benchmarkParallel(depth=3, workers=None, out=print):
+    workers = workers or multiprocessing.cpu_count()
+    singleTime = 0.0
+    parallelTime = 0.0
+    for name, fen in BENCH_POSITIONS:
+        gs = ChessEngine.GameState.fromFen(fen)
+        start = time.perf_counter()
+        move, score, nodes = searchSingle(gs, depth)
+        elapsed = time.perf_counter() - start
+        singleTime += elapsed
+        out("%-12s single     %8d nodes %7.2fs %s %.1f" % (name, nodes, elapsed, move.getChessNotation(), score))
+
+        #fresh pool so worker tables start cold as well, the pool itself is started outside the timing
+        ChessAI.closeSearchPool()
+        ChessAI.getSearchPool(workers)
+        searcher = ChessAI.Searcher()
+        start = time.perf_counter()
+        move, score = searcher.findBestMoveParallel(gs, gs.getValidMoves(), depth, workers)
+        elapsed = time.perf_counter() - start
+        parallelTime += elapsed
+        out("%-12s %2d workers %8d nodes %7.2fs %s %.1f" % (name, workers, searcher.nodesSearched, elapsed, move.getChessNotation(), score))
+    ChessAI.closeSearchPool()
+    out("single %.2fs, %d workers %.2fs, speedup %.2fx" % (singleTime, workers, parallelTime, singleTime / parallelTime))
+    return singleTime / parallelTime
+
+#iterative deepening search of every bench position with search statistics
+def benchmarkStats(depth=3, out=print):
+    for name, fen in BENCH_POSITIONS:
+        gs = ChessEngine.GameState.fromFen(fen)
+        stats = ChessAI.SearchStats()
+        move, score = ChessAI.Searcher().findBestMove(gs, gs.getValidMoves(), depth, stats=stats)
+        out("%-12s %s %.1f" % (name, move.getChessNotation(), score))
+        out(str(stats))
+
+#nodes and time to a fixed depth on every bench position for each configuration (label, {ChessAI.SEARCH_OPTIONS name: value}),
+#every position gets a fresh Searcher with those options. Returns {label: (nodes, seconds)}
+def compareOptions(configurations, depth=4, out=print):
+    results = {}
+    for label, options in configurations:
+        totalNodes = 0
+        totalTime = 0.0
+        for name, fen in BENCH_POSITIONS:
+            gs = ChessEngine.GameState.fromFen(fen)
+            searcher = ChessAI.Searcher(options=options)
+            stats = ChessAI.SearchStats()
+            start = time.perf_counter()
+            move, score = searcher.findBestMove(gs, gs.getValidMoves(), depth, stats=stats)
+            elapsed = time.perf_counter() - start
+            totalNodes += searcher.nodesSearched
+            totalTime += elapsed
+            out("%-12s %-12s %8d nodes %7.2fs %s %.1f, re-searches: %d lmr %d pvs, aspiration %d high %d low" % (label, name,
+                searcher.nodesSearched, elapsed, move.getCoordinateNotation(), score, stats.reductionResearches,
+                stats.pvsResearches, stats.aspirationFailHighs, stats.aspirationFailLows))
+        results[label] = (totalNodes, totalTime)
+    baseNodes, baseTime = results[configurations[0][0]]
+    for label, options in configurations:
+        nodes, seconds = results[label]
+        out("%-12s total %8d nodes (%5.1f%%) %7.2fs (%5.1f%%)" % (label, nodes, 100 * nodes / baseNodes, seconds, 100 * seconds / baseTime))
+    return results
+
+#each move ordering heuristic on its own against no ordering at all, and all of them together
+def benchmarkOrdering(depth=4, out=print):
+    heuristics = ["USE_HASH_MOVE", "USE_MVV_LVA", "USE_KILLERS", "USE_HISTORY"]
+    configurations = [("none", {name: False for name in heuristics})]
+    for label, heuristic in zip(["hash move", "mvv-lva", "killers", "history"], heuristics):
+        configurations.append((label, {name: name == heuristic for name in heuristics}))
+    configurations.append(("all", {name: True for name in heuristics}))
+    return compareOptions(configurations, depth, out)
+
+#null-move pruning and late move reductions switched on and off
+def benchmarkPruning(depth=4, out=print):
+    return compareOptions([("none", {"USE_NULL_MOVE": False, "USE_LMR": False}), ("null move", {"USE_NULL_MOVE": True, "USE_LMR": False}),
+                           ("lmr", {"USE_NULL_MOVE": False, "USE_LMR": True}), ("both", {"USE_NULL_MOVE": True, "USE_LMR": True})], depth, out)
+
+#principal variation search and aspiration windows against plain negamax with full windows
+def benchmarkWindows(depth=4, out=print):
+    return compareOptions([("plain", {"USE_PVS": False, "USE_ASPIRATION": False}), ("pvs", {"USE_PVS": True, "USE_ASPIRATION": False}),
+                           ("aspiration", {"USE_PVS": False, "USE_ASPIRATION": True}), ("both", {"USE_PVS": True, "USE_ASPIRATION": True})], depth, out)
+
+#staged move generation in the search against full legal move lists at every node
+def benchmarkStaged(depth=4, out=print):
+    return compareOptions([("full lists", {"USE_STAGED_MOVES": False}), ("staged", {"USE_STAGED_MOVES": True})], depth, out)
+
+#Memory and time of the legal move list of every bench position as Move objects (GameState) and as packed ints
+#(bitboard backend). Allocations are the blocks still held by the list once it is built, temporaries of the generator
+#don't count. Returns {label: (allocations per move, bytes per move, microseconds per move)}
+def benchmarkMoves(repeat=200, out=print):
+    results = {}
+    for label, bitboard, generate in [("Move", False, "getValidMoves"), ("packed", True, "getLegalMoves")]:
+        totalMoves = 0
+        totalBlocks = 0
+        totalBytes = 0
+        totalTime = 0.0
+        for name, fen in BENCH_POSITIONS:
+            generateMoves = getattr(ChessPerft.createGameState(fen, bitboard), generate)
+            generateMoves()
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            moves = generateMoves()
+            after = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            tracemalloc.stop()
+            difference = after.compare_to(before, "filename")
+            blocks = sum(stat.count_diff for stat in difference)
+            size = sum(stat.size_diff for stat in difference)
+            start = time.perf_counter()
+            for i in range(repeat):
+                generateMoves()
+            elapsed = (time.perf_counter() - start) / repeat
+            out("%-7s %-12s %3d moves %5d allocations %7d bytes %7.1fus" % (label, name, len(moves), blocks, size, elapsed * 1e6))
+            totalMoves += len(moves)
+            totalBlocks += blocks
+            totalBytes += size
+            totalTime += elapsed
+        results[label] = (totalBlocks / totalMoves, totalBytes / totalMoves, totalTime * 1e6 / totalMoves)
+        out("%-7s per move: %.2f allocations, %.0f bytes, %.2fus" % ((label,) + results[label]))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Search benchmarks")
+    parser.add_argument("benchmark", choices=["parallel", "stats", "ordering", "pruning", "windows", "staged", "moves"])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    if args.benchmark == "parallel":
+        benchmarkParallel(args.depth, args.workers)
+    elif args.benchmark == "stats":
+        benchmarkStats(args.depth)
+    elif args.benchmark == "ordering":
+        benchmarkOrdering(args.depth)
+    elif args.benchmark == "pruning":
+        benchmarkPruning(args.depth)
+    elif args.benchmark == "windows":
+        benchmarkWindows(args.depth)
+    elif args.benchmark == "staged":
+        benchmarkStaged(args.depth)
+    elif args.benchmark == "moves":
+        benchmarkMoves()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,587 @@
+#Bitboard backend for GameState, 12 piece bitboards plus occupancy behind the same makeMove/undoMove/getValidMoves api
+#squares are numbered row*8 + col with row 0 being the 8th rank, the same layout as GameState.board
+
+from ChessEngine import GameState, Move, CastleRights, zobristPieces, zobristBlackToMove, zobristEnpassant, castleKeys
+from ChessEngine import WKS, WQS, BKS, BQS, UNDO_STACK_SIZE
+from ChessEval import materialValues, positionValues
+from ChessEngine import PIECES, pieceIndex, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, ENPASSANT, CASTLE, PROMOTION
+
+WHITE, BLACK = 0, 1
+
+FULL = (1 << 64) - 1
+FILE_A = sum(1 << (r * 8) for r in range(8))
+FILE_H = FILE_A << 7
+RANK_8 = 0xFF
+RANK_1 = 0xFF << 56
+
+
+def squareBit(r, c):
+    return 1 << (r * 8 + c)
+
+
+#precomputed leaper attacks and sliding rays
+def leaperAttacks(offsets):
+    table = []
+    for sq in range(64):
+        r, c = divmod(sq, 8)
+        bb = 0
+        for dr, dc in offsets:
+            if 0 <= r + dr < 8 and 0 <= c + dc < 8:
+                bb |= squareBit(r + dr, c + dc)
+        table.append(bb)
+    return table
+
+knightAttacks = leaperAttacks(((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)))
+kingAttacks = leaperAttacks(((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)))
+#pawnAttacks[color][sq] is the squares a pawn of that color on sq attacks
+pawnAttacks = [leaperAttacks(((-1, -1), (-1, 1))), leaperAttacks(((1, -1), (1, 1)))]
+
+#rays in directions that increase the square number (blocker is the lowest bit) and that decrease it (highest bit)
+rookPositive = ((1, 0), (0, 1))
+rookNegative = ((-1, 0), (0, -1))
+bishopPositive = ((1, 1), (1, -1))
+bishopNegative = ((-1, -1), (-1, 1))
+
+def rayTable(dr, dc):
+    table = []
+    for sq in range(64):
+        r, c = divmod(sq, 8)
+        bb = 0
+        r, c = r + dr, c + dc
+        while 0 <= r < 8 and 0 <= c < 8:
+            bb |= squareBit(r, c)
+            r, c = r + dr, c + dc
+        table.append(bb)
+    return table
+
+rays = {d: rayTable(*d) for d in rookPositive + rookNegative + bishopPositive + bishopNegative}
+rookRaysPositive = [rays[d] for d in rookPositive]
+rookRaysNegative = [rays[d] for d in rookNegative]
+bishopRaysPositive = [rays[d] for d in bishopPositive]
+bishopRaysNegative = [rays[d] for d in bishopNegative]
+rookLines = [rays[(1, 0)][sq] | rays[(0, 1)][sq] | rays[(-1, 0)][sq] | rays[(0, -1)][sq] for sq in range(64)]
+bishopLines = [rays[(1, 1)][sq] | rays[(1, -1)][sq] | rays[(-1, -1)][sq] | rays[(-1, 1)][sq] for sq in range(64)]
+
+#between[a][b] is the squares strictly between two aligned squares, 0 if they don't share a line
+between = [[0] * 64 for sq in range(64)]
+for d, table in rays.items():
+    for a in range(64):
+        ray = table[a]
+        bb = ray
+        while bb:
+            b = (bb & -bb).bit_length() - 1
+            bb &= bb - 1
+            between[a][b] = ray & ~table[b] & ~(1 << b)
+
+def rookAttacks(sq, occ):
+    attacks = 0
+    for table in rookRaysPositive:
+        ray = table[sq]
+        blockers = ray & occ
+        if blockers:
+            ray ^= table[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for table in rookRaysNegative:
+        ray = table[sq]
+        blockers = ray & occ
+        if blockers:
+            ray ^= table[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+def bishopAttacks(sq, occ):
+    attacks = 0
+    for table in bishopRaysPositive:
+        ray = table[sq]
+        blockers = ray & occ
+        if blockers:
+            ray ^= table[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for table in bishopRaysNegative:
+        ray = table[sq]
+        blockers = ray & occ
+        if blockers:
+            ray ^= table[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+#castle rights kept after a piece moves from or to each square
+castleMask = [WKS | WQS | BKS | BQS] * 64
+castleMask[0] &= ~BQS
+castleMask[7] &= ~BKS
+castleMask[4] &= ~(BKS | BQS)
+castleMask[56] &= ~WQS
+castleMask[63] &= ~WKS
+castleMask[60] &= ~(WKS | WQS)
+
+#zobrist keys shared with GameState so both backends hash a position the same way
+zobrist = [[zobristPieces[piece][sq // 8][sq % 8] for sq in range(64)] for piece in PIECES]
+
+#incremental evaluation tables by piece index and square
+materialByIndex = [materialValues[piece] for piece in PIECES]
+positionByIndex = [[positionValues[piece][sq // 8][sq % 8] for sq in range(64)] for piece in PIECES]
+
+
+class BitboardGameState():
+    def __init__(self, gs=None):
+        if gs is None:
+            gs = GameState()
+        self.pieceBB = [0] * 12
+        self.colorBB = [0, 0]
+        self.squares = [-1] * 64 #piece index on each square, -1 if empty
+        for r in range(8):
+            for c in range(8):
+                if gs.board[r][c] != "--":
+                    self.putPiece(pieceIndex[gs.board[r][c]], r * 8 + c)
+        self.occupied = self.colorBB[WHITE] | self.colorBB[BLACK]
+        self.whiteToMove = gs.whiteToMove
+        self.castleRights = gs.currentCastlingRight.getBits()
+        ep = gs.enpassantPossible
+        self.epSquare = ep[0] * 8 + ep[1] if ep != () else -1
+        self.counter = gs.counter
+        self.checkMate = False
+        self.staleMate = False
+        self.moveLog = []
+        self.zobristKey = self.computeZobristKey()
+        self.materialScore, self.positionScore = self.computeEvalScores()
+        #one reusable record per move made: [packed move, castle rights, en-passant square, counter, zobrist key,
+        #material score, position score]
+        self.undoStack = [[0, 0, -1, 0, 0, 0, 0] for i in range(UNDO_STACK_SIZE)]
+        self.ply = 0
+
+    def putPiece(self, piece, sq):
+        bit = 1 << sq
+        self.pieceBB[piece] |= bit
+        self.colorBB[piece // 6] |= bit
+        self.squares[sq] = piece
+
+    #compatibility view for code that reads GameState.board, e.g. ChessMain.BoardRenderer and ChessAI.scoreBoard
+    @property
+    def board(self):
+        squares = self.squares
+        return [[PIECES[squares[r * 8 + c]] if squares[r * 8 + c] != -1 else "--" for c in range(8)] for r in range(8)]
+
+    @property
+    def pieceCount(self):
+        return bin(self.occupied).count("1")
+
+    @property
+    def whiteKingLocation(self):
+        return divmod(self.pieceBB[5].bit_length() - 1, 8)
+
+    @property
+    def blackKingLocation(self):
+        return divmod(self.pieceBB[11].bit_length() - 1, 8)
+
+    @property
+    def currentCastlingRight(self):
+        bits = self.castleRights
+        return CastleRights(bool(bits & WKS), bool(bits & BKS), bool(bits & WQS), bool(bits & BQS))
+
+    def computeZobristKey(self):
+        key = 0
+        for sq in range(64):
+            if self.squares[sq] != -1:
+                key ^= zobrist[self.squares[sq]][sq]
+        if not self.whiteToMove:
+            key ^= zobristBlackToMove
+        if self.epSquare != -1:
+            key ^= zobristEnpassant[self.epSquare % 8]
+        return key ^ castleKeys[self.castleRights]
+
+    def computeEvalScores(self):
+        material = 0
+        position = 0
+        for sq in range(64):
+            if self.squares[sq] != -1:
+                material += materialByIndex[self.squares[sq]]
+                position += positionByIndex[self.squares[sq]][sq]
+        return material, position
+
+    def repetitionCount(self):
+        count = 1
+        for i in range(self.ply - 2, max(self.ply - self.counter, 0) - 1, -2):
+            if self.undoStack[i][4] == self.zobristKey:
+                count += 1
+        return count
+
+    #True if any piece of color attacks sq with the given occupancy
+    def attacked(self, sq, color, occ):
+        pieceBB = self.pieceBB
+        base = color * 6
+        if knightAttacks[sq] & pieceBB[base + KNIGHT] or kingAttacks[sq] & pieceBB[base + KING] or \
+                pawnAttacks[color ^ 1][sq] & pieceBB[base + PAWN]:
+            return True
+        if rookAttacks(sq, occ) & (pieceBB[base + ROOK] | pieceBB[base + QUEEN]):
+            return True
+        return bishopAttacks(sq, occ) & (pieceBB[base + BISHOP] | pieceBB[base + QUEEN]) != 0
+
+    def squareUnderAttack(self, r, c):
+        return self.attacked(r * 8 + c, BLACK if self.whiteToMove else WHITE, self.occupied)
+
+    def inCheck(self):
+        us = WHITE if self.whiteToMove else BLACK
+        return self.attacked(self.pieceBB[us * 6 + KING].bit_length() - 1, us ^ 1, self.occupied)
+
+    #All legal moves as packed ints (see ChessEngine.packMove), pins and checkers are found once from the king square
+    def getLegalMoves(self):
+        us = WHITE if self.whiteToMove else BLACK
+        them = us ^ 1
+        pieceBB = self.pieceBB
+        squares = self.squares
+        occ = self.occupied
+        own = self.colorBB[us]
+        enemy = self.colorBB[them]
+        base = us * 6
+        enemyBase = them * 6
+        kingSq = pieceBB[base + KING].bit_length() - 1
+        moves = []
+        append = moves.append
+
+        enemyRooks = pieceBB[enemyBase + ROOK] | pieceBB[enemyBase + QUEEN]
+        enemyBishops = pieceBB[enemyBase + BISHOP] | pieceBB[enemyBase + QUEEN]
+        checkers = (knightAttacks[kingSq] & pieceBB[enemyBase + KNIGHT]) | \
+                   (pawnAttacks[us][kingSq] & pieceBB[enemyBase + PAWN]) | \
+                   (rookAttacks(kingSq, occ) & enemyRooks) | (bishopAttacks(kingSq, occ) & enemyBishops)
+
+        #king moves, tested with the king removed from the occupancy
+        kingOcc = occ ^ (1 << kingSq)
+        targets = kingAttacks[kingSq] & ~own
+        while targets:
+            bit = targets & -targets
+            targets ^= bit
+            to = bit.bit_length() - 1
+            if not self.attacked(to, them, kingOcc):
+                append(kingSq | to << 6 | (squares[to] + 1) << 17)
+
+        if checkers & (checkers - 1):
+            return moves #double check, only the king can move
+
+        if checkers:
+            checkerSq = checkers.bit_length() - 1
+            targetMask = between[kingSq][checkerSq] | checkers
+        else:
+            targetMask = FULL
+            self.getCastleMoves(kingSq, us, occ, append)
+
+        #pinned pieces may only move between the king and the pinning piece
+        pinned = {}
+        snipers = (rookLines[kingSq] & enemyRooks) | (bishopLines[kingSq] & enemyBishops)
+        while snipers:
+            bit = snipers & -snipers
+            snipers ^= bit
+            sniperSq = bit.bit_length() - 1
+            blockers = between[kingSq][sniperSq] & occ
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned[blockers.bit_length() - 1] = between[kingSq][sniperSq] | bit
+
+        empty = ~occ & FULL
+        quietMask = empty & targetMask
+        captureMask = enemy & targetMask
+
+        #knights, bishops, rooks and queens
+        for pieceType, attackFunction in ((KNIGHT, None), (BISHOP, bishopAttacks), (ROOK, rookAttacks), (QUEEN, None)):
+            bb = pieceBB[base + pieceType]
+            while bb:
+                bit = bb & -bb
+                bb ^= bit
+                start = bit.bit_length() - 1
+                if pieceType == KNIGHT:
+                    if start in pinned:
+                        continue
+                    attacks = knightAttacks[start]
+                elif pieceType == QUEEN:
+                    attacks = rookAttacks(start, occ) | bishopAttacks(start, occ)
+                else:
+                    attacks = attackFunction(start, occ)
+                attacks &= targetMask & ~own
+                if start in pinned:
+                    attacks &= pinned[start]
+                while attacks:
+                    bit = attacks & -attacks
+                    attacks ^= bit
+                    to = bit.bit_length() - 1
+                    append(start | to << 6 | (squares[to] + 1) << 17)
+
+        #pawns
+        pawns = pieceBB[base + PAWN]
+        if us == WHITE:
+            forward, startRank, promotionRank = -8, 0xFF << 40, RANK_8
+            single = (pawns >> 8) & empty
+            double = ((single & startRank) >> 8) & quietMask
+            leftCaptures = ((pawns & ~FILE_A) >> 9) & captureMask
+            rightCaptures = ((pawns & ~FILE_H) >> 7) & captureMask
+            leftShift, rightShift = -9, -7
+        else:
+            forward, startRank, promotionRank = 8, 0xFF << 16, RANK_1
+            single = (pawns << 8) & empty
+            double = ((single & startRank) << 8) & quietMask & FULL
+            leftCaptures = ((pawns & ~FILE_A) << 7) & captureMask & FULL
+            rightCaptures = ((pawns & ~FILE_H) << 9) & captureMask & FULL
+            leftShift, rightShift = 7, 9
+        single &= quietMask
+        for targets, shift in ((single, forward), (double, 2 * forward), (leftCaptures, leftShift), (rightCaptures, rightShift)):
+            while targets:
+                bit = targets & -targets
+                targets ^= bit
+                to = bit.bit_length() - 1
+                start = to - shift
+                if start in pinned and not pinned[start] & bit:
+                    continue
+                captured = (squares[to] + 1) << 17
+                if bit & promotionRank:
+                    for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                        append(start | to << 6 | PROMOTION << 12 | promotion << 14 | captured)
+                else:
+                    append(start | to << 6 | captured)
+
+        #en passant, both pawns leave the rank so the king is tested with the resulting occupancy
+        if self.epSquare != -1:
+            ep = self.epSquare
+            capturedSq = ep - forward
+            attackers = pawnAttacks[them][ep] & pawns
+            while attackers:
+                bit = attackers & -attackers
+                attackers ^= bit
+                start = bit.bit_length() - 1
+                epOcc = (occ ^ bit ^ (1 << capturedSq)) | (1 << ep)
+                if checkers and not checkers & (1 << capturedSq) and not between[kingSq][checkers.bit_length() - 1] & (1 << ep):
+                    continue
+                if rookAttacks(kingSq, epOcc) & enemyRooks or bishopAttacks(kingSq, epOcc) & enemyBishops:
+                    continue
+                append(start | ep << 6 | ENPASSANT << 12 | (enemyBase + PAWN + 1) << 17)
+        return moves
+
+    def getCastleMoves(self, kingSq, us, occ, append):
+        rights = self.castleRights
+        if us == WHITE:
+            kingSide, queenSide = rights & WKS, rights & WQS
+        else:
+            kingSide, queenSide = rights & BKS, rights & BQS
+        them = us ^ 1
+        if kingSide and not occ & (6 << kingSq) and \
+                not self.attacked(kingSq + 1, them, occ) and not self.attacked(kingSq + 2, them, occ):
+            append(kingSq | (kingSq + 2) << 6 | CASTLE << 12)
+        if queenSide and not occ & (7 << (kingSq - 3)) and \
+                not self.attacked(kingSq - 1, them, occ) and not self.attacked(kingSq - 2, them, occ):
+            append(kingSq | (kingSq - 2) << 6 | CASTLE << 12)
+
+    def makePackedMove(self, move):
+        start = move & 63
+        to = (move >> 6) & 63
+        flag = (move >> 12) & 3
+        pieceBB = self.pieceBB
+        colorBB = self.colorBB
+        squares = self.squares
+        piece = squares[start]
+        color = piece // 6
+        key = self.zobristKey ^ zobristBlackToMove ^ castleKeys[self.castleRights]
+        if self.epSquare != -1:
+            key ^= zobristEnpassant[self.epSquare & 7]
+        if self.ply == len(self.undoStack):
+            self.undoStack.extend([[0, 0, -1, 0, 0, 0, 0] for i in range(len(self.undoStack))])
+        record = self.undoStack[self.ply]
+        self.ply += 1
+        record[0] = move
+        record[1] = self.castleRights
+        record[2] = self.epSquare
+        record[3] = self.counter
+        record[4] = self.zobristKey
+        record[5] = self.materialScore
+        record[6] = self.positionScore
+
+        captured = (move >> 17) - 1
+        if captured != -1:
+            capturedSq = to if flag != ENPASSANT else to + (8 if color == WHITE else -8)
+            capturedBit = 1 << capturedSq
+            pieceBB[captured] ^= capturedBit
+            colorBB[color ^ 1] ^= capturedBit
+            squares[capturedSq] = -1
+            key ^= zobrist[captured][capturedSq]
+            self.materialScore -= materialByIndex[captured]
+            self.positionScore -= positionByIndex[captured][capturedSq]
+
+        moveBits = (1 << start) | (1 << to)
+        pieceBB[piece] ^= 1 << start
+        colorBB[color] ^= moveBits
+        squares[start] = -1
+        key ^= zobrist[piece][start]
+        position = self.positionScore - positionByIndex[piece][start]
+        if flag == PROMOTION:
+            self.materialScore -= materialByIndex[piece]
+            piece = color * 6 + ((move >> 14) & 7)
+            self.materialScore += materialByIndex[piece]
+        pieceBB[piece] |= 1 << to
+        squares[to] = piece
+        key ^= zobrist[piece][to]
+        position += positionByIndex[piece][to]
+
+        if flag == CASTLE:
+            if to > start:
+                rookStart, rookEnd = start + 3, start + 1
+            else:
+                rookStart, rookEnd = start - 4, start - 1
+            rook = color * 6 + ROOK
+            rookBits = (1 << rookStart) | (1 << rookEnd)
+            pieceBB[rook] ^= rookBits
+            colorBB[color] ^= rookBits
+            squares[rookStart] = -1
+            squares[rookEnd] = rook
+            key ^= zobrist[rook][rookStart] ^ zobrist[rook][rookEnd]
+            position += positionByIndex[rook][rookEnd] - positionByIndex[rook][rookStart]
+
+        self.occupied = colorBB[0] | colorBB[1]
+        self.positionScore = position
+        if piece % 6 == PAWN and abs(to - start) == 16:
+            self.epSquare = (start + to) // 2
+            key ^= zobristEnpassant[start & 7]
+        else:
+            self.epSquare = -1
+        self.castleRights &= castleMask[start] & castleMask[to]
+        key ^= castleKeys[self.castleRights]
+        if captured != -1 or squares[to] % 6 == PAWN or flag == PROMOTION:
+            self.counter = 0
+        else:
+            self.counter += 1
+        self.whiteToMove = not self.whiteToMove
+        self.zobristKey = key
+
+    def undoPackedMove(self):
+        self.ply -= 1
+        move, self.castleRights, self.epSquare, self.counter, self.zobristKey, self.materialScore, self.positionScore = self.undoStack[self.ply]
+        self.whiteToMove = not self.whiteToMove
+        start = move & 63
+        to = (move >> 6) & 63
+        flag = (move >> 12) & 3
+        pieceBB = self.pieceBB
+        colorBB = self.colorBB
+        squares = self.squares
+        piece = squares[to]
+        color = piece // 6
+        pieceBB[piece] ^= 1 << to
+        if flag == PROMOTION:
+            piece = color * 6 + PAWN
+        pieceBB[piece] |= 1 << start
+        colorBB[color] ^= (1 << start) | (1 << to)
+        squares[to] = -1
+        squares[start] = piece
+
+        captured = (move >> 17) - 1
+        if captured != -1:
+            capturedSq = to if flag != ENPASSANT else to + (8 if color == WHITE else -8)
+            pieceBB[captured] |= 1 << capturedSq
+            colorBB[color ^ 1] |= 1 << capturedSq
+            squares[capturedSq] = captured
+
+        if flag == CASTLE:
+            if to > start:
+                rookStart, rookEnd = start + 3, start + 1
+            else:
+                rookStart, rookEnd = start - 4, start - 1
+            rook = color * 6 + ROOK
+            rookBits = (1 << rookStart) | (1 << rookEnd)
+            pieceBB[rook] ^= rookBits
+            colorBB[color] ^= rookBits
+            squares[rookEnd] = -1
+            squares[rookStart] = rook
+        self.occupied = colorBB[0] | colorBB[1]
+
+    #GameState api, moves are ChessEngine.Move objects with one move per promotion square
+    def getValidMoves(self):
+        self.checkMate = False
+        self.staleMate = False
+        board = self.board
+        moves = []
+        for packed in self.getLegalMoves():
+            if (packed >> 12) & 3 == PROMOTION and (packed >> 14) & 7 != QUEEN:
+                continue
+            moves.append(Move.fromPacked(packed, board))
+
+        if len(moves) == 0:
+            if self.inCheck():
+                self.checkMate = True
+            else:
+                self.staleMate = True
+            return moves
+        if self.counter == 100 or self.repetitionCount() >= 3 or self.insufficientMaterial():
+            self.staleMate = True
+        return moves
+
+    #only kings and at most one knight or bishop per side
+    def insufficientMaterial(self):
+        pieceBB = self.pieceBB
+        if pieceBB[0] | pieceBB[3] | pieceBB[4] | pieceBB[6] | pieceBB[9] | pieceBB[10]:
+            return False
+        white = pieceBB[1] | pieceBB[2]
+        black = pieceBB[7] | pieceBB[8]
+        return not white & (white - 1) and not black & (black - 1)
+
+    def isDrawByRule(self):
+        return self.counter >= 100 or self.repetitionCount() >= 3 or self.insufficientMaterial()
+
+    #null move for the search, same rules as GameState.makeNullMove: the counter restarts so no repetition is seen
+    #across it
+    def makeNullMove(self):
+        if self.ply == len(self.undoStack):
+            self.undoStack.extend([[0, 0, -1, 0, 0, 0, 0] for i in range(len(self.undoStack))])
+        record = self.undoStack[self.ply]
+        self.ply += 1
+        record[2] = self.epSquare
+        record[3] = self.counter
+        record[4] = self.zobristKey
+        self.zobristKey ^= zobristBlackToMove
+        if self.epSquare != -1:
+            self.zobristKey ^= zobristEnpassant[self.epSquare & 7]
+            self.epSquare = -1
+        self.counter = 0
+        self.whiteToMove = not self.whiteToMove
+
+    def undoNullMove(self):
+        self.ply -= 1
+        record = self.undoStack[self.ply]
+        self.epSquare = record[2]
+        self.counter = record[3]
+        self.zobristKey = record[4]
+        self.whiteToMove = not self.whiteToMove
+        self.checkMate = False
+        self.staleMate = False
+
+    #color is "w" or "b" like GameState.hasNonPawnMaterial
+    def hasNonPawnMaterial(self, color):
+        base = 0 if color == "w" else 6
+        pieceBB = self.pieceBB
+        return (pieceBB[base + KNIGHT] | pieceBB[base + BISHOP] | pieceBB[base + ROOK] | pieceBB[base + QUEEN]) != 0
+
+    #Staged move generation api of GameState (see ChessAI.Searcher.stagedMoves). The stages are filtered from the legal
+    #moves, so every move they return is legal already. Promotions count as captures and only promote to a queen
+    def getCaptureMoves(self):
+        board = self.board
+        return [Move.fromPacked(packed, board) for packed in self.getLegalMoves()
+                if (packed >> 17 or (packed >> 12) & 3 == PROMOTION) and (packed >> 14) & 7 in (0, QUEEN)]
+
+    def getQuietMoves(self):
+        board = self.board
+        return [Move.fromPacked(packed, board) for packed in self.getLegalMoves()
+                if not packed >> 17 and (packed >> 12) & 3 != PROMOTION]
+
+    def getMoveFromID(self, moveID):
+        start = moveID // 1000 * 8 + moveID // 100 % 10
+        end = moveID // 10 % 10 * 8 + moveID % 10
+        for packed in self.getLegalMoves():
+            if packed & 63 == start and (packed >> 6) & 63 == end and (packed >> 14) & 7 in (0, QUEEN):
+                return Move.fromPacked(packed, self.board)
+        return None
+
+    def isLegalMove(self, move):
+        return True
+
+    def makeMove(self, move, promoteValue=""):
+        self.makePackedMove(move.getPacked(promoteValue))
+        self.moveLog.append(move)
+
+    def undoMove(self):
+        if len(self.moveLog) != 0:
+            self.moveLog.pop()
+            self.undoPackedMove()
+            self.checkMate = False
+            self.staleMate = False
@@ -0,0 +1,204 @@
+#Opening book in the Polyglot layout: sorted 16 byte entries of key (8 bytes), move (2), weight (2) and learn (4), big endian.
+#Keys are this engine's zobrist keys (GameState.zobristKey), so books are built with this module rather than taken from
+#other Polyglot tools. The file is memory-mapped read only and binary searched, so every engine process using the same
+#book shares one copy of it in the OS page cache
+#usage: python ChessBook.py build games.pgn [more.pgn ...] book.bin [--plies 20] [--min-games 1]
+#       python ChessBook.py probe book.bin [FEN]
+
+import argparse, mmap, os, random, re, struct
+import ChessEngine
+
+ENTRY = struct.Struct(">QHHI")
+BOOK_PLIES = 20
+MAX_WEIGHT = 65535
+
+#polyglot move: to file | to rank << 3 | from file << 6 | from rank << 9 | promotion << 12, castling is king takes rook
+promotionCodes = {"": 0, "N": 1, "B": 2, "R": 3, "Q": 4}
+
+def encodeMove(move, promoteValue=""):
+    endCol = move.endCol
+    if move.isCastle:
+        endCol = 7 if move.endCol > move.startCol else 0
+    promotion = promotionCodes[promoteValue if promoteValue != "" or not move.isPawnPromotion else "Q"]
+    return endCol | (7 - move.endRow) << 3 | move.startCol << 6 | (7 - move.startRow) << 9 | promotion << 12
+
+class OpeningBook():
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.size = os.path.getsize(path) // ENTRY.size
+        #mmap can't map an empty file
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size > 0 else b""
+
+    def close(self):
+        if self.size > 0:
+            self.data.close()
+        self.file.close()
+
+    def getKey(self, i):
+        return struct.unpack_from(">Q", self.data, i * ENTRY.size)[0]
+
+    #[(polyglot move, weight)] of every entry for key
+    def getEntries(self, key):
+        low = 0
+        high = self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self.getKey(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        entries = []
+        while low < self.size:
+            entryKey, move, weight, learn = ENTRY.unpack_from(self.data, low * ENTRY.size)
+            if entryKey != key:
+                break
+            entries.append((move, weight))
+            low += 1
+        return entries
+
+    #[(Move, promoteValue, weight)] of the book moves that are legal in the position
+    def getBookMoves(self, gs, validMoves):
+        entries = self.getEntries(gs.zobristKey)
+        if len(entries) == 0:
+            return []
+        moves = {}
+        for move in validMoves:
+            for promoteValue in ("QRBN" if move.isPawnPromotion else [""]):
+                moves[encodeMove(move, promoteValue)] = (move, promoteValue)
+        return [moves[code] + (weight,) for code, weight in entries if code in moves and weight > 0]
+
+    #weighted random book move as (Move, promoteValue), None when the position isn't in the book
+    def getBookMove(self, gs, validMoves):
+        bookMoves = self.getBookMoves(gs, validMoves)
+        if len(bookMoves) == 0:
+            return None
+        pick = random.randint(1, sum(weight for move, promoteValue, weight in bookMoves))
+        for move, promoteValue, weight in bookMoves:
+            pick -= weight
+            if pick <= 0:
+                return move, promoteValue
+
+#Move for a move in standard algebraic notation (Nf3, exd5, O-O, e8=Q+) as (Move, promoteValue), None if it isn't legal
+sanPattern = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+
+def parseSan(gs, san, validMoves):
+    san = san.rstrip("+#!?").replace("0", "O")
+    if san in ("O-O", "O-O-O"):
+        for move in validMoves:
+            if move.isCastle and (move.endCol == 6) == (san == "O-O"):
+                return move, ""
+        return None
+    match = sanPattern.match(san)
+    if match is None:
+        return None
+    piece, fromFile, fromRank, to, promoteValue = match.groups()
+    piece = piece or "p"
+    endRow = ChessEngine.Move.ranksToRows[to[1]]
+    endCol = ChessEngine.Move.filestoCols[to[0]]
+    for move in validMoves:
+        if move.endRow != endRow or move.endCol != endCol or move.pieceMoved[1] != piece or move.isCastle:
+            continue
+        if fromFile is not None and move.startCol != ChessEngine.Move.filestoCols[fromFile]:
+            continue
+        if fromRank is not None and move.startRow != ChessEngine.Move.ranksToRows[fromRank]:
+            continue
+        return move, promoteValue or ""
+    return None
+
+#yields (result, [san moves]) for every game of a PGN file, comments, variations and annotations are skipped
+def readPgnGames(path):
+    result = "*"
+    moveText = []
+    with open(path, errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                if moveText:
+                    yield result, parseMoveText(" ".join(moveText))
+                    moveText = []
+                    result = "*"
+                if line.startswith("[Result "):
+                    result = line.split('"')[1]
+            elif line != "":
+                moveText.append(line)
+    if moveText:
+        yield result, parseMoveText(" ".join(moveText))
+
+def parseMoveText(text):
+    text = re.sub(r"\{[^}]*\}|;[^\n]*", " ", text)
+    #variations can nest, strip the innermost ones until none are left
+    while "(" in text:
+        stripped = re.sub(r"\([^()]*\)", " ", text)
+        if stripped == text:
+            break
+        text = stripped
+    moves = []
+    for token in text.split():
+        token = re.sub(r"^\d+\.+", "", token)
+        if token == "" or token.startswith("$") or token in ("1-0", "0-1", "1/2-1/2", "*"):
+            continue
+        moves.append(token)
+    return moves
+
+#Builds a book from PGN files: every move played in the first plies of a game gets 2 points for a win of the side that
+#played it, 1 for a draw (or an unknown result) and none for a loss. Moves played in fewer than minGames games are left
+#out. Returns the number of entries written
+def buildBook(pgnPaths, bookPath, plies=BOOK_PLIES, minGames=1, out=print):
+    weights = {}
+    games = {}
+    gameCount = 0
+    for path in pgnPaths:
+        for result, sanMoves in readPgnGames(path):
+            gs = ChessEngine.GameState()
+            gameCount += 1
+            for san in sanMoves[:plies]:
+                parsed = parseSan(gs, san, gs.getValidMoves())
+                if parsed is None:
+                    out("game %d: illegal or unreadable move %s, rest of the game skipped" % (gameCount, san))
+                    break
+                move, promoteValue = parsed
+                entry = (gs.zobristKey, encodeMove(move, promoteValue))
+                if result == ("1-0" if gs.whiteToMove else "0-1"):
+                    points = 2
+                elif result == ("0-1" if gs.whiteToMove else "1-0"):
+                    points = 0
+                else:
+                    points = 1
+                weights[entry] = weights.get(entry, 0) + points
+                games[entry] = games.get(entry, 0) + 1
+                gs.makeMove(move, promoteValue=promoteValue)
+    entries = [(key, move, weight) for (key, move), weight in weights.items() if games[(key, move)] >= minGames and weight > 0]
+    scale = max([weight for key, move, weight in entries] + [MAX_WEIGHT]) / MAX_WEIGHT
+    #polyglot order: by key, best move first
+    entries.sort(key=lambda entry: (entry[0], -entry[2]))
+    with open(bookPath, "wb") as f:
+        for key, move, weight in entries:
+            f.write(ENTRY.pack(key, move, max(1, int(weight / scale)), 0))
+    out("%d games, %d book entries written to %s" % (gameCount, len(entries), bookPath))
+    return len(entries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or probe an opening book")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="build a book from PGN files")
+    build.add_argument("paths", nargs="+", help="PGN files followed by the book file to write")
+    build.add_argument("--plies", type=int, default=BOOK_PLIES, help="moves per game that go into the book")
+    build.add_argument("--min-games", type=int, default=1, help="games a move must have been played in")
+    probe = subparsers.add_parser("probe", help="list the book moves of a position")
+    probe.add_argument("book")
+    probe.add_argument("fen", nargs="*", help="position (default: the starting position)")
+    args = parser.parse_args()
+    if args.command == "build":
+        if len(args.paths) < 2:
+            parser.error("build needs at least one PGN file and the book file")
+        buildBook(args.paths[:-1], args.paths[-1], args.plies, args.min_games)
+    else:
+        gs = ChessEngine.GameState.fromFen(" ".join(args.fen)) if args.fen else ChessEngine.GameState()
+        book = OpeningBook(args.book)
+        for move, promoteValue, weight in book.getBookMoves(gs, gs.getValidMoves()):
+            print(move.getCoordinateNotation(promoteValue), weight)
+        book.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,55 +1,194 @@
 #This class is responsible for storing all the information about the current state of a chess game and determine valid moves
 
-import copy
+import random
+from ChessEval import materialValues, positionValues
+
+#zobrist keys for hashing positions, seeded so every process generates the same keys
+zobristRandom = random.Random(20211207)
+zobristPieces = {color + piece: [[zobristRandom.getrandbits(64) for c in range(8)] for r in range(8)]
+                 for color in "wb" for piece in "pRNBQK"}
+zobristBlackToMove = zobristRandom.getrandbits(64)
+zobristCastle = [zobristRandom.getrandbits(64) for i in range(4)] #wks, bks, wqs, bqs
+zobristEnpassant = [zobristRandom.getrandbits(64) for c in range(8)] #one key per en-passant file
+
+#castle rights as bits, castleKeys[bits] is the xor of the zobrist keys of the rights that are set
+WKS, WQS, BKS, BQS = 1, 2, 4, 8
+castleKeys = [(zobristCastle[0] if bits & WKS else 0) ^ (zobristCastle[1] if bits & BKS else 0) ^
+              (zobristCastle[2] if bits & WQS else 0) ^ (zobristCastle[3] if bits & BQS else 0) for bits in range(16)]
+
+#shared (row, col) tuples so king and en-passant squares can be updated without allocating
+squareTuples = [[(r, c) for c in range(8)] for r in range(8)]
+
+#undo records preallocated per game, the stack doubles if a game gets longer
+UNDO_STACK_SIZE = 256
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+#FEN letters to board pieces and back
+fenPieces = {"P": "wp", "N": "wN", "B": "wB", "R": "wR", "Q": "wQ", "K": "wK",
+             "p": "bp", "n": "bN", "b": "bB", "r": "bR", "q": "bQ", "k": "bK"}
+pieceFens = {piece: letter for letter, piece in fenPieces.items()}
+
+#packed integer moves: from square | to square << 6 | flag << 12 | promotion piece type << 14 | (captured piece index + 1) << 17
+#squares are row*8 + col, piece indexes are positions in PIECES and piece types are offsets within a color
+PIECES = ["wp", "wN", "wB", "wR", "wQ", "wK", "bp", "bN", "bB", "bR", "bQ", "bK"]
+pieceIndex = {piece: i for i, piece in enumerate(PIECES)}
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = 0, 1, 2, 3, 4, 5
+NORMAL, ENPASSANT, CASTLE, PROMOTION = 0, 1, 2, 3
+
+#kinds of moves the piece move functions generate. ALL_MOVES are legal, CAPTURES (promotions included) and QUIETS are
+#the stages of the search's move generation and leave king safety and en passant to isLegalMove
+ALL_MOVES, CAPTURES, QUIETS = 0, 1, 2
+
+#the fields are read back with shifts and masks where they are used, a function call per field costs more than the
+#move generation saves
+def packMove(start, to, flag=NORMAL, promotion=0, captured=-1):
+    return start | to << 6 | flag << 12 | promotion << 14 | (captured + 1) << 17
+
+#orthogonal directions first, then diagonal ones
+kingDirections = ((-1, 0), (0, -1), (1, 0), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+knightDirections = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
 
 
 class GameState():
-    def __init__(self):
-        #board is 8x8 2d list, each element of the list has two characters
-        #first character is piece color, second character is type of piece
-        self.board = [
-            ["bR", "bN", "bB", "bQ", "bK", "bB", "bN", "bR"],
-            ["bp" for i in range(8)],
-            ["--" for i in range(8)],
-            ["--" for i in range(8)],
-            ["--" for i in range(8)],
-            ["--" for i in range(8)],
-            ["wp" for i in range(8)],
-            ["wR", "wN", "wB", "wQ", "wK", "wB", "wN", "wR"]]
-        
+    def __init__(self, fen=STARTING_FEN):
         self.moveFunctions = {'p': self.getPawnMoves, 'R': self.getRookMoves, 'B': self.getBishopMoves, 
                               'N': self.getKnightMoves, 'Q': self.getQueenMoves, 'K': self.getKingMoves}
         
-        self.boardLog = [copy.deepcopy(self.board)]
-        self.counter = 0
-        self.counterLog = []
-        self.whiteToMove = True
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError("FEN needs at least 4 fields: " + fen)
+        #board is 8x8 2d list, each element of the list has two characters
+        #first character is piece color, second character is type of piece
+        self.board = [["--"] * 8 for r in range(8)]
+        self.whiteKingLocation = ()
+        self.blackKingLocation = ()
+        #pieces on the board including the kings, kept up to date by makeMove/undoMove
+        self.pieceCount = 0
+        rows = fields[0].split("/")
+        if len(rows) != 8:
+            raise ValueError("FEN board needs 8 ranks: " + fen)
+        for r in range(8):
+            c = 0
+            for ch in rows[r]:
+                if ch in "12345678":
+                    c += int(ch)
+                elif ch in fenPieces and c < 8:
+                    self.board[r][c] = fenPieces[ch]
+                    self.pieceCount += 1
+                    if ch == "K":
+                        self.whiteKingLocation = squareTuples[r][c]
+                    elif ch == "k":
+                        self.blackKingLocation = squareTuples[r][c]
+                    c += 1
+                else:
+                    raise ValueError("bad FEN rank %s: %s" % (rows[r], fen))
+            if c != 8:
+                raise ValueError("bad FEN rank %s: %s" % (rows[r], fen))
+        if self.whiteKingLocation == () or self.blackKingLocation == ():
+            raise ValueError("FEN needs both kings: " + fen)
+        if fields[1] not in ("w", "b"):
+            raise ValueError("bad FEN side to move: " + fen)
+        self.whiteToMove = fields[1] == "w"
+        self.currentCastlingRight = CastleRights("K" in fields[2], "k" in fields[2], "Q" in fields[2], "q" in fields[2])
+        #square where en-passant is possible
+        self.enpassantPossible = ()
+        if fields[3] != "-":
+            if len(fields[3]) != 2 or fields[3][0] not in Move.filestoCols or fields[3][1] not in "36":
+                raise ValueError("bad FEN en-passant square: " + fen)
+            self.enpassantPossible = squareTuples[Move.ranksToRows[fields[3][1]]][Move.filestoCols[fields[3][0]]]
+        #halfmove clock for the fifty move rule
+        self.counter = int(fields[4]) if len(fields) > 4 else 0
+        #plies played before this position, for the fullmove number
+        self.startPly = 2 * (int(fields[5]) - 1) + (0 if self.whiteToMove else 1) if len(fields) > 5 else 0
         self.moveLog = []
-        self.whiteKingLocation = (7, 4)
-        self.blackKingLocation = (0, 4)
         self.checkMate = False
         self.staleMate = False
-        #list of square where en-passant is possible
-        self.enpassantPossible = [()]
-        self.currentCastlingRight = CastleRights(True, True, True, True)
-        self.castleRightsLog = [CastleRights(self.currentCastlingRight.wks, self.currentCastlingRight.bks,
-                                             self.currentCastlingRight.wqs, self.currentCastlingRight.bqs)]
+        #set by getValidMoves
+        self.inCheckNow = False
+        self.pins = {}
+        self.checks = []
+        self.zobristKey = self.computeZobristKey()
+        #material and piece-square score (in tenths) from white's point of view, kept up to date by makeMove/undoMove
+        self.materialScore, self.positionScore = self.computeEvalScores()
+        #one reusable record per move made: [captured piece, castle rights bits, en-passant square, counter, zobrist key,
+        #material score, position score] holding what the move changed, the keys are also the position history for repetition detection.
+        #Allocated on the first move so positions that are only evaluated stay cheap to build
+        self.undoStack = []
+        self.ply = 0
+
+    #position from Forsyth-Edwards Notation, the fullmove number is optional
+    @classmethod
+    def fromFen(cls, fen):
+        return cls(fen)
+
+    #Forsyth-Edwards Notation of the current position
+    def toFen(self):
+        rows = []
+        for r in range(8):
+            row = ""
+            empty = 0
+            for piece in self.board[r]:
+                if piece == "--":
+                    empty += 1
+                else:
+                    if empty > 0:
+                        row += str(empty)
+                        empty = 0
+                    row += pieceFens[piece]
+            if empty > 0:
+                row += str(empty)
+            rows.append(row)
+        castle = self.currentCastlingRight
+        rights = ("K" if castle.wks else "") + ("Q" if castle.wqs else "") + ("k" if castle.bks else "") + ("q" if castle.bqs else "")
+        enpassant = Move.colsToFiles[self.enpassantPossible[1]] + Move.rowsToRanks[self.enpassantPossible[0]] if self.enpassantPossible != () else "-"
+        return "%s %s %s %s %d %d" % ("/".join(rows), "w" if self.whiteToMove else "b", rights if rights != "" else "-",
+                                      enpassant, self.counter, (self.startPly + len(self.moveLog)) // 2 + 1)
 
     def makeMove(self, move, promoteValue=""):
+        if self.ply == len(self.undoStack):
+            self.undoStack.extend([[None, 0, (), 0, 0, 0, 0] for i in range(max(len(self.undoStack), UNDO_STACK_SIZE))])
+        record = self.undoStack[self.ply]
+        self.ply += 1
+        castleBits = self.currentCastlingRight.getBits()
+        record[0] = move.pieceCaptured
+        record[1] = castleBits
+        record[2] = self.enpassantPossible
+        record[3] = self.counter
+        record[4] = self.zobristKey
+        record[5] = self.materialScore
+        record[6] = self.positionScore
+
+        key = self.zobristKey ^ zobristBlackToMove ^ castleKeys[castleBits]
+        if self.enpassantPossible != ():
+            key ^= zobristEnpassant[self.enpassantPossible[1]]
+        key ^= zobristPieces[move.pieceMoved][move.startRow][move.startCol]
+        position = self.positionScore - positionValues[move.pieceMoved][move.startRow][move.startCol]
+        material = self.materialScore
+        if move.isEnpassantMove:
+            key ^= zobristPieces[move.pieceCaptured][move.startRow][move.endCol]
+            material -= materialValues[move.pieceCaptured]
+            position -= positionValues[move.pieceCaptured][move.startRow][move.endCol]
+        elif move.pieceCaptured != "--":
+            key ^= zobristPieces[move.pieceCaptured][move.endRow][move.endCol]
+            material -= materialValues[move.pieceCaptured]
+            position -= positionValues[move.pieceCaptured][move.endRow][move.endCol]
+
         self.board[move.startRow][move.startCol] = "--"
         self.board[move.endRow][move.endCol] = move.pieceMoved
         self.moveLog.append(move) #log move to display history and undo moves
-        self.boardLog.append(copy.deepcopy(self.board))
         self.whiteToMove = not self.whiteToMove
 
         if move.pieceMoved == "wK":
-            self.whiteKingLocation = (move.endRow, move.endCol)
+            self.whiteKingLocation = squareTuples[move.endRow][move.endCol]
         elif move.pieceMoved == "bK":
-            self.blackKingLocation = (move.endRow, move.endCol)
+            self.blackKingLocation = squareTuples[move.endRow][move.endCol]
 
-        #pawn promotion
+        #pawn promotion (queen unless told otherwise)
         if move.isPawnPromotion:
-            self.board[move.endRow][move.endCol] = move.pieceMoved[0] + promoteValue
+            self.board[move.endRow][move.endCol] = move.pieceMoved[0] + (promoteValue if promoteValue != "" else "Q")
+            material += materialValues[self.board[move.endRow][move.endCol]] - materialValues[move.pieceMoved]
+        key ^= zobristPieces[self.board[move.endRow][move.endCol]][move.endRow][move.endCol]
+        position += positionValues[self.board[move.endRow][move.endCol]][move.endRow][move.endCol]
 
         #enpassant move
         if move.isEnpassantMove:
@@ -57,25 +196,33 @@ class GameState():
 
         #update enpassant possible square
         if move.pieceMoved[1] == 'p' and abs(move.startRow - move.endRow) == 2:
-            self.enpassantPossible.append(((move.startRow + move.endRow)//2, move.startCol))
+            self.enpassantPossible = squareTuples[(move.startRow + move.endRow)//2][move.startCol]
+            key ^= zobristEnpassant[move.startCol]
         else:
-            self.enpassantPossible.append(())
+            self.enpassantPossible = ()
 
         #castle move
         if move.isCastle:
+            rook = move.pieceMoved[0] + "R"
             if move.endCol - move.startCol == 2:
                 self.board[move.endRow][move.endCol-1] = self.board[move.endRow][move.endCol+1]
                 self.board[move.endRow][move.endCol+1] = "--"
+                key ^= zobristPieces[rook][move.endRow][move.endCol+1] ^ zobristPieces[rook][move.endRow][move.endCol-1]
+                position += positionValues[rook][move.endRow][move.endCol-1] - positionValues[rook][move.endRow][move.endCol+1]
             else:
                 self.board[move.endRow][move.endCol+1] = self.board[move.endRow][move.endCol-2]
                 self.board[move.endRow][move.endCol-2] = "--"
+                key ^= zobristPieces[rook][move.endRow][move.endCol-2] ^ zobristPieces[rook][move.endRow][move.endCol+1]
+                position += positionValues[rook][move.endRow][move.endCol+1] - positionValues[rook][move.endRow][move.endCol-2]
 
         #update Castle Rights
         self.updateCastleRights(move)
-        self.castleRightsLog.append(CastleRights(self.currentCastlingRight.wks, self.currentCastlingRight.bks,
-                                                 self.currentCastlingRight.wqs, self.currentCastlingRight.bqs))
+        self.zobristKey = key ^ castleKeys[self.currentCastlingRight.getBits()]
+        self.materialScore = material
+        self.positionScore = position
 
-        self.counterLog.append(self.counter)
+        if move.pieceCaptured != "--":
+            self.pieceCount -= 1
         if move.pieceCaptured != "--" or move.pieceMoved[1] == "p":
             self.counter = 0
         else:
@@ -85,24 +232,29 @@ class GameState():
     def undoMove(self):
         if len(self.moveLog) != 0:
             move = self.moveLog.pop()
+            self.ply -= 1
+            record = self.undoStack[self.ply]
             self.board[move.startRow][move.startCol] = move.pieceMoved
-            self.board[move.endRow][move.endCol] = move.pieceCaptured
+            self.board[move.endRow][move.endCol] = record[0]
             self.whiteToMove = not self.whiteToMove
+            if record[0] != "--":
+                self.pieceCount += 1
 
             if move.pieceMoved == "wK":
-                self.whiteKingLocation = (move.startRow, move.startCol)
+                self.whiteKingLocation = squareTuples[move.startRow][move.startCol]
             elif move.pieceMoved == "bK":
-                self.blackKingLocation = (move.startRow, move.startCol)
+                self.blackKingLocation = squareTuples[move.startRow][move.startCol]
 
             if move.isEnpassantMove:
-                self.board[move.startRow][move.endCol] = move.pieceCaptured
+                self.board[move.startRow][move.endCol] = record[0]
                 self.board[move.endRow][move.endCol] = "--"
 
-            self.enpassantPossible.pop()
-            self.castleRightsLog.pop()
-            self.boardLog.pop()
-            self.counter = self.counterLog.pop()
-            self.currentCastlingRight = CastleRights(self.castleRightsLog[-1].wks, self.castleRightsLog[-1].bks, self.castleRightsLog[-1].wqs, self.castleRightsLog[-1].bqs)
+            self.currentCastlingRight.setBits(record[1])
+            self.enpassantPossible = record[2]
+            self.counter = record[3]
+            self.zobristKey = record[4]
+            self.materialScore = record[5]
+            self.positionScore = record[6]
 
             if move.isCastle:
                 if move.endCol - move.startCol == 2:
@@ -115,6 +267,75 @@ class GameState():
             self.checkMate = False
             self.staleMate = False
 
+    #passes the turn for null-move pruning, the halfmove counter restarts so no repetition is seen across the null move
+    def makeNullMove(self):
+        if self.ply == len(self.undoStack):
+            self.undoStack.extend([[None, 0, (), 0, 0, 0, 0] for i in range(max(len(self.undoStack), UNDO_STACK_SIZE))])
+        record = self.undoStack[self.ply]
+        self.ply += 1
+        record[2] = self.enpassantPossible
+        record[3] = self.counter
+        record[4] = self.zobristKey
+        self.zobristKey ^= zobristBlackToMove
+        if self.enpassantPossible != ():
+            self.zobristKey ^= zobristEnpassant[self.enpassantPossible[1]]
+            self.enpassantPossible = ()
+        self.counter = 0
+        self.whiteToMove = not self.whiteToMove
+
+    def undoNullMove(self):
+        self.ply -= 1
+        record = self.undoStack[self.ply]
+        self.enpassantPossible = record[2]
+        self.counter = record[3]
+        self.zobristKey = record[4]
+        self.whiteToMove = not self.whiteToMove
+        self.checkMate = False
+        self.staleMate = False
+
+    #True if color ("w" or "b") has a piece other than pawns and the king, null moves aren't tried without one
+    #because king and pawn endings are full of zugzwang
+    def hasNonPawnMaterial(self, color):
+        for row in self.board:
+            for piece in row:
+                if piece[0] == color and piece[1] != "p" and piece[1] != "K":
+                    return True
+        return False
+
+    #full zobrist key of the current position (makeMove/undoMove keep it up to date incrementally)
+    def computeZobristKey(self):
+        key = 0
+        for r in range(8):
+            for c in range(8):
+                if self.board[r][c] != "--":
+                    key ^= zobristPieces[self.board[r][c]][r][c]
+        if not self.whiteToMove:
+            key ^= zobristBlackToMove
+        if self.enpassantPossible != ():
+            key ^= zobristEnpassant[self.enpassantPossible[1]]
+        return key ^ castleKeys[self.currentCastlingRight.getBits()]
+
+    #full material and piece-square scores of the current position
+    def computeEvalScores(self):
+        material = 0
+        position = 0
+        for r in range(8):
+            for c in range(8):
+                piece = self.board[r][c]
+                if piece != "--":
+                    material += materialValues[piece]
+                    position += positionValues[piece][r][c]
+        return material, position
+
+    #number of times the current position has occured, only positions since the last capture
+    #or pawn move with the same side to move can be repeats
+    def repetitionCount(self):
+        count = 1
+        for i in range(self.ply - 2, max(self.ply - self.counter, 0) - 1, -2):
+            if self.undoStack[i][4] == self.zobristKey:
+                count += 1
+        return count
+
     #updates castle rights on a given move
     def updateCastleRights(self, move):
         if move.pieceMoved == "wK":
@@ -149,23 +370,34 @@ class GameState():
                     self.currentCastlingRight.bks = False
 
     #All moves concidering checks
+    #pins and checks are found once from the king outward so only legal moves are generated,
+    #king moves and en passant are the only moves that need extra work
     def getValidMoves(self):
-        #1 generate all possible moves
-        moves = self.getAllPossibleMoves()
-        #2 for each move, make the move
-        for i in range(len(moves)-1, -1, -1):
-            self.makeMove(moves[i])
-            #3 generate all possible opponent moves
-            #4 for each of your opponents moves see if they attack king
-            self.whiteToMove = not self.whiteToMove
-            if self.inCheck():
-                #5 if they attack king then its not a vliad move
-                moves.remove(moves[i])
-            self.whiteToMove = not self.whiteToMove
-            self.undoMove()
-        
+        self.checkMate = False
+        self.staleMate = False
+        self.inCheckNow, self.pins, self.checks = self.checkForPinsAndChecks()
+        kingRow, kingCol = self.whiteKingLocation if self.whiteToMove else self.blackKingLocation
+        if len(self.checks) > 1:
+            #double check, only the king can move
+            moves = []
+            self.getKingMoves(kingRow, kingCol, moves)
+        else:
+            moves = self.getAllPossibleMoves()
+            if self.inCheckNow:
+                #single check, the king moves or a piece blocks the check or captures the checking piece
+                checkRow, checkCol, dr, dc = self.checks[0]
+                validSquares = {(checkRow, checkCol)}
+                if self.board[checkRow][checkCol][1] != 'N':
+                    for i in range(1, 8):
+                        square = (kingRow + dr * i, kingCol + dc * i)
+                        validSquares.add(square)
+                        if square == (checkRow, checkCol):
+                            break
+                moves = [move for move in moves if move.pieceMoved[1] == 'K' or move.isEnpassantMove
+                         or (move.endRow, move.endCol) in validSquares]
+
         if len(moves) == 0:
-            if self.inCheck():
+            if self.inCheckNow:
                 self.checkMate = True
                 return moves
             else:
@@ -176,27 +408,124 @@ class GameState():
             self.staleMate = True
             return moves
 
-        if self.boardLog.count(self.board) == 3:
+        if self.repetitionCount() >= 3:
             self.staleMate = True
             return moves
         
+        if not self.insufficientMaterial():
+            return moves
+                    
+        self.staleMate = True
+        return moves
+
+    #True if neither side has more than one minor piece and nothing else besides the king
+    def insufficientMaterial(self):
         bcounter = 0
         wcounter = 0
         for r in range(8):
             for c in range(8):
                 if self.board[r][c] not in ["wK", "bK", "--", "wB", "wN", "bB", "bN"]:
-                    return moves
+                    return False
                 else:
                     if self.board[r][c] in ["wB", "wN"]:
                         wcounter = wcounter + 1
                     elif self.board[r][c] in ["bB", "bN"]:
                         bcounter = bcounter + 1
                     if wcounter == 2 or bcounter == 2:
-                        return moves
-                    
-        self.staleMate = True
-        print("1/2-1/2")
-        return moves
+                        return False
+        return True
+
+    #the draws getValidMoves finds besides stalemate: fifty moves, threefold repetition and insufficient material
+    def isDrawByRule(self):
+        return self.counter >= 100 or self.repetitionCount() >= 3 or self.insufficientMaterial()
+
+    #Staged move generation for the search, see ChessAI.Searcher.stagedMoves. Pins are looked up again on every call
+    #because the search makes and takes back moves between the stages. Only used when the side to move isn't in check
+    def getCaptureMoves(self):
+        self.inCheckNow, self.pins, self.checks = self.checkForPinsAndChecks()
+        return self.getAllPossibleMoves(CAPTURES)
+
+    def getQuietMoves(self):
+        self.inCheckNow, self.pins, self.checks = self.checkForPinsAndChecks()
+        return self.getAllPossibleMoves(QUIETS)
+
+    #the move with moveID as getCaptureMoves or getQuietMoves would generate it in this position, None if there is none
+    def getMoveFromID(self, moveID):
+        startRow, startCol = moveID // 1000, moveID // 100 % 10
+        piece = self.board[startRow][startCol]
+        if piece[0] != ('w' if self.whiteToMove else 'b'):
+            return None
+        self.inCheckNow, self.pins, self.checks = self.checkForPinsAndChecks()
+        moves = []
+        self.moveFunctions[piece[1]](startRow, startCol, moves, CAPTURES)
+        self.moveFunctions[piece[1]](startRow, startCol, moves, QUIETS)
+        for move in moves:
+            if move.moveID == moveID:
+                return move
+        return None
+
+    #legality of a staged move, pins are already respected so only king moves and en passant have to be tried out
+    def isLegalMove(self, move):
+        if move.pieceMoved[1] == 'K' and not move.isCastle:
+            self.board[move.startRow][move.startCol] = "--"
+            legal = not self.squareUnderAttack(move.endRow, move.endCol)
+            self.board[move.startRow][move.startCol] = move.pieceMoved
+            return legal
+        if move.isEnpassantMove:
+            self.makeMove(move)
+            self.whiteToMove = not self.whiteToMove
+            legal = not self.inCheck()
+            self.whiteToMove = not self.whiteToMove
+            self.undoMove()
+            return legal
+        return True
+
+    #Looks outward from the king of the side to move, returns if the king is in check,
+    #the pinned pieces as {(row, col): direction from the king} and the checking pieces as (row, col, direction)
+    def checkForPinsAndChecks(self):
+        pins = {}
+        checks = []
+        if self.whiteToMove:
+            enemyColor, allyColor = 'b', 'w'
+            startRow, startCol = self.whiteKingLocation
+        else:
+            enemyColor, allyColor = 'w', 'b'
+            startRow, startCol = self.blackKingLocation
+        board = self.board
+        for j in range(8):
+            d = kingDirections[j]
+            possiblePin = ()
+            for i in range(1, 8):
+                endRow = startRow + d[0] * i
+                endCol = startCol + d[1] * i
+                if not (0 <= endRow < 8 and 0 <= endCol < 8):
+                    break
+                endPiece = board[endRow][endCol]
+                if endPiece == "--":
+                    continue
+                if endPiece[0] == allyColor:
+                    if possiblePin == ():
+                        possiblePin = (endRow, endCol)
+                    else:
+                        break #second allied piece, no pin or check in this direction
+                else:
+                    pieceType = endPiece[1]
+                    #orthogonal directions come first in kingDirections, diagonal ones after
+                    #an enemy pawn only attacks the king from the square diagonally in front of it
+                    if (j < 4 and pieceType == 'R') or (j >= 4 and pieceType == 'B') or pieceType == 'Q' or \
+                            (i == 1 and pieceType == 'K') or \
+                            (i == 1 and pieceType == 'p' and j >= 4 and d[0] == (-1 if enemyColor == 'b' else 1)):
+                        if possiblePin == ():
+                            checks.append((endRow, endCol, d[0], d[1]))
+                        else:
+                            pins[possiblePin] = d
+                    break
+        for m in knightDirections:
+            endRow = startRow + m[0]
+            endCol = startCol + m[1]
+            if 0 <= endRow < 8 and 0 <= endCol < 8 and board[endRow][endCol] == enemyColor + 'N':
+                checks.append((endRow, endCol, m[0], m[1]))
+        return len(checks) > 0, pins, checks
 
     #old inCheck algorithm (slower)
     
@@ -211,159 +540,157 @@ class GameState():
         loc = self.whiteKingLocation if self.whiteToMove else self.blackKingLocation
         return self.squareUnderAttack(*loc)
         
-       
+    #True if the enemy of the side to move attacks the square, looks outward from the square without building moves
     def squareUnderAttack(self, r, c):
-        revMoves = []
         enemy = "b" if self.whiteToMove else "w"
-        loc = (r, c)
-        var = 1 if self.whiteToMove else -1
-
-        self.getQueenMoves(*loc, revMoves)
-        for move in revMoves:
-            if move.pieceCaptured == enemy + "Q":           
-                return True
-        revMoves = []
-        self.getRookMoves(*loc, revMoves)
-        for move in revMoves:
-            if move.pieceCaptured == enemy + "R":               
-                return True
-        revMoves = []
-        self.getKnightMoves(*loc, revMoves)
-        for move in revMoves:
-            if move.pieceCaptured == enemy + "N":               
-                return True
-        revMoves = []
-        self.getBishopMoves(*loc, revMoves)
-        for move in revMoves:
-            if move.pieceCaptured == enemy + "B":                
-                return True
-        revMoves = []
-        self.getKingMoves(*loc, revMoves, castle=False)
-        for move in revMoves:
-            if move.pieceCaptured == enemy + "K":
+        board = self.board
+        for j in range(8):
+            d = kingDirections[j]
+            for i in range(1, 8):
+                endRow = r + d[0] * i
+                endCol = c + d[1] * i
+                if not (0 <= endRow < 8 and 0 <= endCol < 8):
+                    break
+                endPiece = board[endRow][endCol]
+                if endPiece == "--":
+                    continue
+                if endPiece[0] == enemy:
+                    pieceType = endPiece[1]
+                    if (j < 4 and pieceType == 'R') or (j >= 4 and pieceType == 'B') or pieceType == 'Q' or \
+                            (i == 1 and pieceType == 'K') or \
+                            (i == 1 and pieceType == 'p' and j >= 4 and d[0] == (-1 if enemy == 'b' else 1)):
+                        return True
+                break
+        for m in knightDirections:
+            endRow = r + m[0]
+            endCol = c + m[1]
+            if 0 <= endRow < 8 and 0 <= endCol < 8 and board[endRow][endCol] == enemy + 'N':
                 return True
-        revMoves = []
-        if (loc[0] > 0 if enemy == "b" else loc[0] < 7):
-            if loc[1] >= 1:
-                if self.board[loc[0] - var][loc[1] - 1] == enemy + "p":               
-                    return True
-            if loc[1] <= 6:
-                if self.board[loc[0] - var][loc[1] + 1] == enemy + "p":
-                    return True
+        return False
 
-    #All moves without concidering checks
-    def getAllPossibleMoves(self):
+    #All moves without concidering checks (pinned pieces only move along the pin found by the last getValidMoves)
+    def getAllPossibleMoves(self, kind=ALL_MOVES):
         moves = []
         for r in range(len(self.board)): #num of rows
             for c in range(len(self.board[r])): #num of cols in each row
                 turn = self.board[r][c][0]
                 if (turn == 'w' and self.whiteToMove) or (turn == 'b' and not self.whiteToMove):
                     piece = self.board[r][c][1]
-                    self.moveFunctions[piece](r, c, moves) #calls move function for appropriate piece
+                    self.moveFunctions[piece](r, c, moves, kind) #calls move function for appropriate piece
         return moves
 
-    def getPawnMoves(self, r, c, moves):
+    def getPawnMoves(self, r, c, moves, kind=ALL_MOVES):
+        pinDirection = self.pins.get((r, c))
         if self.whiteToMove:
-            if self.board[r-1][c] == "--": #one square ahead
-                moves.append(Move((r, c), (r-1, c), self.board))
-                if r == 6 and self.board[r-2][c] == "--": #two squares ahead if not moved
-                  moves.append(Move((r, c), (r-2, c), self.board))
-            if c >= 1:
-                if self.board[r-1][c-1][0] == 'b':
-                    moves.append(Move((r, c), (r-1, c-1), self.board))
-                elif (r-1, c-1) == self.enpassantPossible[-1]:
-                    moves.append(Move((r, c), (r-1, c-1), self.board, isEnpassantMove=True))
-            if c <= 6:
-                if self.board[r-1][c+1][0] == 'b':
-                    moves.append(Move((r, c), (r-1, c+1), self.board))
-                elif (r-1, c+1) == self.enpassantPossible[-1]:
-                    moves.append(Move((r, c), (r-1, c+1), self.board, isEnpassantMove=True))
+            moveAmount, startRow, enemyColor = -1, 6, 'b'
         else:
-            if self.board[r+1][c] == "--": #one square ahead
-                moves.append(Move((r, c), (r+1, c), self.board))
-                if r == 1 and self.board[r+2][c] == "--": #two squares ahead if not moved
-                    moves.append(Move((r, c), (r+2, c), self.board))
-            if c >= 1:
-                if self.board[r+1][c-1][0] == 'w':
-                    moves.append(Move((r, c), (r+1, c-1), self.board))
-                elif (r-1, c-1) == self.enpassantPossible[-1]:
-                    moves.append(Move((r, c), (r-1, c-1), self.board, isEnpassantMove=True))
-            if c <= 6:
-                if self.board[r+1][c+1][0] == 'w':
-                    moves.append(Move((r, c), (r+1, c+1), self.board))
-                elif (r-1, c+1) == self.enpassantPossible[-1]:
-                    moves.append(Move((r, c), (r-1, c+1), self.board, isEnpassantMove=True))
-
-
-    def getRookMoves(self, r, c, moves):
-        enemyColor = 'b' if self.whiteToMove else 'w'
-        directions = ((-1, 0), (0, -1), (1, 0), (0, 1))
-        for d in directions:
-            for i in range(1, 8):
-                endRow = r + d[0] * i
-                endCol = c + d[1] * i
-                if 0 <= endRow < 8 and 0 <= endCol < 8:
-                    endPiece = self.board[endRow][endCol]
-                    if endPiece == "--":
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
-                    elif endPiece[0] == enemyColor:
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
-                        break
-                    else:
-                        break
-                else:
-                    break
-
-    def getBishopMoves(self, r, c, moves):
+            moveAmount, startRow, enemyColor = 1, 1, 'w'
+        #pushes to the last rank are promotions and come with the captures
+        promotion = r + moveAmount == 0 or r + moveAmount == 7
+        if self.board[r+moveAmount][c] == "--" and (kind == ALL_MOVES or (kind == CAPTURES) == promotion): #one square ahead
+            if pinDirection is None or pinDirection[1] == 0:
+                moves.append(Move((r, c), (r+moveAmount, c), self.board))
+                if r == startRow and self.board[r+2*moveAmount][c] == "--": #two squares ahead if not moved
+                    moves.append(Move((r, c), (r+2*moveAmount, c), self.board))
+        if kind == QUIETS:
+            return
+        for dc in (-1, 1):
+            if 0 <= c + dc <= 7:
+                if pinDirection is not None and pinDirection != (moveAmount, dc) and pinDirection != (-moveAmount, -dc):
+                    continue
+                if self.board[r+moveAmount][c+dc][0] == enemyColor:
+                    moves.append(Move((r, c), (r+moveAmount, c+dc), self.board))
+                elif (r+moveAmount, c+dc) == self.enpassantPossible:
+                    #both pawns leave the rank and the captured pawn can uncover a check, so test it on the board
+                    move = Move((r, c), (r+moveAmount, c+dc), self.board, isEnpassantMove=True)
+                    if kind != ALL_MOVES:
+                        moves.append(move)
+                        continue
+                    self.makeMove(move)
+                    self.whiteToMove = not self.whiteToMove
+                    legal = not self.inCheck()
+                    self.whiteToMove = not self.whiteToMove
+                    self.undoMove()
+                    if legal:
+                        moves.append(move)
+
+    def getRookMoves(self, r, c, moves, kind=ALL_MOVES):
+        self.getSlidingMoves(r, c, moves, ((-1, 0), (0, -1), (1, 0), (0, 1)), kind)
+
+    def getBishopMoves(self, r, c, moves, kind=ALL_MOVES):
+        self.getSlidingMoves(r, c, moves, ((-1, -1), (1, -1), (1, 1), (-1, 1)), kind)
+
+    def getSlidingMoves(self, r, c, moves, directions, kind=ALL_MOVES):
         enemyColor = 'b' if self.whiteToMove else 'w'
-        directions = ((-1, -1), (1, -1), (1, 1), (-1, 1))
+        pinDirection = self.pins.get((r, c))
         for d in directions:
+            if pinDirection is not None and pinDirection != d and pinDirection != (-d[0], -d[1]):
+                continue
             for i in range(1, 8):
                 endRow = r + d[0] * i
                 endCol = c + d[1] * i
                 if 0 <= endRow < 8 and 0 <= endCol < 8:
                     endPiece = self.board[endRow][endCol]
                     if endPiece == "--":
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
+                        if kind != CAPTURES:
+                            moves.append(Move((r, c), (endRow, endCol), self.board))
                     elif endPiece[0] == enemyColor:
-                        moves.append(Move((r, c), (endRow, endCol), self.board))
+                        if kind != QUIETS:
+                            moves.append(Move((r, c), (endRow, endCol), self.board))
                         break
                     else:
                         break
                 else:
                     break
 
-    def getKnightMoves(self, r, c, moves):
+    def getKnightMoves(self, r, c, moves, kind=ALL_MOVES):
+        if (r, c) in self.pins: #a pinned knight can never move
+            return
         allyColor = 'w' if self.whiteToMove else 'b'
-        knightMoves = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
-        for m in knightMoves:
+        for m in knightDirections:
             endRow = r + m[0]
             endCol = c + m[1]
             if 0 <= endRow < 8 and 0 <= endCol < 8:
                 endPiece = self.board[endRow][endCol]
-                if endPiece[0] != allyColor:
+                if endPiece[0] != allyColor and (kind == ALL_MOVES or (kind == CAPTURES) == (endPiece != "--")):
                     moves.append(Move((r, c), (endRow, endCol), self.board))
 
-    def getQueenMoves(self, r, c, moves):
-        self.getRookMoves(r, c, moves)
-        self.getBishopMoves(r, c, moves)
+    def getQueenMoves(self, r, c, moves, kind=ALL_MOVES):
+        self.getRookMoves(r, c, moves, kind)
+        self.getBishopMoves(r, c, moves, kind)
 
-    def getKingMoves(self, r, c, moves, castle=True):
+    #king moves are tested with the king lifted off the board so it can't hide behind itself from a slider
+    def getKingMoves(self, r, c, moves, kind=ALL_MOVES, castle=True):
         allyColor = 'w' if self.whiteToMove else 'b'
-        kingMoves = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
-        for i in range(8):
-            endRow = r + kingMoves[i][0]
-            endCol = c + kingMoves[i][1]
+        if kind != ALL_MOVES:
+            for d in kingDirections:
+                endRow = r + d[0]
+                endCol = c + d[1]
+                if 0 <= endRow < 8 and 0 <= endCol < 8:
+                    endPiece = self.board[endRow][endCol]
+                    if endPiece[0] != allyColor and (kind == CAPTURES) == (endPiece != "--"):
+                        moves.append(Move((r, c), (endRow, endCol), self.board))
+            if kind == QUIETS and castle:
+                self.getCastleMoves(r, c, moves)
+            return
+        safeSquares = []
+        self.board[r][c] = "--"
+        for d in kingDirections:
+            endRow = r + d[0]
+            endCol = c + d[1]
             if 0 <= endRow < 8 and 0 <= endCol < 8:
                 endPiece = self.board[endRow][endCol]
-                if endPiece[0] != allyColor:
-                    moves.append(Move((r, c), (endRow, endCol), self.board))
+                if endPiece[0] != allyColor and not self.squareUnderAttack(endRow, endCol):
+                    safeSquares.append((endRow, endCol))
+        self.board[r][c] = allyColor + "K"
+        for square in safeSquares:
+            moves.append(Move((r, c), square, self.board))
         
         if castle == True:
             self.getCastleMoves(r, c, moves)
 
     def getCastleMoves(self, r, c, moves):
-        if self.inCheck():
+        if self.inCheckNow:
             return
         if (self.whiteToMove and self.currentCastlingRight.wks) or (not self.whiteToMove and self.currentCastlingRight.bks):
             self.getKingsideCastleMoves(r, c, moves)
@@ -387,7 +714,19 @@ class CastleRights():
         self.wqs = wqs
         self.bqs = bqs
 
+    def getBits(self):
+        return (WKS if self.wks else 0) | (WQS if self.wqs else 0) | (BKS if self.bks else 0) | (BQS if self.bqs else 0)
+
+    def setBits(self, bits):
+        self.wks = bits & WKS != 0
+        self.wqs = bits & WQS != 0
+        self.bks = bits & BKS != 0
+        self.bqs = bits & BQS != 0
+
+#Move objects are for the ui and the search, slots keep them small since the search builds one per candidate move
 class Move():
+    __slots__ = ("isEnpassantMove", "isCastle", "startRow", "startCol", "endRow", "endCol",
+                 "pieceMoved", "pieceCaptured", "isPawnPromotion", "moveID")
 
     ranksToRows = {"1": 7, "2": 6, "3": 5, "4": 4,
                    "5": 3, "6": 2, "7": 1, "8": 0}
@@ -409,6 +748,26 @@ class Move():
         self.isPawnPromotion = (self.pieceMoved == "wp" and self.endRow == 0) or (self.pieceMoved == "bp" and self.endRow == 7)
         self.moveID = self.startRow*1000 + self.startCol*100 + self.endRow*10 + self.endCol
 
+    #wraps a packed move, board is the position before the move
+    @classmethod
+    def fromPacked(cls, packed, board):
+        start = packed & 63
+        end = (packed >> 6) & 63
+        flag = (packed >> 12) & 3
+        return cls((start // 8, start % 8), (end // 8, end % 8), board, isEnpassantMove=flag == ENPASSANT, isCastle=flag == CASTLE)
+
+    def getPacked(self, promoteValue=""):
+        start = self.startRow * 8 + self.startCol
+        end = self.endRow * 8 + self.endCol
+        captured = pieceIndex[self.pieceCaptured] if self.pieceCaptured != "--" else -1
+        if self.isEnpassantMove:
+            return packMove(start, end, ENPASSANT, 0, captured)
+        if self.isCastle:
+            return packMove(start, end, CASTLE)
+        if self.isPawnPromotion:
+            return packMove(start, end, PROMOTION, "pNBRQK".index(promoteValue) if promoteValue != "" else QUEEN, captured)
+        return packMove(start, end, NORMAL, 0, captured)
+
     def __eq__(self, other):
         if isinstance(other, Move):
             return self.moveID == other.moveID
@@ -429,5 +788,12 @@ class Move():
         else:
             return self.pieceMoved[1] + self.getRankFile(self.endRow, self.endCol)
 
+    #long algebraic notation, e.g. e2e4 or e7e8q
+    def getCoordinateNotation(self, promoteValue=""):
+        notation = self.getRankFile(self.startRow, self.startCol) + self.getRankFile(self.endRow, self.endCol)
+        if self.isPawnPromotion:
+            notation += (promoteValue if promoteValue != "" else "Q").lower()
+        return notation
+
     def getRankFile(self, r, c):
         return self.colsToFiles[c] + self.rowsToRanks[r]
\ No newline at end of file
@@ -2,16 +2,29 @@
 
 import pygame as p
 from pygame.constants import KEYDOWN
+import os
 import ChessEngine
 import ChessAI
+import ChessTablebase
+import ChessWorker
 
-p.init()
 WIDTH = HEIGHT = 800
 DIMENSION = 8
 SQ_SIZE = HEIGHT // DIMENSION
 MAX_FPS = 60
+#while the AI searches the loop wakes up this often (ms) to read its progress, otherwise it sleeps until an event comes
+WORKER_POLL_MS = 100
 HIGHLIGHT = True
 ANIMATION = False
+#opening book for the AI, used when the file exists (build one with ChessBook.py)
+BOOK_FILE = "book.bin"
+#endgame tablebases for the AI, used when the directory exists (generate them with ChessTablebase.py)
+TABLEBASE_DIR = ChessTablebase.TABLEBASE_DIR
+#search limits of the AI, with neither it searches ChessAI.DEPTH plies
+AI_DEPTH = None
+AI_TIME = None
+#search the human's predicted reply while the human thinks
+PONDER = True
 IMAGES = {}
 
 def loadImages():
@@ -20,28 +33,44 @@ def loadImages():
         IMAGES[piece] = p.transform.scale(p.image.load("images/" + piece + ".png"), (SQ_SIZE, SQ_SIZE))
         
 def main():
+    #not at import, the AI's worker process imports this module too
+    p.init()
     screen = p.display.set_mode((WIDTH, HEIGHT))
     p.display.set_caption("Chess Engine")
     clock = p.time.Clock()
-    screen.fill(p.Color("white"))
+    #mouse motion isn't used and would only wake up the loop
+    p.event.set_blocked(p.MOUSEMOTION)
     gs = ChessEngine.GameState()
     validMoves = gs.getValidMoves()
     moveMade = False
     animate = False
+    ponderNext = False
     gameOver = False
     playerOne = True #If a human is playing white, then this is True
     playerTwo = False #If a human is playing black, then this is True
     promoteValue = ""
 
     loadImages()
+    renderer = BoardRenderer(screen)
+    #the AI searches in its own process so the window stays responsive
+    worker = ChessWorker.SearchWorker(BOOK_FILE if os.path.exists(BOOK_FILE) else None,
+                                      TABLEBASE_DIR if os.path.isdir(TABLEBASE_DIR) else None)
     running = True
     sqSelected = ()
     playerClicks = []
     while running:
         humanTurn = playerOne if gs.whiteToMove else playerTwo
-        for e in p.event.get():
+        if worker.isSearching():
+            events = waitForEvents(WORKER_POLL_MS)
+        elif gameOver or humanTurn:
+            events = waitForEvents()
+        else:
+            events = p.event.get()
+        for e in events:
             if e.type == p.QUIT:
                 running = False
+            elif e.type == p.VIDEOEXPOSE or e.type == p.WINDOWEXPOSED:
+                renderer.invalidate()
             #move handling
             elif e.type == p.MOUSEBUTTONDOWN:
                 if not gameOver and humanTurn:
@@ -61,7 +90,7 @@ def main():
                                     if move.isPawnPromotion:
                                         print("Enter promotion Value: Q for Queen, R for Rook, B for Bishop, or N for Knight: ") #Make GUI for this
                                         while promoteValue == "":    
-                                            for e in p.event.get():
+                                            for e in waitForEvents():
                                                 if e.type == KEYDOWN:
                                                     if e.key == p.K_q:
                                                         promoteValue = "Q"
@@ -84,14 +113,16 @@ def main():
                         if not moveMade:        
                             playerClicks = [sqSelected]
             elif e.type == p.KEYDOWN:
-                if e.key == p.K_z and (humanTurn or gameOver): #'z' key
+                if e.key == p.K_z: #'z' key, also takes back the human's move while the AI is thinking about it
+                    worker.cancel()
                     gs.undoMove()
                     gs.undoMove()
                     animate = False
                     moveMade = True
                     sqSelected = ()
                     playerClicks = []
-                if e.key == p.K_r and (gs.checkMate or gs.staleMate):
+                if e.key == p.K_r:
+                    worker.newGame()
                     gs = ChessEngine.GameState()
                     print("New Game:")
                     validMoves = gs.getValidMoves()
@@ -100,112 +131,204 @@ def main():
                     moveMade = False
                     animate = False
 
-        #AI move finder
-        if not gameOver and not humanTurn:
-            
-            AIMove, score = ChessAI.findBestMove(gs, validMoves)
-            score = score * -1 if not gs.whiteToMove else score
-            if AIMove is None:
-                AIMove = ChessAI.findRandomMove(validMoves)
-            gs.makeMove(AIMove) if not AIMove.isPawnPromotion else gs.makeMove(AIMove, promoteValue="Q")
-            print(AIMove.getChessNotation(), score) if not AIMove.isPawnPromotion else print(AIMove.getChessNotation(promoteValue="Q"), score)
-            moveMade = True
-            animate = True
-            score = 0            
+        #AI move finder, the move is played once the worker has it
+        humanTurn = playerOne if gs.whiteToMove else playerTwo
+        if running and not gameOver and not humanTurn and not moveMade:
+            if not worker.isSearching():
+                worker.start(gs, AI_DEPTH, AI_TIME)
+            result = worker.poll()
+            if result is not None:
+                moveID, promoteValue, score = result
+                score = score * -1 if not gs.whiteToMove else score
+                AIMove = findMove(validMoves, moveID)
+                if AIMove is None:
+                    AIMove = ChessAI.findRandomMove(validMoves)
+                promoteValue = promoteValue if promoteValue != "" else "Q"
+                gs.makeMove(AIMove) if not AIMove.isPawnPromotion else gs.makeMove(AIMove, promoteValue=promoteValue)
+                print(AIMove.getChessNotation(), score) if not AIMove.isPawnPromotion else print(AIMove.getChessNotation(promoteValue=promoteValue), score)
+                promoteValue = ""
+                moveMade = True
+                animate = True
+                ponderNext = True
+                score = 0
 
         if moveMade:
-            if animate and ANIMATION: animateMove(gs.moveLog[-1], screen, gs.board, clock)
+            if animate and ANIMATION: renderer.animateMove(gs.moveLog[-1], gs.board, clock)
             animate = False
             validMoves = gs.getValidMoves()
             moveMade = False
+            if ponderNext and PONDER and (playerOne if gs.whiteToMove else playerTwo) and not gs.checkMate and not gs.staleMate:
+                worker.ponder(gs, AI_DEPTH, AI_TIME)
+            ponderNext = False
 
-        drawGameState(screen, gs, validMoves, sqSelected)
-
+        message = None
         if gs.checkMate:
             gameOver = True
             if gs.whiteToMove:
-                drawText(screen, "Black wins by checkmate")
+                message = "Black wins by checkmate"
             else:
-                drawText(screen, "White wins by checkmate")
+                message = "White wins by checkmate"
 
         if gs.staleMate:
+            #the result is printed once, when the game ends
+            if not gameOver:
+                print("1/2-1/2")
             gameOver = True
-            drawText(screen, "Stalemate")
+            message = "Stalemate"
 
         if not gs.staleMate and not gs.checkMate:
             gameOver = False
 
+        status = getProgressText(worker.progress, validMoves, gs.whiteToMove) if worker.isSearching() else None
+        renderer.draw(gs, validMoves, sqSelected, message, status)
         clock.tick(MAX_FPS)
-        p.display.flip()
+    worker.close()
+    if worker.stats.ponderHits + worker.stats.ponderMisses > 0:
+        print("ponder hits %d of %d (%.0f%%), %.2fs saved" % (worker.stats.ponderHits, worker.stats.ponderHits + worker.stats.ponderMisses,
+            100 * worker.stats.getPonderHitRate(), worker.stats.ponderTimeSaved))
     p.quit()
 
-#highlight square selected and possible moves for selected piece
-def highlightSquares(screen, gs, validMoves, sqSelected):
-    if sqSelected != ():
-        r, c = sqSelected
-        if gs.board[r][c][0] == ("w" if gs.whiteToMove else "b"):
-            #highlight selected square
-            s = p.Surface((SQ_SIZE, SQ_SIZE))
-            s.set_alpha(100)
-            s.fill(p.Color("blue"))
-            screen.blit(s, (c*SQ_SIZE, r*SQ_SIZE))
-            #highlight moves from that square
-            s.fill(p.Color("yellow"))
-            for move in validMoves:
-                if move.startRow == r and move.startCol == c:
-                    screen.blit(s, (move.endCol*SQ_SIZE, move.endRow*SQ_SIZE))
-
-def drawGameState(screen, gs, validMoves, sqSelected):
-    drawBoard(screen)
-    if HIGHLIGHT: highlightSquares(screen, gs, validMoves, sqSelected)
-    drawPieces(screen, gs.board)
-
-#draws the squares on the board
-def drawBoard(screen):
-    global colors
-    colors = [p.Color("white"), p.Color("grey")]
-    for r in range(DIMENSION):
-        for c in range(DIMENSION):
-            color = colors[((r+c) % 2)]
-            p.draw.rect(screen, color, p.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE))
-
-#draws the pieces on the board
-def drawPieces(screen, board):
-    for r in range(DIMENSION):
-        for c in range(DIMENSION):
-            piece = board[r][c]
-            if piece != "--":
-                screen.blit(IMAGES[piece], p.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE))
-
-def animateMove(move, screen, board, clock):
-    global colors
-    dR = move.endRow - move.startRow
-    dC = move.endCol - move.startCol
-    framesPerSquare = 5 #frames for one square of the move
-    frameCount = max(abs(dR), abs(dC)) * framesPerSquare
-    for frame in range(frameCount+1):
-        r, c = (move.startRow + dR*frame/frameCount, move.startCol + dC*frame/frameCount)
-        drawBoard(screen)
-        drawPieces(screen, board)
-
-        color = colors[(move.endRow + move.endCol)%2]
-        endSquare = p.Rect(move.endCol*SQ_SIZE, move.endRow*SQ_SIZE, SQ_SIZE, SQ_SIZE)
-        p.draw.rect(screen, color, endSquare)
-
-        if move.pieceCaptured != "--":
-            screen.blit(IMAGES[move.pieceCaptured], endSquare)
-
-        screen.blit(IMAGES[move.pieceMoved], p.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE))
-        p.display.flip()
-        clock.tick(MAX_FPS)
+#the move with moveID in validMoves, None if the position has no such move
+def findMove(validMoves, moveID):
+    for move in validMoves:
+        if move.moveID == moveID:
+            return move
+    return None
+
+#blocks until there is an event or timeout ms have gone by and returns every event that is waiting
+def waitForEvents(timeout=None):
+    e = p.event.wait() if timeout is None else p.event.wait(timeout)
+    events = [e] if e.type != p.NOEVENT else []
+    return events + p.event.get()
+
+#progress of the AI's search: depth, best move so far, score for white and nodes per second
+def getProgressText(progress, validMoves, whiteToMove):
+    if progress is None:
+        return "thinking..."
+    depth, nodes, seconds, moveID, score = progress
+    move = findMove(validMoves, moveID)
+    return "depth %d  best %s  score %+.1f  %d nodes/s" % (depth, move.getChessNotation() if move is not None else "-",
+        score if whiteToMove else -score, nodes / seconds if seconds > 0 else 0)
+
+#Draws the game incrementally. The empty board, the highlight squares and the fonts are made once, every draw only
+#repaints the squares whose piece or highlight changed since the last one (and the text drawn over them) and only
+#those parts of the window are updated
+class BoardRenderer():
+    def __init__(self, screen):
+        self.screen = screen
+        colors = [p.Color("white"), p.Color("grey")]
+        self.background = p.Surface((WIDTH, HEIGHT))
+        for r in range(DIMENSION):
+            for c in range(DIMENSION):
+                self.background.fill(colors[(r+c) % 2], p.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE))
+        self.selectedHighlight = p.Surface((SQ_SIZE, SQ_SIZE))
+        self.selectedHighlight.set_alpha(100)
+        self.selectedHighlight.fill(p.Color("blue"))
+        self.moveHighlight = p.Surface((SQ_SIZE, SQ_SIZE))
+        self.moveHighlight.set_alpha(100)
+        self.moveHighlight.fill(p.Color("yellow"))
+        self.messageFont = p.font.SysFont("Helvitca", 32, True, False)
+        self.statusFont = p.font.SysFont("Helvitca", 24, True, False)
+        self.statusBackground = p.Surface((WIDTH, self.statusFont.get_linesize() + 4))
+        self.statusBackground.set_alpha(180)
+        self.statusBackground.fill(p.Color("white"))
+        self.messages = {} #rendered game over messages by text
+        #(piece, highlight) of every square as last drawn, text overlays as [text, surface, rect]
+        self.squares = [[None] * DIMENSION for r in range(DIMENSION)]
+        self.message = [None, None, None]
+        self.status = [None, None, None]
+        self.fullRedraw = True
+
+    #everything is drawn again on the next draw, e.g. after the window was covered
+    def invalidate(self):
+        self.fullRedraw = True
+
+    def draw(self, gs, validMoves, sqSelected, message=None, status=None):
+        highlights = {}
+        if HIGHLIGHT and sqSelected != ():
+            r, c = sqSelected
+            if gs.board[r][c][0] == ("w" if gs.whiteToMove else "b"):
+                highlights[sqSelected] = self.selectedHighlight
+                for move in validMoves:
+                    if move.startRow == r and move.startCol == c:
+                        highlights[(move.endRow, move.endCol)] = self.moveHighlight
+        #a changed text needs the squares under its old and new place repainted
+        overlayDirty = []
+        for overlay, text, render in ((self.message, message, self.renderMessage), (self.status, status, self.renderStatus)):
+            if text != overlay[0]:
+                if overlay[2] is not None:
+                    overlayDirty.append(overlay[2])
+                overlay[0] = text
+                overlay[1], overlay[2] = render(text) if text is not None else (None, None)
+                if overlay[2] is not None:
+                    overlayDirty.append(overlay[2])
+        dirty = []
+        for r in range(DIMENSION):
+            for c in range(DIMENSION):
+                square = (gs.board[r][c], highlights.get((r, c)))
+                rect = p.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE)
+                if self.fullRedraw or square != self.squares[r][c] or rect.collidelist(overlayDirty) != -1:
+                    self.drawSquare(rect, square[0], square[1])
+                    self.squares[r][c] = square
+                    dirty.append(rect)
+        #texts go over the squares, so they are drawn again whenever a square under them was
+        for overlay in (self.message, self.status):
+            if overlay[1] is not None and overlay[2].collidelist(dirty) != -1:
+                if overlay is self.status:
+                    self.screen.blit(self.statusBackground, overlay[2], p.Rect(0, 0, overlay[2].width, overlay[2].height))
+                self.screen.blit(overlay[1], overlay[2])
+        if self.fullRedraw:
+            p.display.flip()
+            self.fullRedraw = False
+        elif len(dirty) > 0:
+            p.display.update(dirty)
+
+    def drawSquare(self, rect, piece, highlight):
+        self.screen.blit(self.background, rect, rect)
+        if highlight is not None:
+            self.screen.blit(highlight, rect)
+        if piece != "--":
+            self.screen.blit(IMAGES[piece], rect)
+
+    #(surface, rect) of a game over message in the middle of the board, gray with a black shadow
+    def renderMessage(self, text):
+        if text not in self.messages:
+            shadow = self.messageFont.render(text, 0, p.Color("Gray"))
+            textObject = self.messageFont.render(text, 0, p.Color("Black"))
+            surface = p.Surface((shadow.get_width() + 2, shadow.get_height() + 2), p.SRCALPHA)
+            surface.blit(shadow, (0, 0))
+            surface.blit(textObject, (2, 2))
+            self.messages[text] = surface
+        surface = self.messages[text]
+        return surface, surface.get_rect(center=(WIDTH//2 + 1, HEIGHT//2 + 1))
+
+    #(surface, rect) of a status line at the bottom of the board, the rect includes its background
+    def renderStatus(self, text):
+        textObject = self.statusFont.render(text, True, p.Color("black"))
+        height = self.statusBackground.get_height()
+        surface = p.Surface((textObject.get_width() + 8, height), p.SRCALPHA)
+        surface.blit(textObject, (4, 2))
+        return surface, p.Rect(0, HEIGHT - height, surface.get_width(), height)
 
-def drawText(screen, text):
-    font = p.font.SysFont("Helvitca", 32, True, False)
-    textObject = font.render(text, 0, p.Color("Gray"))
-    textLocation = p.Rect(0, 0, WIDTH, HEIGHT).move(WIDTH//2 - textObject.get_width()//2, HEIGHT//2 - textObject.get_height()//2)
-    screen.blit(textObject, textLocation)
-    textObject = font.render(text, 0, p.Color("Black"))
-    screen.blit(textObject, textLocation.move(2, 2))
+    #slides the piece of the move from its start square to its end square, board is the position after the move
+    def animateMove(self, move, board, clock):
+        dR = move.endRow - move.startRow
+        dC = move.endCol - move.startCol
+        framesPerSquare = 5 #frames for one square of the move
+        frameCount = max(abs(dR), abs(dC)) * framesPerSquare
+        for frame in range(frameCount+1):
+            r, c = (move.startRow + dR*frame/frameCount, move.startCol + dC*frame/frameCount)
+            self.screen.blit(self.background, (0, 0))
+            for row in range(DIMENSION):
+                for col in range(DIMENSION):
+                    if board[row][col] != "--" and (row, col) != (move.endRow, move.endCol):
+                        self.screen.blit(IMAGES[board[row][col]], p.Rect(col*SQ_SIZE, row*SQ_SIZE, SQ_SIZE, SQ_SIZE))
+            if move.pieceCaptured != "--":
+                self.screen.blit(IMAGES[move.pieceCaptured], p.Rect(move.endCol*SQ_SIZE, move.endRow*SQ_SIZE, SQ_SIZE, SQ_SIZE))
+            self.screen.blit(IMAGES[move.pieceMoved], p.Rect(c*SQ_SIZE, r*SQ_SIZE, SQ_SIZE, SQ_SIZE))
+            p.display.flip()
+            clock.tick(MAX_FPS)
+        self.invalidate()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+#Perft (move path enumeration) to verify the move generator against known node counts and measure its speed
+#usage: python ChessPerft.py [depth] [--bitboard] [--divide]
+
+import argparse, time
+import ChessEngine
+import ChessBitboard
+
+#standard test positions and their known node counts by depth
+POSITIONS = [
+    ("initial", "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902, 197281, 4865609]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862, 4085603]),
+    #en passant with horizontal pins and discovered checks
+    ("enpassant", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    #promotions, castling through check, and the same position mirrored so black gets the edge cases
+    ("promotion", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467, 422333]),
+    ("promotion-black", "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1", [6, 264, 9467, 422333]),
+    ("castling", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    ("middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890, 3894594]),
+]
+
+#number of leaf nodes depth plies below the current position, bulk counted at the last ply
+def perft(gs, depth):
+    if hasattr(gs, "getLegalMoves"):
+        return perftPacked(gs, depth)
+    moves = gs.getValidMoves()
+    if depth == 1:
+        return sum(4 if move.isPawnPromotion else 1 for move in moves)
+    nodes = 0
+    for move in moves:
+        for promoteValue in ("QRBN" if move.isPawnPromotion else "Q"):
+            gs.makeMove(move, promoteValue=promoteValue)
+            nodes += perft(gs, depth - 1)
+            gs.undoMove()
+    return nodes
+
+#bitboard backend, packed moves have one move per promotion piece already
+def perftPacked(gs, depth):
+    moves = gs.getLegalMoves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        gs.makePackedMove(move)
+        nodes += perftPacked(gs, depth - 1)
+        gs.undoPackedMove()
+    return nodes
+
+#perft split by root move, returns [(move notation, nodes)]
+def divide(gs, depth):
+    results = []
+    for move in gs.getValidMoves():
+        for promoteValue in ("QRBN" if move.isPawnPromotion else "Q"):
+            gs.makeMove(move, promoteValue=promoteValue)
+            nodes = perft(gs, depth - 1) if depth > 1 else 1
+            gs.undoMove()
+            results.append((move.getCoordinateNotation(promoteValue), nodes))
+    return results
+
+def createGameState(fen, bitboard=False):
+    gs = ChessEngine.GameState.fromFen(fen)
+    return ChessBitboard.BitboardGameState(gs) if bitboard else gs
+
+#runs every position up to depth, prints node counts and nodes/sec, returns True if all counts match
+def runSuite(depth=3, bitboard=False, out=print):
+    allCorrect = True
+    totalNodes = 0
+    totalTime = 0.0
+    for name, fen, counts in POSITIONS:
+        for d in range(1, min(depth, len(counts)) + 1):
+            gs = createGameState(fen, bitboard)
+            start = time.perf_counter()
+            nodes = perft(gs, d)
+            elapsed = time.perf_counter() - start
+            totalNodes += nodes
+            totalTime += elapsed
+            correct = nodes == counts[d-1]
+            allCorrect = allCorrect and correct
+            out("%-16s depth %d %10d nodes %8.2fs %10.0f nodes/sec %s" % (name, d, nodes, elapsed,
+                nodes / elapsed if elapsed > 0 else 0, "ok" if correct else "FAILED (expected %d)" % counts[d-1]))
+    out("total %d nodes in %.2fs, %.0f nodes/sec" % (totalNodes, totalTime, totalNodes / totalTime if totalTime > 0 else 0))
+    return allCorrect
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft correctness and speed suite")
+    parser.add_argument("depth", type=int, nargs="?", default=3)
+    parser.add_argument("--bitboard", action="store_true", help="use the bitboard backend")
+    parser.add_argument("--divide", metavar="FEN", help="print the node count of every root move of FEN")
+    args = parser.parse_args()
+    if args.divide:
+        gs = createGameState(args.divide, args.bitboard)
+        results = divide(gs, args.depth)
+        for notation, nodes in results:
+            print(notation, nodes)
+        print("total", sum(nodes for notation, nodes in results))
+    else:
+        raise SystemExit(0 if runSuite(args.depth, args.bitboard) else 1)
+
+if __name__ == '__main__':
+    main()
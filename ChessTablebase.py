@@ -0,0 +1,252 @@
+#Built-in endgame tablebases for king and queen, rook or pawn against a lone king, generated by retrograde analysis.
+#Each table has one byte per position: 0 for a draw (or an illegal position), otherwise the stronger side wins and
+#the byte is the distance to mate in plies + 1. Positions are indexed as ((weak side to move * 64 + strong king) * 64
+#+ weak king) * 64 + piece with squares as row*8 + col and the stronger side playing up the board as white.
+#The files are memory-mapped, so processes probing the same directory share them
+#usage: python ChessTablebase.py generate [--dir tablebases]
+#       python ChessTablebase.py probe FEN [--dir tablebases]
+
+import argparse, mmap, os, time
+import ChessEngine
+
+TABLEBASE_DIR = "tablebases"
+TABLES = ["KQK", "KRK", "KPK"] #KPK promotes into the other two, so it is generated last
+TABLE_SIZE = 2 * 64 * 64 * 64
+#probe results kept per zobrist key, the cache is emptied when it is full
+CACHE_SIZE = 100000
+WIN, DRAW, LOSS = 1, 0, -1
+
+#square tables
+kingSquares = [[r2 * 8 + c2 for r2 in range(s // 8 - 1, s // 8 + 2) for c2 in range(s % 8 - 1, s % 8 + 2)
+                if 0 <= r2 < 8 and 0 <= c2 < 8 and (r2, c2) != (s // 8, s % 8)] for s in range(64)]
+kingMasks = [sum(1 << t for t in kingSquares[s]) for s in range(64)]
+rookDirections = ((-1, 0), (1, 0), (0, -1), (0, 1))
+bishopDirections = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+#rays[s][d] are the squares from s outwards in direction d of kingDirections (orthogonal first)
+rays = [[[(s // 8 + dr * i) * 8 + s % 8 + dc * i for i in range(1, 8) if 0 <= s // 8 + dr * i < 8 and 0 <= s % 8 + dc * i < 8]
+         for dr, dc in ChessEngine.kingDirections] for s in range(64)]
+
+#squares strictly between a and b along the line through them for the given directions, None if not on one
+def betweenMasks(directions):
+    between = [[None] * 64 for s in range(64)]
+    for s in range(64):
+        for d, (dr, dc) in enumerate(ChessEngine.kingDirections):
+            if (dr, dc) not in directions:
+                continue
+            mask = 0
+            for t in rays[s][d]:
+                between[s][t] = mask
+                mask |= 1 << t
+    return between
+
+rookBetween = betweenMasks(rookDirections)
+bishopBetween = betweenMasks(bishopDirections)
+queenBetween = betweenMasks(rookDirections + bishopDirections)
+pieceBetween = {"Q": queenBetween, "R": rookBetween}
+pieceRays = {"Q": range(8), "R": range(4)}
+
+def tableIndex(weakToMove, strongKing, weakKing, piece):
+    return ((weakToMove * 64 + strongKing) * 64 + weakKing) * 64 + piece
+
+#True if the piece (strong side, moving up the board) on square piece attacks square t, with the strong king as the only blocker
+def pieceAttacks(pieceType, piece, t, strongKing):
+    if pieceType == "P":
+        return t // 8 == piece // 8 - 1 and abs(t % 8 - piece % 8) == 1
+    between = pieceBetween[pieceType][piece][t]
+    return between is not None and between & (1 << strongKing) == 0
+
+#Retrograde analysis of one table, promotions look up the tables in done (name -> bytes) so KPK needs KQK and KRK
+def generateTable(name, done, out=print):
+    pieceType = name[1]
+    values = bytearray(TABLE_SIZE)
+    counts = bytearray(64 * 64 * 64) #legal moves of the weak king that aren't known to lose yet
+    buckets = [[] for i in range(256)] #positions by distance to mate in plies
+    start = time.perf_counter()
+    for strongKing in range(64):
+        for weakKing in range(64):
+            if weakKing == strongKing or kingMasks[strongKing] >> weakKing & 1:
+                continue
+            for piece in range(64):
+                if piece == strongKing or piece == weakKing or (pieceType == "P" and (piece < 8 or piece >= 56)):
+                    continue
+                count = 0
+                for t in kingSquares[weakKing]:
+                    if kingMasks[strongKing] >> t & 1:
+                        continue
+                    if t == piece or not pieceAttacks(pieceType, piece, t, strongKing):
+                        count += 1
+                index = tableIndex(1, strongKing, weakKing, piece) - TABLE_SIZE // 2
+                counts[index] = count
+                if count == 0 and pieceAttacks(pieceType, piece, weakKing, strongKing):
+                    values[index + TABLE_SIZE // 2] = 1
+                    buckets[0].append(index + TABLE_SIZE // 2)
+                #promotions of the pawn with the strong side to move
+                if pieceType == "P" and piece < 16 and not pieceAttacks("P", piece, weakKing, strongKing):
+                    for promoted in ("Q", "R"):
+                        to = piece - 8
+                        if to == strongKing or to == weakKing:
+                            continue
+                        value = done["K" + promoted + "K"][tableIndex(1, strongKing, weakKing, to)]
+                        if value > 0:
+                            buckets[value].append(tableIndex(0, strongKing, weakKing, piece))
+    for plies in range(255):
+        for index in buckets[plies]:
+            weakToMove, strongKing, weakKing, piece = index >> 18, index >> 12 & 63, index >> 6 & 63, index & 63
+            if weakToMove:
+                #lost for the weak side, every strong move into it wins
+                for predecessor in strongUnmoves(pieceType, strongKing, weakKing, piece):
+                    if values[predecessor] == 0:
+                        buckets[plies + 1].append(predecessor)
+            else:
+                if values[index] != 0:
+                    continue
+                values[index] = plies + 1
+                for previous in kingSquares[weakKing]:
+                    if previous == piece or kingMasks[strongKing] >> previous & 1:
+                        continue
+                    predecessor = tableIndex(1, strongKing, previous, piece)
+                    counts[predecessor - TABLE_SIZE // 2] -= 1
+                    if counts[predecessor - TABLE_SIZE // 2] == 0:
+                        values[predecessor] = plies + 2
+                        buckets[plies + 1].append(predecessor)
+    out("%s: %d won positions in %.1fs" % (name, sum(1 for value in values if value), time.perf_counter() - start))
+    return values
+
+#strong side to move positions the strong side can reach the weak side to move position from
+def strongUnmoves(pieceType, strongKing, weakKing, piece):
+    predecessors = []
+    for previous in kingSquares[strongKing]:
+        if previous != piece and previous != weakKing and not kingMasks[weakKing] >> previous & 1 \
+                and not pieceAttacks(pieceType, piece, weakKing, previous):
+            predecessors.append(tableIndex(0, previous, weakKing, piece))
+    if pieceType == "P":
+        previous = [piece + 8] if piece + 8 < 56 and piece + 8 not in (strongKing, weakKing) else []
+        if piece // 8 == 4 and previous and piece + 16 not in (strongKing, weakKing):
+            previous.append(piece + 16)
+    else:
+        previous = []
+        for d in pieceRays[pieceType]:
+            for t in rays[piece][d]:
+                if t == strongKing or t == weakKing:
+                    break
+                previous.append(t)
+    for square in previous:
+        if not pieceAttacks(pieceType, square, weakKing, strongKing):
+            predecessors.append(tableIndex(0, strongKing, weakKing, square))
+    return predecessors
+
+def generateTables(directory=TABLEBASE_DIR, out=print):
+    os.makedirs(directory, exist_ok=True)
+    done = {}
+    for name in TABLES:
+        done[name] = generateTable(name, done, out)
+        with open(os.path.join(directory, name + ".bin"), "wb") as f:
+            f.write(done[name])
+
+#probes the tables found in a directory
+class Tablebase():
+    def __init__(self, directory=TABLEBASE_DIR):
+        self.files = []
+        self.tables = {}
+        for name in TABLES:
+            path = os.path.join(directory, name + ".bin")
+            if os.path.exists(path) and os.path.getsize(path) == TABLE_SIZE:
+                f = open(path, "rb")
+                self.files.append(f)
+                self.tables[name[1]] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.cache = {}
+        self.hits = 0
+        self.probes = 0
+
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+        for f in self.files:
+            f.close()
+        self.tables = {}
+
+    #(WIN, DRAW or LOSS for the side to move, plies to mate) or None when the position isn't covered
+    def probe(self, gs):
+        self.probes += 1
+        result = self.cache.get(gs.zobristKey, -1)
+        if result != -1:
+            self.hits += 1
+            return result
+        result = self.lookup(gs)
+        if len(self.cache) >= CACHE_SIZE:
+            self.cache.clear()
+        self.cache[gs.zobristKey] = result
+        return result
+
+    def lookup(self, gs):
+        if gs.currentCastlingRight.getBits() != 0:
+            return None
+        pieces = []
+        for r in range(8):
+            for c in range(8):
+                if gs.board[r][c] != "--" and gs.board[r][c][1] != "K":
+                    pieces.append((gs.board[r][c], r, c))
+                    if len(pieces) > 1:
+                        return None
+        if len(pieces) == 0:
+            return (DRAW, 0)
+        piece, r, c = pieces[0]
+        pieceType = piece[1].upper()
+        if pieceType not in self.tables:
+            if pieceType in "BN":
+                return (DRAW, 0)
+            return None
+        #the strong side is white in the table, black's positions are flipped top to bottom
+        if piece[0] == "w":
+            strongKing, weakKing, square = gs.whiteKingLocation, gs.blackKingLocation, (r, c)
+            flip = 0
+        else:
+            strongKing, weakKing, square = gs.blackKingLocation, gs.whiteKingLocation, (r, c)
+            flip = 7
+        strongToMove = gs.whiteToMove == (piece[0] == "w")
+        value = self.tables[pieceType][tableIndex(0 if strongToMove else 1, (strongKing[0] ^ flip) * 8 + strongKing[1],
+                                                 (weakKing[0] ^ flip) * 8 + weakKing[1], (square[0] ^ flip) * 8 + square[1])]
+        if value == 0:
+            return (DRAW, 0)
+        return (WIN, value - 1) if strongToMove else (LOSS, value - 1)
+
+    #(move, (result, plies)) of the best move by the tables: the fastest win, any draw or the slowest loss,
+    #None if the position isn't covered. Pawns promote to queens like everywhere else in the engine
+    def getBestMove(self, gs, validMoves):
+        if self.probe(gs) is None:
+            return None
+        best = None
+        bestRank = None
+        for move in validMoves:
+            gs.makeMove(move)
+            result = self.probe(gs)
+            gs.undoMove()
+            if result is None:
+                return None
+            outcome, plies = result
+            #the result is from the opponent's side, rank our outcome first, then prefer short wins and long losses
+            rank = (-outcome, -plies if outcome == LOSS else plies)
+            if bestRank is None or rank > bestRank:
+                best = (move, (-outcome, plies + 1 if outcome != DRAW else 0))
+                bestRank = rank
+        return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate or probe the built-in endgame tablebases")
+    parser.add_argument("command", choices=["generate", "probe"])
+    parser.add_argument("fen", nargs="*")
+    parser.add_argument("--dir", default=TABLEBASE_DIR)
+    args = parser.parse_args()
+    if args.command == "generate":
+        generateTables(args.dir)
+    else:
+        tablebase = Tablebase(args.dir)
+        gs = ChessEngine.GameState.fromFen(" ".join(args.fen))
+        print(tablebase.probe(gs))
+        best = tablebase.getBestMove(gs, gs.getValidMoves())
+        if best is not None:
+            print(best[0].getCoordinateNotation(), best[1])
+        tablebase.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#UCI protocol front end so the engine can run headless under match runners and chess GUIs
+#usage: python ChessUCI.py (reads UCI commands on stdin, answers on stdout)
+
+import sys, threading
+import ChessEngine
+import ChessAI
+import ChessBook
+import ChessTablebase
+
+ENGINE_NAME = "ChessAI"
+ENGINE_AUTHOR = "ChessAI authors"
+#moves left assumed when the GUI doesn't send movestogo
+DEFAULT_MOVES_TO_GO = 30
+#kept back from every time budget for the GUI round trip
+MOVE_OVERHEAD_MS = 50
+MAX_PV_LENGTH = 32
+
+class UCIEngine():
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.outputLock = threading.Lock()
+        self.gs = ChessEngine.GameState()
+        self.searcher = ChessAI.Searcher()
+        self.searchThread = None
+        self.stopEvent = threading.Event()
+        #set when an infinite or ponder search may report its best move, None for other searches
+        self.releaseEvent = None
+        #a ponder search's time budget in seconds, started by ponderhit, and the timer that stops the search after it
+        self.ponderTime = None
+        self.ponderTimer = None
+        self.running = True
+
+    def send(self, line):
+        with self.outputLock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    #returns False once quit has been received. A malformed command (bad FEN, a non-integer where a number belongs)
+    #is reported as an info string and the engine keeps reading commands
+    def handleCommand(self, line):
+        tokens = line.split()
+        if len(tokens) == 0:
+            return self.running
+        try:
+            self.runCommand(tokens)
+        except ValueError as e:
+            self.send("info string error in '%s': %s" % (line.strip(), e))
+        return self.running
+
+    def runCommand(self, tokens):
+        command = tokens[0]
+        if command == "uci":
+            self.send("id name " + ENGINE_NAME)
+            self.send("id author " + ENGINE_AUTHOR)
+            self.send("option name Hash type spin default %d min 1 max 1024" % ChessAI.TT_SIZE_MB)
+            self.send("option name BookFile type string default <empty>")
+            self.send("option name TablebasePath type string default <empty>")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stopSearch()
+            self.searcher.newGame()
+            self.gs = ChessEngine.GameState()
+        elif command == "setoption":
+            self.stopSearch()
+            self.setOption(tokens[1:])
+        elif command == "position":
+            self.stopSearch()
+            self.setPosition(tokens[1:])
+        elif command == "go":
+            self.stopSearch()
+            self.go(tokens[1:])
+        elif command == "ponderhit":
+            self.ponderHit()
+        elif command == "stop":
+            self.stopSearch()
+        elif command == "quit":
+            self.stopSearch()
+            self.running = False
+
+    def setOption(self, tokens):
+        if "name" not in tokens or "value" not in tokens:
+            return
+        name = " ".join(tokens[tokens.index("name") + 1:tokens.index("value")]).lower()
+        value = " ".join(tokens[tokens.index("value") + 1:])
+        if name == "hash":
+            self.searcher.transpositionTable.resize(max(1, int(value)))
+        elif name == "bookfile":
+            if self.searcher.book is not None:
+                self.searcher.book.close()
+                self.searcher.book = None
+            if value not in ("", "<empty>"):
+                try:
+                    self.searcher.book = ChessBook.OpeningBook(value)
+                except OSError as e:
+                    self.send("info string can't open book %s: %s" % (value, e))
+        elif name == "tablebasepath":
+            if self.searcher.tablebase is not None:
+                self.searcher.tablebase.close()
+                self.searcher.tablebase = None
+            if value not in ("", "<empty>"):
+                self.searcher.tablebase = ChessTablebase.Tablebase(value)
+                self.send("info string %d tablebases found in %s" % (len(self.searcher.tablebase.tables), value))
+
+    def setPosition(self, tokens):
+        if len(tokens) == 0:
+            return
+        movesIndex = tokens.index("moves") if "moves" in tokens else len(tokens)
+        if tokens[0] == "startpos":
+            self.gs = ChessEngine.GameState()
+        elif tokens[0] == "fen":
+            self.gs = ChessEngine.GameState.fromFen(" ".join(tokens[1:movesIndex]))
+        for notation in tokens[movesIndex + 1:]:
+            if not self.playMove(notation):
+                self.send("info string illegal move " + notation)
+                break
+
+    #plays a move given in coordinate notation (e2e4, e7e8q), returns False if it isn't legal
+    def playMove(self, notation):
+        notation = notation.lower()
+        for move in self.gs.getValidMoves():
+            promoteValue = notation[4].upper() if move.isPawnPromotion and len(notation) > 4 else ""
+            if move.getCoordinateNotation(promoteValue) == notation:
+                self.gs.makeMove(move, promoteValue=promoteValue)
+                return True
+        return False
+
+    def go(self, tokens):
+        params = {}
+        infinite = False
+        ponder = False
+        i = 0
+        while i < len(tokens):
+            if tokens[i] == "infinite":
+                infinite = True
+                i += 1
+            elif tokens[i] == "ponder":
+                ponder = True
+                i += 1
+            elif i + 1 < len(tokens):
+                params[tokens[i]] = tokens[i + 1]
+                i += 2
+            else:
+                i += 1
+        maxDepth = int(params["depth"]) if "depth" in params else None
+        nodeLimit = int(params["nodes"]) if "nodes" in params else None
+        timeLimit = None if infinite else self.allocateTime(params)
+        #a ponder search runs on the opponent's time without a time limit until ponderhit starts the clock
+        self.ponderTime = timeLimit if ponder else None
+        if ponder:
+            timeLimit = None
+        if maxDepth is None and timeLimit is None and nodeLimit is None:
+            maxDepth = ChessAI.MAX_DEPTH
+        self.stopEvent = threading.Event()
+        self.releaseEvent = threading.Event() if infinite or ponder else None
+        self.searchThread = threading.Thread(target=self.search, args=(maxDepth, timeLimit, nodeLimit, self.stopEvent, self.releaseEvent))
+        self.searchThread.daemon = True
+        self.searchThread.start()
+
+    #seconds to spend on this move from the go parameters, None if the search isn't time limited
+    def allocateTime(self, params):
+        if "movetime" in params:
+            return max(1, int(params["movetime"]) - MOVE_OVERHEAD_MS) / 1000
+        remaining = params.get("wtime" if self.gs.whiteToMove else "btime")
+        if remaining is None:
+            return None
+        remaining = int(remaining)
+        increment = int(params.get("winc" if self.gs.whiteToMove else "binc", 0))
+        movesToGo = int(params.get("movestogo", DEFAULT_MOVES_TO_GO))
+        budget = min(remaining / max(1, movesToGo) + increment * 3 / 4, remaining / 2) - MOVE_OVERHEAD_MS
+        return max(1, budget) / 1000
+
+    #the opponent played the pondered move: the ponder search goes on as the search for our move, with the time
+    #budget of its go command counted from now
+    def ponderHit(self):
+        if self.searchThread is None or self.releaseEvent is None or self.releaseEvent.is_set():
+            return
+        if self.ponderTime is not None:
+            self.ponderTimer = threading.Timer(self.ponderTime, self.stopEvent.set)
+            self.ponderTimer.daemon = True
+            self.ponderTimer.start()
+        self.releaseEvent.set()
+
+    #runs on the search thread
+    def search(self, maxDepth, timeLimit, nodeLimit, stopEvent, releaseEvent):
+        validMoves = self.gs.getValidMoves()
+        bestMove = None
+        promoteValue = ""
+        if len(validMoves) > 0:
+            bestMove, score = self.searcher.findBestMove(self.gs, validMoves, maxDepth, timeLimit, nodeLimit,
+                stopEvent=stopEvent, infoCallback=self.sendInfo)
+            promoteValue = self.searcher.promoteValue
+            if bestMove is None:
+                bestMove = validMoves[0]
+            elif self.searcher.completedDepth == 0 and self.searcher.tablebase is not None and self.gs.pieceCount <= ChessAI.TABLEBASE_PIECES:
+                self.send("info string tablebase move score cp %d" % round(score * 100))
+            elif self.searcher.completedDepth == 0:
+                self.send("info string book move")
+        #infinite and ponder searches only report their best move once the GUI says stop (or ponderhit)
+        if releaseEvent is not None:
+            releaseEvent.wait()
+        self.send("bestmove " + (bestMove.getCoordinateNotation(promoteValue) if bestMove is not None else "0000"))
+
+    def sendInfo(self, depth, score, nodes, seconds):
+        pv = self.searcher.getPrincipalVariation(self.gs, MAX_PV_LENGTH)
+        if abs(score) >= ChessAI.CHECKMATE:
+            scoreText = "mate %d" % ((len(pv) + 1) // 2 if score > 0 else -(len(pv) // 2))
+        else:
+            scoreText = "cp %d" % round(score * 100)
+        milliseconds = int(seconds * 1000)
+        self.send("info depth %d score %s nodes %d nps %d time %d pv %s" % (depth, scoreText, nodes,
+            nodes / seconds if seconds > 0 else 0, milliseconds, " ".join(move.getCoordinateNotation() for move in pv)))
+
+    def stopSearch(self):
+        if self.searchThread is not None:
+            self.stopEvent.set()
+            self.joinSearch()
+
+    #lets a running search end on its own limits, infinite searches and ponder searches without a ponderhit are stopped
+    def waitForSearch(self):
+        if self.searchThread is not None:
+            if self.releaseEvent is not None and not self.releaseEvent.is_set():
+                self.stopEvent.set()
+            self.joinSearch()
+
+    def joinSearch(self):
+        if self.releaseEvent is not None:
+            self.releaseEvent.set()
+        self.searchThread.join()
+        self.searchThread = None
+        if self.ponderTimer is not None:
+            self.ponderTimer.cancel()
+            self.ponderTimer = None
+
+def main():
+    engine = UCIEngine()
+    for line in sys.stdin:
+        if not engine.handleCommand(line):
+            break
+    #stdin closed without quit, e.g. commands piped in from a file
+    engine.waitForSearch()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+#Search in a separate process for the GUI, so the window keeps handling events and drawing while the AI thinks.
+#Every search gets an id. The GUI cancels a search by changing the wanted id (the worker's search stops at its next node)
+#and ignores results carrying any other id, so a result never lands on a position that changed in the meantime.
+#After the AI moves, the worker can ponder: search the position after the reply predicted by the principal variation
+#while the human thinks. If the human plays that reply the ponder search becomes the AI's search, otherwise it is cancelled
+
+import multiprocessing, pickle, queue, threading, time
+import ChessAI
+import ChessBook
+import ChessTablebase
+
+#seconds between progress reports of a running search
+PROGRESS_INTERVAL = 0.1
+
+#stop flag of one search for Searcher.findBestMove, set as soon as the GUI wants another search or none
+class SearchCancel():
+    def __init__(self, wanted, searchID):
+        self.wanted = wanted
+        self.searchID = searchID
+
+    def is_set(self):
+        return self.wanted.value != self.searchID
+
+#runs in the worker process, the searcher and its transposition table live as long as the process
+def runSearchWorker(commands, results, wanted, bookPath, tablebaseDir):
+    searcher = ChessAI.Searcher()
+    if bookPath is not None:
+        searcher.book = ChessBook.OpeningBook(bookPath)
+    if tablebaseDir is not None:
+        searcher.tablebase = ChessTablebase.Tablebase(tablebaseDir)
+    while True:
+        command = commands.get()
+        if command[0] == "quit":
+            break
+        elif command[0] == "newgame":
+            searcher.newGame()
+        elif command[0] == "search":
+            searchID, gs, maxDepth, timeLimit, ponderMoveID = command[1:]
+            #searches cancelled before they started are skipped
+            if wanted.value == searchID:
+                gs = pickle.loads(gs)
+                if ponderMoveID is not None:
+                    move = [move for move in gs.getValidMoves() if move.moveID == ponderMoveID][0]
+                    gs.makeMove(move) if not move.isPawnPromotion else gs.makeMove(move, promoteValue="Q")
+                search(searcher, results, wanted, searchID, gs, maxDepth, timeLimit)
+
+#Searches one position and reports ("progress", searchID, depth, nodes, seconds, best moveID, score) every
+#PROGRESS_INTERVAL and after every iteration, then ("bestmove", searchID, moveID, promoteValue, score, seconds,
+#predicted reply moveID)
+def search(searcher, results, wanted, searchID, gs, maxDepth, timeLimit):
+    best = [None, 0]
+    start = time.time()
+    done = threading.Event()
+
+    def sendProgress():
+        results.put(("progress", searchID, searcher.searchDepth, searcher.nodesSearched, time.time() - start, best[0], best[1]))
+
+    def reportProgress():
+        while not done.wait(PROGRESS_INTERVAL):
+            sendProgress()
+
+    def iterationDone(depth, score, nodes, seconds):
+        pv = searcher.getPrincipalVariation(gs, 1)
+        best[0] = pv[0].moveID if len(pv) > 0 else None
+        best[1] = score
+        sendProgress()
+
+    if maxDepth is None and timeLimit is None:
+        maxDepth = searcher.depth
+    reporter = threading.Thread(target=reportProgress)
+    reporter.daemon = True
+    reporter.start()
+    try:
+        move, score = searcher.findBestMove(gs, gs.getValidMoves(), maxDepth, timeLimit,
+            stopEvent=SearchCancel(wanted, searchID), infoCallback=iterationDone)
+    finally:
+        done.set()
+        reporter.join()
+    seconds = time.time() - start
+    #the reply comes from the table, book and tablebase moves have none
+    reply = None
+    pv = searcher.getPrincipalVariation(gs, 2)
+    if move is not None and len(pv) == 2 and pv[0].moveID == move.moveID:
+        reply = pv[1].moveID
+    results.put(("bestmove", searchID, move.moveID if move is not None else None, searcher.promoteValue, score, seconds, reply))
+
+#the GUI's end of the worker process
+class SearchWorker():
+    def __init__(self, bookPath=None, tablebaseDir=None):
+        self.commands = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        #id of the search the GUI still wants, 0 for none
+        self.wanted = multiprocessing.RawValue("i", 0)
+        self.process = multiprocessing.Process(target=runSearchWorker,
+            args=(self.commands, self.results, self.wanted, bookPath, tablebaseDir))
+        self.process.daemon = True
+        self.process.start()
+        self.lastSearchID = 0
+        self.searchID = 0
+        #(depth, nodes, seconds, best moveID, score) of the running search, None until its first report
+        self.progress = None
+        #predicted reply of the last finished search, pondered by ponder()
+        self.predictedReply = None
+        #ponder search: its id, the moves of the game before the predicted reply, the reply, when it started, and its
+        #progress, bestmove message and duration kept until a ponder hit wants them
+        self.ponderID = 0
+        self.ponderLog = None
+        self.ponderMoveID = None
+        self.ponderStart = 0.0
+        self.ponderProgress = None
+        self.ponderResult = None
+        self.ponderSeconds = None
+        #ponder hits, misses and time saved
+        self.stats = ChessAI.SearchStats()
+        #bestmove message of the current search, returned by the next poll
+        self.result = None
+
+    #starts searching gs, a search that is still running is cancelled. When gs is the position that is being pondered
+    #(a ponder hit) the ponder search carries on as this search instead
+    def start(self, gs, maxDepth=None, timeLimit=None):
+        self.readMessages()
+        if self.ponderID != 0:
+            if gs.moveLog[:-1] == self.ponderLog and gs.moveLog[-1].moveID == self.ponderMoveID and self.isPonderedPromotion(gs):
+                self.stats.ponderHits += 1
+                self.stats.ponderTimeSaved += self.ponderSeconds if self.ponderSeconds is not None else time.time() - self.ponderStart
+                self.searchID = self.ponderID
+                self.progress = self.ponderProgress
+                self.result = self.ponderResult
+                self.ponderID = 0
+                return
+            self.stats.ponderMisses += 1
+            self.ponderID = 0
+        self.send(gs, None, maxDepth, timeLimit)
+        self.searchID = self.lastSearchID
+        self.progress = None
+
+    #the ponder search promotes to a queen like the rest of the search, moveID alone doesn't tell an underpromotion apart
+    def isPonderedPromotion(self, gs):
+        move = gs.moveLog[-1]
+        return not move.isPawnPromotion or gs.board[move.endRow][move.endCol][1] == "Q"
+
+    #Searches the position after the predicted reply to the AI's last move with the same limits as the AI's search,
+    #gs is the position the human is to move in. Returns False when there is no prediction
+    def ponder(self, gs, maxDepth=None, timeLimit=None):
+        if self.predictedReply is None:
+            return False
+        self.send(gs, self.predictedReply, maxDepth, timeLimit)
+        self.ponderID = self.lastSearchID
+        self.ponderLog = list(gs.moveLog)
+        self.ponderMoveID = self.predictedReply
+        self.ponderStart = time.time()
+        self.ponderProgress = None
+        self.ponderResult = None
+        self.ponderSeconds = None
+        self.predictedReply = None
+        return True
+
+    def send(self, gs, ponderMoveID, maxDepth, timeLimit):
+        self.lastSearchID += 1
+        self.wanted.value = self.lastSearchID
+        self.result = None
+        #pickled right away, the queue would only pickle it later on its feeder thread when the GUI may have moved on
+        self.commands.put(("search", self.lastSearchID, pickle.dumps(gs), maxDepth, timeLimit, ponderMoveID))
+
+    #cancels the search and the ponder search
+    def cancel(self):
+        self.searchID = 0
+        self.ponderID = 0
+        self.wanted.value = 0
+        self.progress = None
+        self.result = None
+        self.predictedReply = None
+
+    def isSearching(self):
+        return self.searchID != 0
+
+    def newGame(self):
+        self.cancel()
+        self.commands.put(("newgame",))
+
+    #returns (moveID, promoteValue, score) once the current search is done, None before that
+    def poll(self):
+        self.readMessages()
+        if self.result is None:
+            return None
+        moveID, promoteValue, score, seconds, reply = self.result[2:]
+        self.cancel()
+        self.predictedReply = reply
+        return moveID, promoteValue, score
+
+    #takes in what the worker sent, messages of cancelled searches are dropped and those of the ponder search are kept
+    #for a ponder hit
+    def readMessages(self):
+        while True:
+            try:
+                message = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if message[1] == self.ponderID and self.ponderID != 0:
+                if message[0] == "progress":
+                    self.ponderProgress = message[2:]
+                else:
+                    self.ponderResult = message
+                    self.ponderSeconds = message[5]
+            elif message[1] == self.searchID and self.searchID != 0:
+                if message[0] == "progress":
+                    self.progress = message[2:]
+                else:
+                    self.result = message
+
+    def close(self):
+        self.cancel()
+        self.commands.put(("quit",))
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
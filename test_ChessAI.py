@@ -0,0 +1,225 @@
+#Searcher: results on both backends and the position left behind by a search
+#run with: python -m pytest
+
+import threading
+import pytest
+import ChessEngine
+import ChessBitboard
+import ChessAI
+import ChessPerft
+
+def search(gs, depth=None, timeLimit=None, nodeLimit=None):
+    return ChessAI.Searcher(seed=0).findBestMove(gs, gs.getValidMoves(), depth, timeLimit, nodeLimit)
+
+#the bitboard backend has the whole GameState api the search uses, so both backends search the same tree
+@pytest.mark.parametrize("name, fen, counts", ChessPerft.POSITIONS, ids=[position[0] for position in ChessPerft.POSITIONS])
+def testSearchOnBothBackends(name, fen, counts):
+    move, score = search(ChessEngine.GameState.fromFen(fen), 3)
+    bbMove, bbScore = search(ChessBitboard.BitboardGameState(ChessEngine.GameState.fromFen(fen)), 3)
+    assert (move.moveID, score) == (bbMove.moveID, bbScore)
+
+@pytest.mark.parametrize("bitboard", [False, True], ids=["GameState", "bitboard"])
+def testFindsMateInOne(bitboard):
+    gs = ChessPerft.createGameState("6k1/8/6K1/8/8/8/8/Q7 w - - 0 1", bitboard)
+    move, score = search(gs, 3)
+    assert move.getCoordinateNotation() == "a1a8"
+    assert score >= ChessAI.CHECKMATE
+
+#a search stopped by its node budget takes back every move it made, null moves included
+@pytest.mark.parametrize("bitboard", [False, True], ids=["GameState", "bitboard"])
+def testStoppedSearchRestoresPosition(bitboard):
+    name, fen, counts = ChessPerft.POSITIONS[1]
+    gs = ChessPerft.createGameState(fen, bitboard)
+    key = gs.zobristKey
+    move, score = search(gs, nodeLimit=3000)
+    assert move is not None
+    assert gs.zobristKey == key and len(gs.moveLog) == 0 and gs.whiteToMove
+
+#draws by rule are seen inside the search, where the moves are generated in stages
+def testInsufficientMaterialIsDraw():
+    gs = ChessEngine.GameState.fromFen("8/8/4k3/8/8/2B5/8/4K3 w - - 0 1")
+    move, score = search(gs, 3)
+    assert score == ChessAI.STALEMATE
+
+#search options belong to one Searcher, the module settings are only their defaults
+def testOptionsArePerSearcher():
+    searcher = ChessAI.Searcher(options={"USE_NULL_MOVE": False, "LMR_REDUCTION": 2})
+    assert not searcher.useNullMove and searcher.lmrReduction == 2
+    assert ChessAI.USE_NULL_MOVE and ChessAI.Searcher().useNullMove
+    with pytest.raises(ValueError):
+        ChessAI.Searcher(options={"USE_NOTHING": True})
+
+#null windows and aspiration windows only prune what alpha-beta would prune, the score stays that of the full window search.
+#Null move and LMR are off as they can change the score on their own
+@pytest.mark.parametrize("name", ["initial", "kiwipete", "enpassant", "castling", "middlegame"])
+def testWindowsKeepScore(name):
+    fen = [position[1] for position in ChessPerft.POSITIONS if position[0] == name][0]
+    scores = []
+    for pvs, aspiration in [(False, False), (True, False), (False, True), (True, True)]:
+        gs = ChessEngine.GameState.fromFen(fen)
+        searcher = ChessAI.Searcher(options={"USE_NULL_MOVE": False, "USE_LMR": False, "USE_PVS": pvs, "USE_ASPIRATION": aspiration}, seed=0)
+        move, score = searcher.findBestMove(gs, gs.getValidMoves(), 3)
+        scores.append(score)
+    assert scores[1:] == [pytest.approx(scores[0])] * 3
+
+#clearing empties the table without allocating new lists
+def testTranspositionTableClear():
+    tt = ChessAI.TranspositionTable(1)
+    keys = tt.keys
+    tt.store(12345, 3, 1.5, ChessAI.TranspositionTable.EXACT, 1234)
+    assert tt.probe(12345) != -1
+    tt.clear()
+    assert tt.keys is keys
+    assert tt.probe(12345) == -1
+    assert tt.depths[(12345 % tt.numBuckets) * 2] == -1
+
+#material won by the first capture in pawns, the x-ray rook joins in once the rook in front of it has taken
+@pytest.mark.parametrize("fen, notation, gain", [
+    ("4k3/8/8/3n4/8/8/8/3RK3 w - - 0 1", "d1d5", 3),
+    ("4k3/8/2p5/3n4/4P3/8/8/4K3 w - - 0 1", "e4d5", 2),
+    ("3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1", "d2d5", 1),
+    ("3rk3/8/8/3p4/8/8/3R4/4K3 w - - 0 1", "d2d5", -4),
+    ("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1", "d1d5", -8),
+])
+def testStaticExchange(fen, notation, gain):
+    gs = ChessEngine.GameState.fromFen(fen)
+    move = [move for move in gs.getValidMoves() if move.getCoordinateNotation() == notation][0]
+    assert ChessAI.staticExchange(gs, move) == gain
+
+QUIESCENCE_POSITIONS = [
+    ("4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1", "d1d5"),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", "f3f6"),
+]
+
+#at depth 1 the recapture is beyond the horizon, only the quiescence search sees that the piece taken is defended
+@pytest.mark.parametrize("fen, hangingCapture", QUIESCENCE_POSITIONS)
+def testQuiescenceAvoidsHangingCapture(fen, hangingCapture):
+    for quiescence in (True, False):
+        gs = ChessEngine.GameState.fromFen(fen)
+        move, score = ChessAI.Searcher(options={"USE_QUIESCENCE": quiescence}, seed=0).findBestMove(gs, gs.getValidMoves(), 1)
+        assert (move.getCoordinateNotation() == hangingCapture) != quiescence
+
+#delta and SEE pruning only skip captures that can't change the result
+@pytest.mark.parametrize("fen", [position[0] for position in QUIESCENCE_POSITIONS] + ["3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1"])
+def testQuiescencePruningKeepsResult(fen):
+    results = []
+    for pruning in (True, False):
+        gs = ChessEngine.GameState.fromFen(fen)
+        searcher = ChessAI.Searcher(options={"USE_DELTA_PRUNING": pruning, "USE_SEE_PRUNING": pruning}, seed=0)
+        move, score = searcher.findBestMove(gs, gs.getValidMoves(), 3)
+        results.append((move.getCoordinateNotation(), score))
+    assert results[0][0] == results[1][0] and results[0][1] == pytest.approx(results[1][1])
+
+#hash move, captures by MVV-LVA, the two killers, then quiet moves by history score
+def testOrderMoves():
+    gs = ChessEngine.GameState.fromFen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    moves = gs.getValidMoves()
+    moveIDs = {move.getCoordinateNotation(): move.moveID for move in moves}
+    searcher = ChessAI.Searcher()
+    searcher.killerMoves[2] = [moveIDs["a1b1"], moveIDs["e1d1"]]
+    searcher.historyScores[0][moveIDs["g2g3"]] = 50
+    ordered = [move.getCoordinateNotation() for move in searcher.orderMoves(moves, moveIDs["a2a3"], 2, True)]
+    captures = [move for move in moves if move.pieceCaptured != "--"]
+    assert ordered[0] == "a2a3"
+    orderedCaptures = ordered[1:len(captures) + 1]
+    assert sorted(orderedCaptures) == sorted(move.getCoordinateNotation() for move in captures)
+    scores = [ChessAI.mvvLva([move for move in moves if move.getCoordinateNotation() == notation][0]) for notation in orderedCaptures]
+    assert scores == sorted(scores, reverse=True)
+    #bishop and knight are worth the same, the bishop takes first as it is worth less than the queen
+    assert orderedCaptures[:2] == ["e2a6", "f3f6"]
+    assert ordered[len(captures) + 1:len(captures) + 4] == ["a1b1", "e1d1", "g2g3"]
+
+#Searchers share nothing: two searching at the same time on different threads return what each returns on its own
+def testSearchersInThreads():
+    fens = [position[1] for position in ChessPerft.POSITIONS if position[0] in ("kiwipete", "middlegame")]
+
+    def run(fen, searcher, results, barrier=None):
+        gs = ChessEngine.GameState.fromFen(fen)
+        stats = ChessAI.SearchStats()
+        if barrier is not None:
+            barrier.wait()
+        move, score = searcher.findBestMove(gs, gs.getValidMoves(), 3, stats=stats)
+        results[fen] = (move.moveID, score, stats.nodes, stats.betaCutoffs, searcher.transpositionTable.getStats(),
+                        [list(killers) for killers in searcher.killerMoves], [dict(history) for history in searcher.historyScores])
+
+    alone = {}
+    for fen in fens:
+        run(fen, ChessAI.Searcher(ttSizeMB=1, seed=0), alone)
+    together = {}
+    barrier = threading.Barrier(len(fens))
+    threads = [threading.Thread(target=run, args=(fen, ChessAI.Searcher(ttSizeMB=1, seed=0), together, barrier)) for fen in fens]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert together == alone
+
+#the search's counters after a fixed depth search, reading the principal variation afterwards doesn't change them
+def testSearchCounters():
+    gs = ChessEngine.GameState.fromFen(ChessPerft.POSITIONS[1][1])
+    searcher = ChessAI.Searcher(seed=0)
+    stats = ChessAI.SearchStats()
+    move, score = searcher.findBestMove(gs, gs.getValidMoves(), 3, stats=stats)
+    assert stats.depth == 3 and len(stats.iterationNodes) == 3
+    assert stats.nodes == searcher.nodesSearched == sum(stats.iterationNodes) > 0
+    assert 0 < stats.firstMoveCutoffs <= stats.betaCutoffs
+    assert 0 < stats.leafEvaluations and 0 < stats.moveGenerations
+    tt = searcher.transpositionTable.getStats()
+    #every probe is made at a node of the main search, every cutoff comes from a hit
+    assert 0 < tt["hits"] <= tt["probes"] <= stats.nodes
+    assert 0 < tt["cutoffs"] <= tt["hits"]
+    assert 0 < tt["stores"] <= tt["probes"]
+    pv = searcher.getPrincipalVariation(gs, 10)
+    assert pv[0].moveID == move.moveID
+    assert searcher.transpositionTable.getStats() == tt
+
+#a tiny node budget or a stop requested before the search starts still returns a legal move from the first iteration,
+#which always completes
+@pytest.mark.parametrize("limit", ["nodes", "stop"])
+def testSearchStoppedEarly(limit):
+    gs = ChessEngine.GameState.fromFen(ChessPerft.POSITIONS[1][1])
+    stopEvent = threading.Event()
+    stopEvent.set()
+    searcher = ChessAI.Searcher(seed=0)
+    move, score = searcher.findBestMove(gs, gs.getValidMoves(), nodeLimit=10 if limit == "nodes" else None,
+                                        stopEvent=stopEvent if limit == "stop" else None)
+    assert move.moveID in [legalMove.moveID for legalMove in gs.getValidMoves()]
+    assert searcher.completedDepth == 1
+
+#Keys in the same bucket: the deepest entry of the current search keeps the depth-preferred slot, everything else goes to
+#the always-replace slot. An entry from an earlier search gives up the depth-preferred slot to any depth
+def testTranspositionTableReplacement():
+    tt = ChessAI.TranspositionTable(1)
+    keys = [12345 + i * tt.numBuckets for i in range(5)]
+    slot = (keys[0] % tt.numBuckets) * 2
+    exact = ChessAI.TranspositionTable.EXACT
+    tt.store(keys[0], 5, 0, exact, None)
+    tt.store(keys[1], 2, 0, exact, None)
+    assert (tt.probe(keys[0]), tt.probe(keys[1])) == (slot, slot + 1)
+    tt.store(keys[2], 1, 0, exact, None)
+    assert (tt.probe(keys[0]), tt.probe(keys[1]), tt.probe(keys[2])) == (slot, -1, slot + 1)
+    tt.store(keys[3], 7, 0, exact, None)
+    assert (tt.probe(keys[0]), tt.probe(keys[3])) == (-1, slot)
+    tt.newSearch()
+    tt.store(keys[4], 1, 0, exact, None)
+    assert (tt.probe(keys[3]), tt.probe(keys[4])) == (-1, slot)
+
+#a lower bound only cuts the node off when it reaches beta, an upper bound when it doesn't reach alpha
+@pytest.mark.parametrize("flag, alpha, beta, cutoff", [
+    (ChessAI.TranspositionTable.LOWERBOUND, -5, 2, True),
+    (ChessAI.TranspositionTable.LOWERBOUND, -5, 3, False),
+    (ChessAI.TranspositionTable.UPPERBOUND, 2, 5, True),
+    (ChessAI.TranspositionTable.UPPERBOUND, 1, 5, False),
+])
+def testTranspositionTableBounds(flag, alpha, beta, cutoff):
+    gs = ChessEngine.GameState()
+    searcher = ChessAI.Searcher(ttSizeMB=1, seed=0)
+    searcher.searchDepth = 1
+    tt = searcher.transpositionTable
+    tt.store(gs.zobristKey, 10, 2, flag, None)
+    score = searcher.findMoveNegaMaxAlphaBeta(gs, None, 1, 1, alpha, beta, 1)
+    assert (tt.cutoffs == 1) == cutoff
+    if cutoff:
+        assert score == 2 and searcher.nodesSearched == 1
+    else:
+        assert searcher.nodesSearched > 1
@@ -0,0 +1,51 @@
+#Batch analysis: EPD/FEN reading, results independent of the worker, resuming after a crash
+#run with: python -m pytest
+
+import json
+import pytest
+import ChessEngine
+import ChessBatch
+import ChessPerft
+
+FENS = [fen for name, fen, counts in ChessPerft.POSITIONS]
+
+def analyseAll(order):
+    ChessBatch.initBatchWorker(1)
+    results = {}
+    for index in order:
+        result = ChessBatch.analysePosition((index, FENS[index], None, 3, None, None))
+        del result["time"]
+        results[index] = result
+    return results
+
+#a worker's earlier positions don't change the result of the next one
+def testResultsDontDependOnOrder():
+    assert analyseAll(range(len(FENS))) == analyseAll(reversed(range(len(FENS))))
+
+def testBadFen():
+    ChessBatch.initBatchWorker(1)
+    result = ChessBatch.analysePosition((0, "bad", "x", 2, None, None))
+    assert result["id"] == "x" and "error" in result
+
+def testReadPositions(tmp_path):
+    path = tmp_path / "positions.epd"
+    path.write_text("#comment\n\n" + FENS[0] + "\n" + " ".join(FENS[1].split()[:4]) + ' bm e2a6; id "kiwipete";\n')
+    assert list(ChessBatch.readPositions(str(path))) == [(0, FENS[0], None), (1, FENS[1], "kiwipete")]
+
+#a partly written last line is cut off and only the positions after the complete results are analysed
+def testResume(tmp_path):
+    inputPath = tmp_path / "positions.fen"
+    inputPath.write_text("\n".join(FENS[:3]) + "\n")
+    outputPath = tmp_path / "results.jsonl"
+    outputPath.write_text(json.dumps({"index": 0}) + "\n" + '{"index": 1, "fen"')
+    written = ChessBatch.runBatch(str(inputPath), str(outputPath), maxDepth=1, workers=1, hashMB=1, out=lambda *args: None)
+    assert written == 2
+    assert [json.loads(line)["index"] for line in outputPath.read_text().splitlines()] == [0, 1, 2]
+
+#a position at the fifty move limit is a draw but still has legal moves, the batch reports one of them
+@pytest.mark.parametrize("fen", ["4k3/8/8/8/8/8/4P3/4K2R w K - 99 80", "4k3/8/8/8/8/8/4P3/4K2R w K - 100 80"])
+def testFiftyMoveLimit(fen):
+    ChessBatch.initBatchWorker(1)
+    result = ChessBatch.analysePosition((0, fen, None, 3, None, None))
+    gs = ChessEngine.GameState.fromFen(fen)
+    assert result["bestmove"] in [move.getCoordinateNotation() for move in gs.getValidMoves()]
@@ -0,0 +1,75 @@
+#Opening book: building from PGN, lookup, and book promotions reaching the searcher
+#run with: python -m pytest
+
+import pytest
+import ChessEngine
+import ChessAI
+import ChessBook
+
+PGN = """[Event "1"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {main line} Nc6 (2... d6) 1-0
+
+[Event "2"]
+[Result "0-1"]
+
+1. e4 c5 0-1
+
+[Event "3"]
+[Result "1/2-1/2"]
+
+1. d4 d5 1/2-1/2
+"""
+
+def buildBook(tmp_path, minGames=1):
+    pgnPath = tmp_path / "games.pgn"
+    pgnPath.write_text(PGN)
+    bookPath = str(tmp_path / "book.bin")
+    ChessBook.buildBook([str(pgnPath)], bookPath, minGames=minGames, out=lambda *args: None)
+    return ChessBook.OpeningBook(bookPath)
+
+def bookMoves(book, gs):
+    return [(move.getCoordinateNotation(promoteValue), weight) for move, promoteValue, weight in book.getBookMoves(gs, gs.getValidMoves())]
+
+#2 points for a win, 1 for a draw, none for a loss, best move first
+def testBuildAndLookup(tmp_path):
+    book = buildBook(tmp_path)
+    gs = ChessEngine.GameState()
+    assert bookMoves(book, gs) == [("e2e4", 2), ("d2d4", 1)]
+    gs.makeMove([move for move in gs.getValidMoves() if move.getCoordinateNotation() == "e2e4"][0])
+    #e5 only lost, so it has no weight and is left out
+    assert bookMoves(book, gs) == [("c7c5", 2)]
+    gs.makeMove([move for move in gs.getValidMoves() if move.getCoordinateNotation() == "c7c5"][0])
+    assert bookMoves(book, gs) == []
+    assert book.getBookMove(gs, gs.getValidMoves()) is None
+    book.close()
+
+def testMinGames(tmp_path):
+    book = buildBook(tmp_path, minGames=2)
+    assert bookMoves(book, ChessEngine.GameState()) == [("e2e4", 2)]
+    book.close()
+
+@pytest.mark.parametrize("fen, san, notation", [
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "O-O", "e1g1"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "O-O-O", "e8c8"),
+    ("4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1", "exd5", "e4d5"),
+    ("4k3/8/8/8/8/8/8/RK4NR w - - 0 1", "Rhh2", "h1h2"),
+    ("8/P6k/8/8/8/8/8/K7 w - - 0 1", "a8=N+", "a7a8n"),
+])
+def testParseSan(fen, san, notation):
+    gs = ChessEngine.GameState.fromFen(fen)
+    move, promoteValue = ChessBook.parseSan(gs, san, gs.getValidMoves())
+    assert move.getCoordinateNotation(promoteValue) == notation
+
+#a book underpromotion is returned with its piece, not turned into a queen
+def testBookUnderpromotion(tmp_path):
+    gs = ChessEngine.GameState.fromFen("8/P6k/8/8/8/8/8/K7 w - - 0 1")
+    promotion = [move for move in gs.getValidMoves() if move.isPawnPromotion][0]
+    bookPath = str(tmp_path / "book.bin")
+    with open(bookPath, "wb") as f:
+        f.write(ChessBook.ENTRY.pack(gs.zobristKey, ChessBook.encodeMove(promotion, "N"), 1, 0))
+    searcher = ChessAI.Searcher(book=ChessBook.OpeningBook(bookPath))
+    move, score = searcher.findBestMove(gs, gs.getValidMoves(), 2)
+    assert move.getCoordinateNotation(searcher.promoteValue) == "a7a8n"
+    searcher.book.close()
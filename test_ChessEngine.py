@@ -0,0 +1,113 @@
+#GameState: FEN parsing and serialization, make/undo and the incremental key and evaluation, on both backends
+#run with: python -m pytest
+
+import random
+import pytest
+import ChessEngine
+import ChessBitboard
+import ChessPerft
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+def playMoves(gs, notations):
+    for notation in notations:
+        move = [move for move in gs.getValidMoves() if move.getCoordinateNotation() == notation][0]
+        gs.makeMove(move)
+
+@pytest.mark.parametrize("fen", [position[1] for position in ChessPerft.POSITIONS] + [
+    "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 3",
+    "r3k3/8/8/8/8/8/8/4K2R b Kq - 12 40",
+])
+def testFenRoundTrip(fen):
+    gs = ChessEngine.GameState.fromFen(fen)
+    assert gs.toFen() == fen
+    assert gs.zobristKey == gs.computeZobristKey()
+    assert (gs.materialScore, gs.positionScore) == gs.computeEvalScores()
+
+def testStartingPosition():
+    assert ChessEngine.GameState().toFen() == START_FEN
+    assert ChessEngine.GameState.fromFen(START_FEN).zobristKey == ChessEngine.GameState().zobristKey
+
+#a position reached by moves and the same position parsed from its FEN are the same to the engine
+def testFenOfPlayedGame():
+    gs = ChessEngine.GameState()
+    playMoves(gs, ["e2e4", "c7c5", "e4e5", "d7d5"])
+    assert gs.toFen() == "rnbqkbnr/pp2pppp/8/2ppP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3"
+    parsed = ChessEngine.GameState.fromFen(gs.toFen())
+    assert parsed.zobristKey == gs.zobristKey
+    assert (parsed.materialScore, parsed.positionScore) == (gs.materialScore, gs.positionScore)
+    assert sorted(move.moveID for move in parsed.getValidMoves()) == sorted(move.moveID for move in gs.getValidMoves())
+
+@pytest.mark.parametrize("fen", [
+    "bad",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "xnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq z9 0 1",
+])
+def testBadFen(fen):
+    with pytest.raises(ValueError):
+        ChessEngine.GameState.fromFen(fen)
+
+#Random games on both backends: after every move the incremental key and evaluation scores match the ones computed
+#from scratch and both backends agree, and taking every move back restores the starting position exactly
+@pytest.mark.parametrize("name, fen, counts", ChessPerft.POSITIONS, ids=[position[0] for position in ChessPerft.POSITIONS])
+def testMakeUndoRestoresPosition(name, fen, counts):
+    rng = random.Random(name)
+    for game in range(3):
+        gs = ChessEngine.GameState.fromFen(fen)
+        bb = ChessBitboard.BitboardGameState(gs)
+        startKey = gs.zobristKey
+        startScores = (gs.materialScore, gs.positionScore)
+        for ply in range(80):
+            moves = gs.getValidMoves()
+            bbMoves = bb.getValidMoves()
+            assert sorted(move.moveID for move in moves) == sorted(move.moveID for move in bbMoves)
+            if len(moves) == 0:
+                break
+            move = rng.choice(moves)
+            promoteValue = rng.choice("QRBN") if move.isPawnPromotion else ""
+            gs.makeMove(move, promoteValue=promoteValue)
+            bb.makeMove([bbMove for bbMove in bbMoves if bbMove.moveID == move.moveID][0], promoteValue=promoteValue)
+            assert gs.zobristKey == gs.computeZobristKey() == bb.zobristKey == bb.computeZobristKey()
+            assert (gs.materialScore, gs.positionScore) == gs.computeEvalScores() == (bb.materialScore, bb.positionScore)
+            assert gs.board == bb.board
+        while len(gs.moveLog) > 0:
+            gs.undoMove()
+            bb.undoMove()
+        assert gs.toFen() == fen
+        assert gs.zobristKey == bb.zobristKey == startKey
+        assert (gs.materialScore, gs.positionScore) == (bb.materialScore, bb.positionScore) == startScores
+        assert gs.board == bb.board
+
+#the search's null move only passes the turn and is taken back completely
+def testNullMove():
+    for gs in (ChessEngine.GameState.fromFen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 3"),
+               ChessBitboard.BitboardGameState(ChessEngine.GameState.fromFen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 3"))):
+        key = gs.zobristKey
+        gs.makeNullMove()
+        assert not gs.whiteToMove
+        assert gs.zobristKey == gs.computeZobristKey()
+        gs.undoNullMove()
+        assert gs.whiteToMove and gs.zobristKey == key == gs.computeZobristKey()
+
+#a move packed and wrapped again is the same move, and the bitboard backend generates the same packed int for it
+@pytest.mark.parametrize("fen, notation, flag, promotion, captured", [
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", "e2a6", ChessEngine.NORMAL, 0, "bB"),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", "d7c8n", ChessEngine.PROMOTION, ChessEngine.KNIGHT, "bB"),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", "d7c8q", ChessEngine.PROMOTION, ChessEngine.QUEEN, "bB"),
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 3", "e5d6", ChessEngine.ENPASSANT, 0, "bp"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "e8c8", ChessEngine.CASTLE, 0, "--"),
+])
+def testPackedMoveRoundTrip(fen, notation, flag, promotion, captured):
+    gs = ChessEngine.GameState.fromFen(fen)
+    promoteValue = notation[4:].upper()
+    move = [move for move in gs.getValidMoves() if move.getCoordinateNotation(promoteValue) == notation][0]
+    packed = move.getPacked(promoteValue)
+    start = move.startRow * 8 + move.startCol
+    end = move.endRow * 8 + move.endCol
+    assert packed == ChessEngine.packMove(start, end, flag, promotion, ChessEngine.pieceIndex.get(captured, -1))
+    unpacked = ChessEngine.Move.fromPacked(packed, gs.board)
+    assert [getattr(unpacked, name) for name in ChessEngine.Move.__slots__] == [getattr(move, name) for name in ChessEngine.Move.__slots__]
+    assert unpacked.getPacked(promoteValue) == packed
+    assert packed in ChessBitboard.BitboardGameState(gs).getLegalMoves()
@@ -0,0 +1,24 @@
+#Move generator node counts on the standard perft positions, for both backends
+#run with: python -m pytest
+
+import pytest
+import ChessPerft
+
+DEPTH = 3
+
+@pytest.mark.parametrize("bitboard", [False, True], ids=["GameState", "bitboard"])
+@pytest.mark.parametrize("name, fen, counts", ChessPerft.POSITIONS, ids=[position[0] for position in ChessPerft.POSITIONS])
+def testPerft(name, fen, counts, bitboard):
+    for depth in range(1, DEPTH + 1):
+        gs = ChessPerft.createGameState(fen, bitboard)
+        assert ChessPerft.perft(gs, depth) == counts[depth - 1], "depth %d" % depth
+        #perft takes every move back, so the position is unchanged
+        assert gs.zobristKey == ChessPerft.createGameState(fen, bitboard).zobristKey
+
+#divide splits the same count by root move, underpromotions included
+def testDivide():
+    name, fen, counts = [position for position in ChessPerft.POSITIONS if position[0] == "castling"][0]
+    results = ChessPerft.divide(ChessPerft.createGameState(fen), 2)
+    assert sum(nodes for move, nodes in results) == counts[1]
+    assert len(results) == counts[0]
+    assert "d7c8n" in [move for move, nodes in results]
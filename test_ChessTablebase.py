@@ -0,0 +1,79 @@
+#Tablebase distance to mate, checked against known positions and against the tables' own moves
+#run with: python -m pytest
+
+import random
+import pytest
+import ChessEngine
+import ChessTablebase
+from ChessTablebase import WIN, DRAW, LOSS
+
+#only KQK is generated, it takes a few seconds
+@pytest.fixture(scope="module")
+def tablebase(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("tablebases")
+    with open(directory / "KQK.bin", "wb") as f:
+        f.write(ChessTablebase.generateTable("KQK", {}, out=lambda *args: None))
+    tablebase = ChessTablebase.Tablebase(str(directory))
+    yield tablebase
+    tablebase.close()
+
+def probe(tablebase, fen):
+    return tablebase.probe(ChessEngine.GameState.fromFen(fen))
+
+@pytest.mark.parametrize("fen, result", [
+    ("6k1/8/6K1/8/8/8/8/Q7 w - - 0 1", (WIN, 1)), #Qa8#
+    ("Q5k1/8/6K1/8/8/8/8/8 b - - 0 1", (LOSS, 0)), #mated
+    ("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1", (DRAW, 0)), #stalemate
+    ("7k/8/6K1/8/8/8/8/Q7 b - - 0 1", (LOSS, 2)), #Kg8 is the only move, then Qa8#
+    ("8/8/8/8/8/6k1/8/q5K1 w - - 0 1", (LOSS, 0)), #black's queen, the table is flipped
+    ("4k3/8/8/8/8/8/8/4KN2 w - - 0 1", (DRAW, 0)), #a lone minor piece can't mate
+    ("4k3/8/8/8/8/8/8/4KR2 w - - 0 1", None), #no KRK table here
+    ("4k3/8/8/8/8/8/8/R3K3 w Q - 0 1", None), #castling rights aren't covered
+])
+def testKnownPositions(tablebase, fen, result):
+    assert probe(tablebase, fen) == result
+
+#The tables agree with themselves: a win in n plies has a move to a loss in n - 1 plies and none to a faster loss,
+#a loss in n plies has only moves to wins in at most n - 1 plies and at least one that takes that long
+def testDistanceToMateIsConsistent(tablebase):
+    rng = random.Random(1)
+    checked = 0
+    while checked < 200:
+        squares = rng.sample(range(64), 3)
+        board = ["1"] * 64
+        for square, piece in zip(squares, "KkQ"):
+            board[square] = piece
+        fen = "/".join("".join(board[r * 8:r * 8 + 8]) for r in range(8)) + (" w" if rng.random() < .5 else " b") + " - - 0 1"
+        gs = ChessEngine.GameState.fromFen(fen)
+        #the side not to move mustn't be in check and the kings can't touch
+        gs.whiteToMove = not gs.whiteToMove
+        illegal = gs.inCheck() or abs(gs.whiteKingLocation[0] - gs.blackKingLocation[0]) <= 1 and \
+                  abs(gs.whiteKingLocation[1] - gs.blackKingLocation[1]) <= 1
+        gs.whiteToMove = not gs.whiteToMove
+        if illegal:
+            continue
+        outcome, plies = tablebase.probe(gs)
+        validMoves = gs.getValidMoves()
+        children = []
+        for move in validMoves:
+            gs.makeMove(move)
+            children.append(tablebase.probe(gs))
+            gs.undoMove()
+        if outcome == WIN:
+            assert plies > 0
+            assert min(childPlies for childOutcome, childPlies in children if childOutcome == LOSS) == plies - 1
+        elif outcome == LOSS:
+            if len(validMoves) == 0:
+                assert plies == 0 and gs.checkMate
+            else:
+                assert all(childOutcome == WIN for childOutcome, childPlies in children)
+                assert max(childPlies for childOutcome, childPlies in children) == plies - 1
+        else:
+            assert all(childOutcome != LOSS for childOutcome, childPlies in children)
+        checked += 1
+
+def testBestMoveMates(tablebase):
+    gs = ChessEngine.GameState.fromFen("6k1/8/6K1/8/8/8/8/Q7 w - - 0 1")
+    move, result = tablebase.getBestMove(gs, gs.getValidMoves())
+    assert move.getCoordinateNotation() == "a1a8"
+    assert result == (WIN, 1)
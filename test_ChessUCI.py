@@ -0,0 +1,110 @@
+#UCI front end: command parsing, position setup, searches and malformed input
+#run with: python -m pytest
+
+import io
+import time
+import pytest
+import ChessUCI
+
+def createEngine():
+    out = io.StringIO()
+    return ChessUCI.UCIEngine(out), out
+
+def run(commands):
+    engine, out = createEngine()
+    for command in commands:
+        engine.handleCommand(command)
+    engine.waitForSearch()
+    return engine, out.getvalue().splitlines()
+
+def testHandshake():
+    engine, lines = run(["uci", "isready"])
+    assert lines[0] == "id name " + ChessUCI.ENGINE_NAME
+    assert lines[-2:] == ["uciok", "readyok"]
+    assert any(line.startswith("option name Hash type spin") for line in lines)
+
+def testPosition():
+    engine, lines = run(["position startpos moves e2e4 e7e5 g1f3"])
+    assert engine.gs.toFen() == "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2"
+    engine, lines = run(["position fen 8/P6k/8/8/8/8/8/K7 w - - 0 1 moves a7a8n"])
+    assert engine.gs.board[0][0] == "wN"
+    assert lines == []
+
+def testIllegalMove():
+    engine, lines = run(["position startpos moves e2e4 e2e4 d7d5"])
+    assert lines == ["info string illegal move e2e4"]
+    assert len(engine.gs.moveLog) == 1
+
+def testGo():
+    engine, lines = run(["position startpos moves e2e4", "go depth 2"])
+    assert lines[-1].startswith("bestmove ")
+    assert any(line.startswith("info depth 2 ") for line in lines)
+    #the move is legal for black
+    assert engine.playMove(lines[-1].split()[1])
+
+#malformed commands are reported and the engine carries on with the next one
+@pytest.mark.parametrize("command", [
+    "position fen bad",
+    "position fen rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - x 1",
+    "go depth x",
+    "go wtime 1000 winc x",
+    "setoption name Hash value x",
+])
+def testMalformedCommand(command):
+    engine, out = createEngine()
+    assert engine.handleCommand(command)
+    assert out.getvalue().startswith("info string error")
+    assert engine.handleCommand("isready")
+    assert out.getvalue().splitlines()[-1] == "readyok"
+
+#a ponder search reports nothing until ponderhit, then it runs on the time budget of its go command
+def testPonderHit():
+    engine, out = createEngine()
+    engine.handleCommand("position startpos moves e2e4")
+    engine.handleCommand("go ponder movetime 300")
+    time.sleep(.2)
+    assert not any(line.startswith("bestmove") for line in out.getvalue().splitlines())
+    start = time.time()
+    engine.handleCommand("ponderhit")
+    engine.waitForSearch()
+    assert time.time() - start >= .2
+    assert engine.playMove(out.getvalue().splitlines()[-1].split()[1])
+
+def testPonderStop():
+    engine, out = createEngine()
+    engine.handleCommand("go ponder wtime 60000 btime 60000")
+    time.sleep(.1)
+    engine.handleCommand("stop")
+    assert out.getvalue().splitlines()[-1].startswith("bestmove ")
+
+#a new game forgets the table and the move ordering tables
+def testNewGame():
+    engine, lines = run(["position startpos", "go depth 3"])
+    assert any(engine.searcher.historyScores)
+    engine.handleCommand("ucinewgame")
+    assert not any(engine.searcher.historyScores)
+    assert engine.searcher.transpositionTable.keys.count(None) == len(engine.searcher.transpositionTable.keys)
+
+def testQuit():
+    engine, out = createEngine()
+    assert not engine.handleCommand("quit")
+
+#stdout is the protocol channel, a search must not print to it on its own
+def testNoStrayOutput(capsys):
+    engine, lines = run(["position fen 8/8/4k3/8/8/2B5/8/4K3 w - - 0 1", "go depth 3"])
+    assert capsys.readouterr().out == ""
+    assert lines[-1].startswith("bestmove ")
+
+@pytest.mark.parametrize("params, whiteToMove, seconds", [
+    ({"movetime": "1000"}, True, (1000 - ChessUCI.MOVE_OVERHEAD_MS) / 1000),
+    ({"wtime": "60000", "btime": "30000", "movestogo": "20"}, True, (3000 - ChessUCI.MOVE_OVERHEAD_MS) / 1000),
+    ({"wtime": "60000", "btime": "30000", "movestogo": "20"}, False, (1500 - ChessUCI.MOVE_OVERHEAD_MS) / 1000),
+    ({"depth": "5"}, True, None),
+])
+def testAllocateTime(params, whiteToMove, seconds):
+    engine, out = createEngine()
+    engine.gs.whiteToMove = whiteToMove
+    if seconds is None:
+        assert engine.allocateTime(params) is None
+    else:
+        assert engine.allocateTime(params) == pytest.approx(seconds)
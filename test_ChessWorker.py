@@ -0,0 +1,51 @@
+#GUI search worker: searches, cancellation and ponder hits
+#run with: python -m pytest
+
+import time
+import pytest
+import ChessEngine
+import ChessWorker
+
+@pytest.fixture(scope="module")
+def worker():
+    worker = ChessWorker.SearchWorker()
+    yield worker
+    worker.close()
+
+def waitForResult(worker, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        result = worker.poll()
+        if result is not None:
+            return result
+        time.sleep(.01)
+    raise AssertionError("no result from the worker")
+
+def testSearch(worker):
+    gs = ChessEngine.GameState()
+    worker.start(gs, 2)
+    assert worker.isSearching()
+    moveID, promoteValue, score = waitForResult(worker)
+    assert moveID in [move.moveID for move in gs.getValidMoves()]
+    assert not worker.isSearching()
+
+#a cancelled search never reports a result
+def testCancel(worker):
+    worker.start(ChessEngine.GameState(), 30)
+    worker.cancel()
+    time.sleep(.2)
+    assert worker.poll() is None and not worker.isSearching()
+
+#black's a2a1 is pondered, it is a hit when the human promotes to a queen like the ponder search does
+@pytest.mark.parametrize("promoteValue, hit", [("Q", True), ("N", False)])
+def testPonderPromotion(worker, promoteValue, hit):
+    gs = ChessEngine.GameState.fromFen("4k3/8/8/8/8/7P/p6K/8 b - - 0 1")
+    promotion = [move for move in gs.getValidMoves() if move.isPawnPromotion][0]
+    worker.predictedReply = promotion.moveID
+    assert worker.ponder(gs, 2)
+    hits, misses = worker.stats.ponderHits, worker.stats.ponderMisses
+    gs.makeMove(promotion, promoteValue=promoteValue)
+    worker.start(gs, 2)
+    assert (worker.stats.ponderHits - hits, worker.stats.ponderMisses - misses) == ((1, 0) if hit else (0, 1))
+    moveID, promoteValue, score = waitForResult(worker)
+    assert moveID in [move.moveID for move in gs.getValidMoves()]